@@ -0,0 +1,196 @@
+import asyncio
+import math
+import re
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, List, Tuple
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# (method, path regex relative to /api, class); first match wins, unmatched requests are "default"
+DEFAULT_RULES: List[Tuple[str, str, str]] = [
+    ("POST", r"^/bulk/tabs(/[a-z]+)?$", "heavy"),
+    ("POST", r"^/tabs/[^/]+/(click|type|keypress|scroll)$", "interactive"),
+    ("GET", r"^/tabs$", "interactive"),
+    ("GET", r"^/?$", "interactive"),
+    ("GET", r"^/browser/(status|health)$", "interactive"),
+    ("GET", r"^/(live|ready)$", "interactive"),
+    ("GET", r"^/tabs/[^/]+/screenshot$", "heavy"),
+    ("POST", r"^/automation/workflow$", "job"),
+    ("POST", r"^/tabs/[^/]+/replay$", "job"),
+    ("POST", r"^/browser/(settings|reap)$", "heavy"),
+    ("GET", r"^/browser/metrics$", "heavy"),
+    ("POST", r"^/tabs$", "tab"),
+    ("DELETE", r"^/tabs/[^/]+$", "tab"),
+    ("POST", r"^/tabs/[^/]+/(navigate|hibernate)$", "tab"),
+]
+
+DEFAULT_CLASSES: Dict[str, Dict[str, Any]] = {
+    # limit: requests running at once; queue: requests allowed to wait for a slot;
+    # shed_at: fraction of the shared wait capacity above which the class stops queueing,
+    # so heavy work is turned away first while interactive input still gets in;
+    # expected_s: starting service time estimate for Retry-After, before any request finished
+    "interactive": {"limit": 32, "queue": 128, "shed_at": 1.0, "max_wait": 10, "expected_s": 0.1},
+    "default": {"limit": 16, "queue": 64, "shed_at": 0.9, "max_wait": 10, "expected_s": 0.5},
+    "tab": {"limit": 8, "queue": 32, "shed_at": 0.75, "max_wait": 20, "expected_s": 2},
+    # Sub-second to few-second calls: screenshots, bulk operations, browser settings
+    "heavy": {"limit": 4, "queue": 8, "shed_at": 0.5, "max_wait": 30, "expected_s": 1},
+    # Minutes-long runs (workflows, replays) get their own slots, so they never hold up screenshots
+    "job": {"limit": 4, "queue": 4, "shed_at": 0.5, "max_wait": 30, "expected_s": 120},
+}
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, request_class: str, reason: str, retry_after: int):
+        super().__init__(f"{request_class} requests are being shed: {reason}")
+        self.request_class = request_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionClass:
+    """Concurrency limit with a bounded FIFO of waiters for one class of endpoints"""
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.config = config
+        self.active = 0
+        self.waiters: deque = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.waits = deque(maxlen=200)  # ms spent queued
+        self.service_s = config.get("expected_s", 0.5)  # moving average of time holding a slot, for Retry-After
+
+    def retry_after(self) -> int:
+        backlog = (len(self.waiters) + 1) / max(1, self.config["limit"])
+        return max(1, math.ceil(backlog * self.service_s))
+
+    def release(self, held_s: float):
+        self.service_s = 0.9 * self.service_s + 0.1 * held_s
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot straight to the next waiter
+                return
+        self.active -= 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.waits)
+        return {
+            **self.config,
+            "active": self.active,
+            "waiting": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_p95_ms": round(ordered[int(len(ordered) * 0.95)], 1) if ordered else None,
+            "avg_service_ms": round(self.service_s * 1000, 1)
+        }
+
+
+class AdmissionController:
+    """Admission control for the API: per-class concurrency, bounded queues and 429s when full"""
+
+    def __init__(self):
+        self.settings = {
+            "enabled": True,
+            "max_waiting": 128  # wait capacity shared by every class; see shed_at
+        }
+        self.classes = {name: AdmissionClass(name, dict(config)) for name, config in DEFAULT_CLASSES.items()}
+        self.rules = [(method, re.compile(pattern), name) for method, pattern, name in DEFAULT_RULES]
+
+    def classify(self, method: str, path: str) -> str:
+        for rule_method, pattern, name in self.rules:
+            if method == rule_method and pattern.match(path):
+                return name
+        return "default"
+
+    def total_waiting(self) -> int:
+        return sum(len(c.waiters) for c in self.classes.values())
+
+    async def acquire(self, name: str) -> AdmissionClass:
+        """Wait for a slot in a class, or raise AdmissionRejected right away if it is overloaded"""
+        cls = self.classes[name]
+        config = cls.config
+        if cls.active < config["limit"] and not cls.waiters:
+            cls.active += 1
+            cls.admitted += 1
+            return cls
+
+        if len(cls.waiters) >= config["queue"]:
+            cls.rejected += 1
+            raise AdmissionRejected(name, "queue full", cls.retry_after())
+        if self.total_waiting() >= self.settings["max_waiting"] * config["shed_at"]:
+            cls.rejected += 1
+            raise AdmissionRejected(name, "server overloaded", cls.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        cls.waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout=config["max_wait"])
+        except asyncio.TimeoutError:
+            cls.timed_out += 1
+            self._drop_waiter(cls, waiter)
+            raise AdmissionRejected(name, "timed out waiting for a slot", cls.retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as the caller went away; pass it on
+                cls.release(0.0)
+            else:
+                self._drop_waiter(cls, waiter)
+            raise
+        cls.waits.append((time.perf_counter() - started) * 1000)
+        cls.admitted += 1
+        return cls
+
+    @staticmethod
+    def _drop_waiter(cls: AdmissionClass, waiter: asyncio.Future):
+        try:
+            cls.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    async def middleware(self, request, call_next):
+        """HTTP middleware body: admit /api requests according to their class"""
+        path = request.url.path
+        if not self.settings["enabled"] or not path.startswith("/api"):
+            return await call_next(request)
+
+        name = self.classify(request.method, path[len("/api"):])
+        try:
+            cls = await self.acquire(name)
+        except AdmissionRejected as e:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": str(e), "class": e.request_class, "retryable": True},
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        started = time.perf_counter()
+        try:
+            return await call_next(request)
+        finally:
+            cls.release(time.perf_counter() - started)
+
+    def update_class(self, name: str, config: Dict[str, Any]):
+        if name not in self.classes:
+            raise KeyError(name)
+        cls = self.classes[name]
+        unknown = sorted(set(config) - set(cls.config))
+        if unknown:
+            raise ValueError(f"Unknown settings for admission class {name}: {unknown}")
+        cls.config.update(config)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "settings": self.settings,
+            "waiting": self.total_waiting(),
+            "classes": {name: cls.to_dict() for name, cls in self.classes.items()}
+        }
+
+
+admission_controller = AdmissionController()
@@ -1,11 +1,16 @@
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
 import asyncio
+import time
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Awaitable, Callable
 import re
 from datetime import datetime
 from pathlib import Path
 
+from routing_policy import RoutingPolicy, routing_policies
+from navigation import Readiness, page_navigator
+from metrics import automation_step_seconds, automation_step_failures
+
 logger = logging.getLogger(__name__)
 
 class AutomationEngine:
@@ -13,6 +18,8 @@ class AutomationEngine:
         self.page = page
         self.logs: List[Dict[str, Any]] = []
         self.screenshots: List[str] = []
+        self.step_timings: Dict[str, float] = {}  # step name -> ms
+        self.on_step_failed: Optional[Callable[[str], Any]] = None
         self.settings = {
             "human_delays": True,
             "step_timeout": 30000,
@@ -31,6 +38,32 @@ class AutomationEngine:
         self.logs.append(log_entry)
         getattr(logger, level)(message)
 
+    async def navigate(self, url: str, readiness: Optional[Readiness] = None, timeout: Optional[int] = None) -> bool:
+        """Navigate and wait for a readiness predicate instead of networkidle"""
+        try:
+            result = await page_navigator.navigate(self.page, url, readiness, timeout)
+        except PlaywrightTimeout:
+            self.log(f"Navigation to {url} timed out", level="warning")
+            return False
+        self.log(f"Navigated to {url}", ready=result["ready"], timings_ms=result["timings_ms"])
+        return result["ready"]
+
+    async def run_step(self, name: str, action: Awaitable):
+        """Run one workflow step, recording its duration and a failure if it returns a falsy result"""
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await action
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            self.step_timings[name] = round(elapsed * 1000, 1)
+            automation_step_seconds.observe(elapsed, name)
+            if not result:
+                automation_step_failures.inc(name)
+                if self.on_step_failed:
+                    self.on_step_failed(name)
+
     async def wait_for_selector(self, selector: str, timeout: Optional[int] = None):
         """Wait for element with retry"""
         timeout = timeout or self.settings["step_timeout"]
@@ -169,6 +202,11 @@ class AutomationEngine:
             self.log(f"Download failed: {str(e)}", level="error")
             return None
 
+    async def use_routing_policy(self, policy: Optional[RoutingPolicy]):
+        """Switch the request-blocking policy of this page only (None restores the profile default)"""
+        await routing_policies.use_policy(self.page, policy)
+        self.log(f"Routing policy: {policy.presets if policy else 'profile default'}")
+
     def update_settings(self, new_settings: dict):
         """Update automation settings"""
         self.settings.update(new_settings)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+API benchmark: hot browser endpoints of server.py, fully offline
+
+Starts the local fixture site and an in-memory Mongo stand-in, launches
+server.py under uvicorn against them (headless browser), then drives each
+scenario with N concurrent clients and reports throughput and p50/p95/p99
+latency. Results can be saved as JSON and compared against a saved baseline;
+the exit status is 1 when any scenario regresses by more than --threshold %.
+
+Scenarios:
+    create_close  POST /api/tabs then DELETE /api/tabs/{id}
+    navigate      POST /api/tabs/{id}/navigate to a fixture page
+    screenshot    GET /api/tabs/{id}/screenshot
+    click_type    POST /api/tabs/{id}/click then /type
+    list_tabs     GET /api/tabs
+
+Run from the backend directory:
+    python -m benchmarks.bench_api --concurrency 4 --iterations 50 --output bench.json
+    python -m benchmarks.bench_api --concurrency 4 --iterations 50 --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.fixture_site import FixtureSite
+from benchmarks.mock_mongo import MockMongo
+
+SCENARIOS = ["create_close", "navigate", "screenshot", "click_type", "list_tabs"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(samples: list, q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    if not latencies:
+        return {"ops": 0, "errors": errors}
+    return {
+        "ops": len(latencies),
+        "errors": errors,
+        "throughput_ops_s": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+class ServerProcess:
+    """server.py under uvicorn in a child process"""
+
+    def __init__(self, port: int, env: dict):
+        self.port = port
+        self.env = env
+        self.proc = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env={**os.environ, **self.env},
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+
+    async def wait_ready(self, client: httpx.AsyncClient, timeout: float):
+        deadline = time.monotonic() + timeout
+        last = None
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"server.py exited with {self.proc.returncode}:\n{self.proc.stderr.read()}")
+            try:
+                response = await client.get(f"{self.url}/api/ready")
+                last = response.json()
+                if response.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+        raise RuntimeError(f"server.py not ready after {timeout}s: {last}")
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, api: str, site: FixtureSite):
+        self.client = client
+        self.api = api
+        self.site = site
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        response = await self.client.request(method, f"{self.api}{path}", **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def create_tab(self, url: str = "about:blank") -> str:
+        response = await self.request("POST", "/tabs", json={"url": url})
+        return response.json()["tab"]["id"]
+
+    async def op_create_close(self, tab_id: str, i: int):
+        page_id = await self.create_tab()
+        await self.request("DELETE", f"/tabs/{page_id}")
+
+    async def op_navigate(self, tab_id: str, i: int):
+        await self.request("POST", f"/tabs/{tab_id}/navigate", json={"url": self.site.url(f"/page/{i}")})
+
+    async def op_screenshot(self, tab_id: str, i: int):
+        await self.request("GET", f"/tabs/{tab_id}/screenshot")
+
+    async def op_click_type(self, tab_id: str, i: int):
+        # The fixture's search box sits near the top left of the page
+        await self.request("POST", f"/tabs/{tab_id}/click", json={"x": 60, "y": 80})
+        await self.request("POST", f"/tabs/{tab_id}/type", json={"text": "bench", "delay": 0})
+
+    async def op_list_tabs(self, tab_id: str, i: int):
+        await self.request("GET", "/tabs")
+
+    async def run(self, scenario: str, tabs: list, iterations: int, warmup: int) -> dict:
+        op = getattr(self, f"op_{scenario}")
+        latencies, errors = [], 0
+
+        async def worker(tab_id: str):
+            nonlocal errors
+            for i in range(warmup + iterations):
+                started = time.perf_counter()
+                try:
+                    await op(tab_id, i)
+                except httpx.HTTPError:
+                    errors += i >= warmup
+                    continue
+                if i >= warmup:
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(tab_id) for tab_id in tabs))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print the change against a baseline; True if any scenario regressed past the threshold"""
+    regressed = False
+    print(f"\nvs baseline ({baseline['meta']['timestamp']}), threshold {threshold:.0f}%")
+    print(f"{'scenario':14}{'ops/s':>18}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}")
+    for name, current in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if not base or not base.get("ops") or not current.get("ops"):
+            continue
+        cells, flags = [], []
+        for key, higher_is_better in (("throughput_ops_s", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False)):
+            change = (current[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+            cells.append(f"{current[key]:9.1f} ({change:+5.1f}%)")
+            worse = -change if higher_is_better else change
+            if key in ("throughput_ops_s", "p95_ms") and worse > threshold:
+                flags.append(key)
+        regressed |= bool(flags)
+        print(f"{name:14}" + "".join(f"{c:>18}" for c in cells) + (f"  REGRESSED: {', '.join(flags)}" if flags else ""))
+    return regressed
+
+
+async def run_suite(args) -> dict:
+    site = FixtureSite(latency_ms=args.latency_ms).start()
+    mongo = MockMongo().start()
+    env = {"MONGO_URL": mongo.url, "DB_NAME": "bench", "BROWSER_HEADLESS": "1"}
+    port = free_port()
+    if args.distributed:
+        # Exercise the Mongo-backed session registry as a one-worker deployment would
+        env.update(WORKER_URL=f"http://127.0.0.1:{port}", WORKER_ID="bench")
+    server = ServerProcess(port, env)
+    server.start()
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+            "latency_ms": args.latency_ms,
+            "distributed": args.distributed,
+        },
+        "scenarios": {}
+    }
+    try:
+        async with httpx.AsyncClient(timeout=args.request_timeout) as client:
+            await server.wait_ready(client, args.ready_timeout)
+            bench = Bench(client, f"{server.url}/api", site)
+            tabs = [await bench.create_tab(site.url("/")) for _ in range(args.concurrency)]
+            for scenario in args.scenarios:
+                results["scenarios"][scenario] = await bench.run(scenario, tabs, args.iterations, args.warmup)
+                print(f"{scenario:14}{json.dumps(results['scenarios'][scenario])}")
+            for tab_id in tabs:
+                await bench.request("DELETE", f"/tabs/{tab_id}")
+    finally:
+        server.stop()
+        mongo.stop()
+        site.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent clients, each on its own tab")
+    parser.add_argument("--iterations", type=int, default=50, help="measured operations per client")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured operations per client first")
+    parser.add_argument("--latency-ms", type=float, default=0, help="fixture site latency per request")
+    parser.add_argument("--distributed", action="store_true", help="run with the Mongo session registry")
+    parser.add_argument("--ready-timeout", type=float, default=90)
+    parser.add_argument("--request-timeout", type=float, default=60)
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=10, help="allowed regression in %% (throughput, p95)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"saved {args.output}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
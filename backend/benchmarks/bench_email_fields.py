@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: single-pass EmailFieldExtractor vs the legacy per-field regex scans
+
+Run from the backend directory:
+    python -m benchmarks.bench_email_fields --emails 2000 --repeat 5
+"""
+
+import argparse
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from workflows.email_fields import EmailFieldExtractor
+
+
+def legacy_extract(content: str) -> dict:
+    """The original extract_fields_from_email logic: one uncompiled re.search per field"""
+    data = {}
+    prompt_match = re.search(r'(?:Video Prompt|Prompt):\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
+    if prompt_match:
+        data['prompt'] = prompt_match.group(1).strip()
+    title_match = re.search(r'Title:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
+    if title_match:
+        data['title'] = title_match.group(1).strip()
+    desc_match = re.search(r'Description:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
+    if desc_match:
+        data['description'] = desc_match.group(1).strip()
+    tags_match = re.search(r'Tags:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
+    if tags_match:
+        data['tags'] = tags_match.group(1).strip()
+    visibility_match = re.search(r'Visibility:\s*(Public|Private|Unlisted|Scheduled)', content, re.IGNORECASE)
+    if visibility_match:
+        data['visibility'] = visibility_match.group(1).strip()
+    return data
+
+
+def make_email(rng: random.Random, filler_lines: int) -> str:
+    words = ["video", "ocean", "sunset", "city", "drone", "slow", "motion", "neon", "forest", "rain"]
+    filler = [" ".join(rng.choices(words, k=12)) for _ in range(filler_lines)]
+    fields = [
+        f"Video Prompt: {' '.join(rng.choices(words, k=30))}",
+        f"Title: {' '.join(rng.choices(words, k=6))}",
+        f"Description: {' '.join(rng.choices(words, k=40))}",
+        f"Tags: {', '.join(rng.choices(words, k=5))}",
+        f"Visibility: {rng.choice(['Public', 'Private', 'Unlisted'])}",
+    ]
+    half = filler_lines // 2
+    return "\n".join(filler[:half] + fields + filler[half:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=1000, help="number of email bodies per batch")
+    parser.add_argument("--filler", type=int, default=40, help="filler lines per email")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    bodies = [make_email(rng, args.filler) for _ in range(args.emails)]
+    extractor = EmailFieldExtractor()
+
+    mismatches = sum(
+        1 for body in bodies
+        if {k: v for k, v in legacy_extract(body).items() if k != 'tags'}
+        != {k: v for k, v in extractor.extract(body).items() if k != 'tags'}
+    )
+
+    legacy = min(timeit.repeat(lambda: [legacy_extract(b) for b in bodies], number=1, repeat=args.repeat))
+    single = min(timeit.repeat(lambda: [extractor.extract(b) for b in bodies], number=1, repeat=args.repeat))
+    batch = min(timeit.repeat(lambda: extractor.extract_many(bodies), number=1, repeat=args.repeat))
+
+    print(f"emails={args.emails} filler_lines={args.filler} repeat={args.repeat}")
+    print(f"legacy per-field re.search : {legacy * 1000:8.2f} ms  ({legacy / args.emails * 1e6:7.2f} us/email)")
+    print(f"single-pass extract        : {single * 1000:8.2f} ms  ({single / args.emails * 1e6:7.2f} us/email)")
+    print(f"single-pass extract_many   : {batch * 1000:8.2f} ms  ({batch / args.emails * 1e6:7.2f} us/email)")
+    print(f"speedup (batch vs legacy)  : {legacy / batch:8.2f}x")
+    print(f"result mismatches (excluding normalised tags): {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
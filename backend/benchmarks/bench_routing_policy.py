@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BrowserManager.navigate with and without request-blocking policies
+
+Serves the local fixture site (images, fonts, video, trackers) and navigates a
+page in a context with no policy and in one with the given presets, reporting
+DOMContentLoaded / load times, requests that reached the server and the
+router's blocked-request statistics.
+
+Run from the backend directory:
+    python -m benchmarks.bench_routing_policy --runs 10 --latency-ms 20 --presets ads media fonts images
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fixture_site import FixtureSite
+from browser_manager import BrowserManager
+from routing_policy import RoutingPolicy
+
+
+async def measure(manager: BrowserManager, site: FixtureSite, profile: str, runs: int) -> dict:
+    context_id, _ = await manager.create_context(profile)
+    page_id, page = await manager.create_page(context_id)
+    dcl, load = [], []
+    site.reset_counters()
+    for i in range(runs):
+        started = time.perf_counter()
+        await manager.navigate(page_id, site.url(f"/page/{i}"))
+        dcl.append((time.perf_counter() - started) * 1000)
+        await page.wait_for_load_state("load")
+        load.append((time.perf_counter() - started) * 1000)
+    result = {
+        "dcl_ms": statistics.median(dcl),
+        "load_ms": statistics.median(load),
+        "server_requests": site.requests_served / runs,
+        "server_bytes": site.bytes_served / runs,
+    }
+    await manager.close_context(context_id, save_state=False)
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--presets", nargs="+", default=["ads", "media", "fonts", "images"])
+    args = parser.parse_args()
+
+    site = FixtureSite(latency_ms=args.latency_ms).start()
+    manager = BrowserManager()
+    manager.settings["headless"] = True
+    await manager.initialize()
+    try:
+        await manager.routing.set_profile_policy("bench-on", RoutingPolicy(presets=args.presets))
+        off = await measure(manager, site, "bench-off", args.runs)
+        on = await measure(manager, site, "bench-on", args.runs)
+        stats = manager.routing.get_stats()["profiles"]["bench-on"]
+    finally:
+        await manager.cleanup()
+        site.stop()
+
+    print(f"runs={args.runs} latency={args.latency_ms}ms presets={' '.join(args.presets)}")
+    print(f"{'':12}{'DCL ms':>10}{'load ms':>10}{'requests':>10}{'KB':>10}")
+    for name, r in (("policy off", off), ("policy on", on)):
+        print(f"{name:12}{r['dcl_ms']:10.1f}{r['load_ms']:10.1f}{r['server_requests']:10.1f}{r['server_bytes'] / 1024:10.1f}")
+    print(f"load speedup: {off['load_ms'] / on['load_ms']:.2f}x")
+    print(f"router: {stats['requests_blocked']} blocked of {stats['requests_seen']}, "
+          f"~{stats['bytes_saved_estimate'] / 1024:.0f} KB saved, by reason {stats['blocked_by_reason']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: time to import server.py and time until the startup hook returns
+
+Each import runs in a fresh interpreter so module caches do not carry over.
+The startup hook only schedules the browser and Mongo bring-up, so it should
+return in well under a millisecond regardless of how long Chromium takes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup --runs 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import server; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def measure_import(runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+async def measure_startup_hook() -> float:
+    import server
+
+    started = time.perf_counter()
+    await server.startup_event()
+    elapsed = (time.perf_counter() - started) * 1000
+    # Do not actually bring the browser up
+    server.lifecycle.stop()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    samples = measure_import(args.runs)
+    hook_ms = asyncio.run(measure_startup_hook())
+
+    print(f"runs={args.runs}")
+    print(f"import server: median {statistics.median(samples):.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms")
+    print(f"startup hook returned in {hook_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GmailGeminiYouTubeWorkflow end to end against the local mock apps
+
+Runs run_full_workflow in a headless browser against benchmarks.mock_apps, so
+no network or Google account is needed, and reports each step's duration
+(read_gmail, generate_video, download_video, upload_youtube, cleanup) from
+AutomationEngine.step_timings. Artificial latencies are configurable, which
+separates time spent waiting on the apps from time spent in the workflow.
+
+Run from the backend directory:
+    python -m benchmarks.bench_workflow --runs 3 --generation-ms 2000 --no-human-delays
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from automation_engine import AutomationEngine
+from benchmarks.mock_apps import MockApps
+from browser_manager import BrowserManager
+from workflows.gmail_gemini_youtube import GmailGeminiYouTubeWorkflow
+
+
+async def run_once(manager: BrowserManager, apps: MockApps, human_delays: bool) -> dict:
+    context_id, _ = await manager.create_context("bench-workflow")
+    page_id, page = await manager.create_page(context_id)
+    automation = AutomationEngine(page)
+    automation.update_settings({"human_delays": human_delays})
+    published_before = len(apps.published)
+    started = time.perf_counter()
+    try:
+        result = await GmailGeminiYouTubeWorkflow(automation, urls=apps.urls).run_full_workflow()
+    finally:
+        await manager.close_context(context_id, save_state=False)
+    return {
+        "success": result["success"],
+        "error": result.get("error"),
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "steps_ms": dict(automation.step_timings),
+        "published": apps.published[published_before:],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0, help="mock app latency per HTTP request")
+    parser.add_argument("--open-email-ms", type=int, default=200)
+    parser.add_argument("--generation-ms", type=int, default=3000)
+    parser.add_argument("--upload-processing-ms", type=int, default=1000)
+    parser.add_argument("--video-bytes", type=int, default=2_000_000)
+    parser.add_argument("--no-human-delays", action="store_true", help="fill inputs instead of typing per key")
+    parser.add_argument("--output", help="save per-run results as JSON")
+    args = parser.parse_args()
+
+    apps = MockApps(
+        latency_ms=args.latency_ms,
+        open_email_ms=args.open_email_ms,
+        generation_ms=args.generation_ms,
+        upload_processing_ms=args.upload_processing_ms,
+        video_bytes=args.video_bytes,
+    ).start()
+    manager = BrowserManager()
+    manager.settings["headless"] = True
+    await manager.initialize()
+    runs = []
+    try:
+        for i in range(args.runs):
+            run = await run_once(manager, apps, not args.no_human_delays)
+            runs.append(run)
+            status = "ok" if run["success"] else f"FAILED ({run['error']})"
+            print(f"run {i + 1}: {run['total_ms']:.0f} ms {status}")
+    finally:
+        await manager.cleanup()
+        apps.stop()
+
+    steps = list(dict.fromkeys(step for run in runs for step in run["steps_ms"]))
+    print(f"\nruns={args.runs} latency={args.latency_ms}ms generation={args.generation_ms}ms "
+          f"upload_processing={args.upload_processing_ms}ms human_delays={not args.no_human_delays}")
+    print(f"{'step':16}{'median ms':>12}{'min ms':>12}{'max ms':>12}")
+    for step in steps + ["total"]:
+        samples = [run["total_ms"] if step == "total" else run["steps_ms"][step]
+                   for run in runs if step == "total" or step in run["steps_ms"]]
+        print(f"{step:16}{statistics.median(samples):12.0f}{min(samples):12.0f}{max(samples):12.0f}")
+    print(f"succeeded {sum(run['success'] for run in runs)}/{len(runs)}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"args": vars(args), "runs": runs}, indent=2))
+        print(f"saved {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
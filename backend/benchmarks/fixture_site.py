@@ -0,0 +1,179 @@
+"""
+Local static fixture site for offline browser benchmarks
+
+Serves a generated page that looks like a typical heavy site: images, web fonts,
+a video, stylesheets, scripts and tracker/ad requests, with optional artificial
+latency per request. Everything is generated in memory, so no network is needed.
+
+    site = FixtureSite(latency_ms=20).start()
+    print(site.url("/"))
+    ...
+    site.stop()
+"""
+
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+def _payload(name: str, size: int) -> bytes:
+    """Deterministic filler bytes so responses are cacheable and comparable across runs"""
+    seed = hashlib.sha256(name.encode()).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+class FixtureSite:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0,
+        images: int = 20,
+        image_bytes: int = 40_000,
+        fonts: int = 3,
+        font_bytes: int = 30_000,
+        media_bytes: int = 1_000_000,
+        trackers: int = 6,
+        cache_max_age: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.images = images
+        self.image_bytes = image_bytes
+        self.fonts = fonts
+        self.font_bytes = font_bytes
+        self.media_bytes = media_bytes
+        self.trackers = trackers
+        self.cache_max_age = cache_max_age
+        self.requests_served = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str = "/") -> str:
+        return f"{self.base_url}{path}"
+
+    def start(self) -> "FixtureSite":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests_served = 0
+            self.bytes_served = 0
+
+    def index_html(self) -> str:
+        font_faces = "\n".join(
+            f"@font-face {{ font-family: 'Fixture{i}'; src: url('/fonts/{i}.woff2') format('woff2'); }}\n"
+            f".f{i} {{ font-family: 'Fixture{i}', sans-serif; }}"
+            for i in range(self.fonts)
+        )
+        images = "\n".join(f'<img src="/img/{i}.png" width="64" height="64" alt="">' for i in range(self.images))
+        fonts = "\n".join(f'<p class="f{i}">Font sample {i}</p>' for i in range(self.fonts))
+        trackers = "\n".join(
+            f'<script async src="/analytics/collect.js?id={i}"></script>'
+            f'<img src="/pixel/track.gif?id={i}" width="1" height="1" alt="">'
+            for i in range(self.trackers)
+        )
+        return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Fixture Site</title>
+<link rel="stylesheet" href="/static/site.css">
+<style>
+{font_faces}
+</style>
+<script src="/static/app.js"></script>
+</head>
+<body>
+<h1 id="title">Fixture Site</h1>
+<input id="search" type="text" placeholder="Search">
+<button id="submit">Submit</button>
+<a id="next" href="/page/2">Next page</a>
+{fonts}
+<video src="/media/clip.mp4" preload="auto" muted></video>
+<div id="gallery">
+{images}
+</div>
+{trackers}
+<div id="ready" style="display:none">ready</div>
+<script>window.addEventListener('load', () => document.getElementById('ready').style.display = 'block');</script>
+</body>
+</html>
+"""
+
+    def _route(self, path: str):
+        """Return (status, content type, body, cacheable) for a request path"""
+        if path in ("/", "/index.html") or path.startswith("/page/"):
+            return 200, "text/html; charset=utf-8", self.index_html().encode(), False
+        if path.startswith("/img/") or path.startswith("/pixel/"):
+            size = self.image_bytes if path.startswith("/img/") else 43
+            return 200, "image/png", _payload(path, size), True
+        if path.startswith("/fonts/"):
+            return 200, "font/woff2", _payload(path, self.font_bytes), True
+        if path.startswith("/media/"):
+            return 200, "video/mp4", _payload(path, self.media_bytes), True
+        if path == "/static/site.css":
+            return 200, "text/css", b"body { font-family: sans-serif; } img { margin: 2px; }", True
+        if path == "/static/app.js" or path.startswith("/analytics/"):
+            return 200, "application/javascript", b"window.__fixture = (window.__fixture || 0) + 1;", True
+        return 404, "text/plain", b"not found", False
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if site.latency_ms:
+                    time.sleep(site.latency_ms / 1000)
+                status, content_type, body, cacheable = site._route(urlsplit(self.path).path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if cacheable and site.cache_max_age:
+                    self.send_header("Cache-Control", f"public, max-age={site.cache_max_age}")
+                else:
+                    self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+                with site._lock:
+                    site.requests_served += 1
+                    site.bytes_served += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the benchmark fixture site")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    site = FixtureSite(port=args.port, latency_ms=args.latency_ms).start()
+    print(f"Fixture site on {site.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
@@ -0,0 +1,321 @@
+"""
+Local mock Gmail, Gemini and YouTube Studio for offline workflow benchmarks
+
+Each app is a single page reproducing only the DOM the Gmail -> Gemini ->
+YouTube workflow drives: Gmail's main region with tr.zA inbox rows and a
+div[data-message-id] message view, Gemini's prompt box, model picker, send
+button and download button, and Studio's create menu, upload dialog,
+title/description textboxes, Next steps, tp-yt-paper-radio-button visibility
+options and Publish button.
+
+Latencies are configurable: per HTTP request, opening an email, video
+generation and upload processing. Published uploads are recorded so a run
+can be checked end to end.
+
+    apps = MockApps(generation_ms=2000).start()
+    workflow = GmailGeminiYouTubeWorkflow(automation, urls=apps.urls)
+    ...
+    apps.stop()
+"""
+
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from benchmarks.fixture_site import _payload
+
+DEFAULT_EMAIL = {
+    "sender": "ChatGPT",
+    "subject": "Your video brief",
+    "body": (
+        "Hi,\n\n"
+        "Video Prompt: A slow aerial shot over a misty pine forest at sunrise, cinematic lighting\n"
+        "Title: Misty Forest Sunrise\n"
+        "Description: A calm flight over a pine forest as the fog lifts.\n"
+        "Tags: nature, forest, sunrise\n"
+        "Visibility: Private\n"
+    ),
+}
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title>
+<style>body {{ font-family: sans-serif; margin: 16px; }} [hidden] {{ display: none !important; }}</style>
+</head>
+<body>
+{body}
+<script>
+const CONFIG = {config};
+{script}
+</script>
+</body>
+</html>
+"""
+
+GMAIL_BODY = """
+<div role="navigation">Inbox</div>
+<div role="main">
+  <table><tbody id="inbox">{rows}</tbody></table>
+  <div id="message"></div>
+</div>
+"""
+
+GMAIL_SCRIPT = """
+document.querySelectorAll('tr.zA').forEach((row) => row.addEventListener('click', () => {
+  const email = CONFIG.emails[Number(row.dataset.index)];
+  setTimeout(() => {
+    const message = document.createElement('div');
+    message.dataset.messageId = 'msg-' + row.dataset.index;
+    message.style.whiteSpace = 'pre-wrap';
+    message.textContent = email.body;
+    document.getElementById('message').replaceChildren(message);
+  }, CONFIG.open_email_ms);
+}));
+"""
+
+GEMINI_BODY = """
+<button id="model-picker" aria-label="Model">VEO</button>
+<div id="models" role="listbox" hidden>
+  <div role="option">Gemini 2.5 Pro</div>
+  <div role="option">VEO3</div>
+</div>
+<textarea placeholder="Enter a prompt here" rows="4" cols="80"></textarea>
+<button aria-label="Send">Generate</button>
+<div id="response"></div>
+"""
+
+GEMINI_SCRIPT = """
+const picker = document.getElementById('model-picker');
+picker.addEventListener('click', () => document.getElementById('models').hidden = false);
+document.querySelectorAll('[role="option"]').forEach((option) => option.addEventListener('click', () => {
+  picker.textContent = option.textContent;
+  document.getElementById('models').hidden = true;
+}));
+document.querySelector('button[aria-label="Send"]').addEventListener('click', () => {
+  const response = document.getElementById('response');
+  response.textContent = 'Generating video...';
+  setTimeout(() => {
+    response.innerHTML = '<div>Video ready</div><video src="/gemini/video.mp4" muted></video><button id="download">Download</button>';
+    document.getElementById('download').addEventListener('click', () => {
+      const link = document.createElement('a');
+      link.href = '/gemini/video.mp4';
+      link.download = 'veo3_video.mp4';
+      document.body.appendChild(link);
+      link.click();
+      link.remove();
+    });
+  }, CONFIG.generation_ms);
+});
+"""
+
+STUDIO_BODY = """
+<ytcp-button id="create-icon"><button aria-label="Create">Create</button></ytcp-button>
+<tp-yt-paper-listbox id="create-menu" hidden>
+  <tp-yt-paper-item>Upload videos</tp-yt-paper-item>
+  <tp-yt-paper-item>Go live</tp-yt-paper-item>
+</tp-yt-paper-listbox>
+<div id="upload-dialog" role="dialog" hidden>
+  <h2>Upload videos</h2>
+  <input type="file" accept="video/*">
+  <div id="processing"></div>
+  <div id="details" hidden>
+    <div id="textbox" contenteditable="true" aria-label="Add a title"></div>
+    <div id="textbox" contenteditable="true" aria-label="Tell viewers about your video"></div>
+  </div>
+  <div id="visibility" hidden>
+    <tp-yt-paper-radio-button name="private">Private</tp-yt-paper-radio-button>
+    <tp-yt-paper-radio-button name="unlisted">Unlisted</tp-yt-paper-radio-button>
+    <tp-yt-paper-radio-button name="public">Public</tp-yt-paper-radio-button>
+    <button id="publish">Publish</button>
+  </div>
+  <button id="next" hidden>Next</button>
+  <div id="status"></div>
+</div>
+"""
+
+STUDIO_SCRIPT = """
+const dialog = document.getElementById('upload-dialog');
+const next = document.getElementById('next');
+let step = 0, upload = null, visibility = 'private';
+document.getElementById('create-icon').addEventListener('click', () => document.getElementById('create-menu').hidden = false);
+document.querySelector('tp-yt-paper-item').addEventListener('click', () => {
+  document.getElementById('create-menu').hidden = true;
+  dialog.hidden = false;
+});
+document.querySelector('input[type="file"]').addEventListener('change', (event) => {
+  const file = event.target.files[0];
+  upload = {name: file.name, size: file.size};
+  document.getElementById('processing').textContent = 'Uploading ' + file.name;
+  setTimeout(() => {
+    document.getElementById('processing').textContent = 'Processing complete';
+    document.getElementById('details').hidden = false;
+    next.hidden = false;
+  }, CONFIG.upload_processing_ms);
+});
+// Details -> Video elements -> Checks -> Visibility
+next.addEventListener('click', () => {
+  step += 1;
+  document.getElementById('details').hidden = step > 0;
+  if (step >= 3) {
+    next.hidden = true;
+    document.getElementById('visibility').hidden = false;
+  }
+});
+document.querySelectorAll('tp-yt-paper-radio-button').forEach((radio) => radio.addEventListener('click', () => {
+  visibility = radio.getAttribute('name');
+}));
+document.getElementById('publish').addEventListener('click', async () => {
+  const [title, description] = document.querySelectorAll('#textbox');
+  await fetch('/studio/publish', {method: 'POST', body: JSON.stringify({
+    ...upload, title: title.textContent, description: description.textContent, visibility
+  })});
+  document.getElementById('status').textContent = 'Video published';
+});
+"""
+
+
+class MockApps:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0,
+        open_email_ms: int = 200,
+        generation_ms: int = 3000,
+        upload_processing_ms: int = 1000,
+        video_bytes: int = 2_000_000,
+        inbox_rows: int = 50,
+        email: dict = None,
+    ):
+        self.latency_ms = latency_ms
+        self.open_email_ms = open_email_ms
+        self.generation_ms = generation_ms
+        self.upload_processing_ms = upload_processing_ms
+        self.video_bytes = video_bytes
+        self.inbox_rows = inbox_rows
+        self.email = email or DEFAULT_EMAIL
+        self.published = []
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def urls(self) -> dict:
+        """Entry points in the shape GmailGeminiYouTubeWorkflow takes"""
+        return {app: f"{self.base_url}/{app}" for app in ("gmail", "gemini", "studio")}
+
+    def start(self) -> "MockApps":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _emails(self) -> list:
+        # The workflow's email sits among filler rows from other senders, newest first
+        filler = [
+            {"sender": f"Sender {i}", "subject": f"Newsletter #{i}", "body": f"Newsletter body {i}\n" * 20}
+            for i in range(self.inbox_rows - 1)
+        ]
+        return filler[:3] + [self.email] + filler[3:]
+
+    def gmail_html(self) -> str:
+        emails = self._emails()
+        rows = "\n".join(
+            f'<tr class="zA" data-index="{i}"><td class="yX">{html.escape(e["sender"])}</td>'
+            f'<td class="y6">{html.escape(e["subject"])}</td></tr>'
+            for i, e in enumerate(emails)
+        )
+        return self._page("Inbox - Gmail", GMAIL_BODY.format(rows=rows), GMAIL_SCRIPT,
+                          {"emails": emails, "open_email_ms": self.open_email_ms})
+
+    def gemini_html(self) -> str:
+        return self._page("Gemini", GEMINI_BODY, GEMINI_SCRIPT, {"generation_ms": self.generation_ms})
+
+    def studio_html(self) -> str:
+        return self._page("Channel content - YouTube Studio", STUDIO_BODY, STUDIO_SCRIPT,
+                          {"upload_processing_ms": self.upload_processing_ms})
+
+    @staticmethod
+    def _page(title: str, body: str, script: str, config: dict) -> str:
+        return PAGE.format(title=title, body=body, script=script, config=json.dumps(config).replace("</", "<\\/"))
+
+    def _route(self, path: str):
+        """Return (status, content type, body, extra headers) for a GET path"""
+        if path == "/gmail":
+            return 200, "text/html; charset=utf-8", self.gmail_html().encode(), {}
+        if path == "/gemini":
+            return 200, "text/html; charset=utf-8", self.gemini_html().encode(), {}
+        if path == "/studio":
+            return 200, "text/html; charset=utf-8", self.studio_html().encode(), {}
+        if path == "/gemini/video.mp4":
+            headers = {"Content-Disposition": 'attachment; filename="veo3_video.mp4"'}
+            return 200, "video/mp4", _payload(path, self.video_bytes), headers
+        return 404, "text/plain", b"not found", {}
+
+    def _handler_class(self):
+        apps = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, status: int, content_type: str, body: bytes, headers: dict):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                with apps._lock:
+                    apps.requests_served += 1
+
+            def do_GET(self):
+                if apps.latency_ms:
+                    time.sleep(apps.latency_ms / 1000)
+                self._respond(*apps._route(urlsplit(self.path).path))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if urlsplit(self.path).path != "/studio/publish":
+                    return self._respond(404, "text/plain", b"not found", {})
+                with apps._lock:
+                    apps.published.append(json.loads(body or b"{}"))
+                self._respond(200, "application/json", b'{"ok": true}', {})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the mock Gmail, Gemini and YouTube Studio apps")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--generation-ms", type=int, default=3000)
+    args = parser.parse_args()
+
+    apps = MockApps(port=args.port, latency_ms=args.latency_ms, generation_ms=args.generation_ms).start()
+    for app, url in apps.urls.items():
+        print(f"{app:8}{url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        apps.stop()
@@ -0,0 +1,315 @@
+"""
+In-memory MongoDB stand-in for offline benchmarks
+
+Speaks just enough of the wire protocol (OP_QUERY handshake, OP_MSG commands)
+for Motor/pymongo to connect and run the operations this backend uses:
+insert, find (filter, projection, sort, limit), update/replace with upsert,
+delete, createIndexes and ping. Filters support equality and the common
+comparison operators; updates support $set, $unset, $inc and $setOnInsert.
+Data lives in memory and is gone when the server stops.
+
+    mongo = MockMongo().start()
+    os.environ["MONGO_URL"] = mongo.url
+    ...
+    mongo.stop()
+"""
+
+import itertools
+import socketserver
+import struct
+import threading
+from datetime import datetime, timezone
+
+import bson
+
+OP_REPLY = 1
+OP_QUERY = 2004
+OP_MSG = 2013
+
+MORE_TO_COME = 1 << 1
+CHECKSUM_PRESENT = 1
+
+
+def _get(doc: dict, path: str):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+
+def _compare(value, op: str, arg) -> bool:
+    if op == "$eq":
+        return value == arg
+    if op == "$ne":
+        return value != arg
+    if op == "$in":
+        return value in arg
+    if op == "$nin":
+        return value not in arg
+    if op == "$exists":
+        return (value is not None) == bool(arg)
+    if value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > arg
+        if op == "$gte":
+            return value >= arg
+        if op == "$lt":
+            return value < arg
+        if op == "$lte":
+            return value <= arg
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported query operator {op}")
+
+
+def matches(doc: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            value = _get(doc, key)
+            if not all(_compare(value, op, arg) for op, arg in condition.items()):
+                return False
+        elif _get(doc, key) != condition:
+            return False
+    return True
+
+
+def _project(doc: dict, projection: dict) -> dict:
+    if not projection:
+        return doc
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        result = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+def _apply_update(doc: dict, update: dict, inserting: bool = False) -> dict:
+    if not any(k.startswith("$") for k in update):
+        return {"_id": doc["_id"], **update} if "_id" in doc else dict(update)
+    doc = dict(doc)
+    for op, fields in update.items():
+        for key, value in fields.items():
+            if op == "$set":
+                doc[key] = value
+            elif op == "$unset":
+                doc.pop(key, None)
+            elif op == "$inc":
+                doc[key] = doc.get(key, 0) + value
+            elif op == "$setOnInsert":
+                if inserting:
+                    doc[key] = value
+            else:
+                raise ValueError(f"Unsupported update operator {op}")
+    return doc
+
+
+class MockMongo:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.collections = {}  # (db, collection) -> {_id: doc}
+        self.commands = {}  # command name -> count
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"mongodb://{host}:{port}/?directConnection=true"
+
+    def start(self) -> "MockMongo":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _collection(self, db: str, name: str) -> dict:
+        return self.collections.setdefault((db, name), {})
+
+    def _hello(self) -> dict:
+        return {
+            "ismaster": True,
+            "isWritablePrimary": True,
+            "helloOk": True,
+            "maxBsonObjectSize": 16 * 1024 * 1024,
+            "maxMessageSizeBytes": 48_000_000,
+            "maxWriteBatchSize": 100_000,
+            "localTime": datetime.now(timezone.utc),
+            "connectionId": next(self._ids),
+            "minWireVersion": 0,
+            "maxWireVersion": 17,
+            "readOnly": False,
+            "ok": 1.0,
+        }
+
+    def run_command(self, db: str, cmd: dict) -> dict:
+        name = next(iter(cmd))
+        with self._lock:
+            self.commands[name] = self.commands.get(name, 0) + 1
+            try:
+                return self._dispatch(db, name, cmd)
+            except ValueError as e:
+                return {"ok": 0.0, "errmsg": str(e), "code": 2}
+
+    def _dispatch(self, db: str, name: str, cmd: dict) -> dict:
+        lowered = name.lower()
+        if lowered in ("hello", "ismaster"):
+            return self._hello()
+        if lowered in ("ping", "endsessions", "killcursors"):
+            return {"ok": 1.0}
+        if lowered == "buildinfo":
+            return {"version": "6.0.0", "versionArray": [6, 0, 0, 0], "ok": 1.0}
+        if name == "createIndexes":
+            return {"numIndexesBefore": 1, "numIndexesAfter": 1 + len(cmd.get("indexes", [])), "ok": 1.0}
+
+        coll = self._collection(db, cmd[name])
+        if name == "insert":
+            for doc in cmd["documents"]:
+                if doc["_id"] in coll:
+                    return {"n": 0, "writeErrors": [{"index": 0, "code": 11000, "errmsg": "duplicate key"}], "ok": 1.0}
+                coll[doc["_id"]] = doc
+            return {"n": len(cmd["documents"]), "ok": 1.0}
+        if name == "find":
+            docs = [d for d in coll.values() if matches(d, cmd.get("filter", {}))]
+            for key, direction in reversed(list(cmd.get("sort", {}).items())):
+                docs.sort(key=lambda d: (_get(d, key) is not None, _get(d, key)), reverse=direction < 0)
+            docs = docs[cmd.get("skip", 0):]
+            if cmd.get("limit"):
+                docs = docs[:abs(cmd["limit"])]
+            batch = [_project(d, cmd.get("projection")) for d in docs]
+            return {"cursor": {"id": bson.int64.Int64(0), "ns": f"{db}.{cmd[name]}", "firstBatch": batch}, "ok": 1.0}
+        if name == "count":
+            return {"n": sum(1 for d in coll.values() if matches(d, cmd.get("query", {}))), "ok": 1.0}
+        if name == "update":
+            n = modified = 0
+            upserted = []
+            for i, spec in enumerate(cmd["updates"]):
+                hits = [k for k, d in coll.items() if matches(d, spec["q"])]
+                if not spec.get("multi"):
+                    hits = hits[:1]
+                for key in hits:
+                    coll[key] = _apply_update(coll[key], spec["u"])
+                    modified += 1
+                n += len(hits)
+                if not hits and spec.get("upsert"):
+                    seed = {k: v for k, v in spec["q"].items() if not k.startswith("$") and not isinstance(v, dict)}
+                    doc = _apply_update(seed, spec["u"], inserting=True)
+                    doc.setdefault("_id", seed.get("_id", bson.ObjectId()))
+                    coll[doc["_id"]] = doc
+                    upserted.append({"index": i, "_id": doc["_id"]})
+                    n += 1
+            reply = {"n": n, "nModified": modified, "ok": 1.0}
+            if upserted:
+                reply["upserted"] = upserted
+            return reply
+        if name == "delete":
+            n = 0
+            for spec in cmd["deletes"]:
+                hits = [k for k, d in coll.items() if matches(d, spec["q"])]
+                if spec.get("limit"):
+                    hits = hits[:spec["limit"]]
+                for key in hits:
+                    del coll[key]
+                n += len(hits)
+            return {"n": n, "ok": 1.0}
+        if name == "drop":
+            self.collections.pop((db, cmd[name]), None)
+            return {"ok": 1.0}
+        raise ValueError(f"Command {name} not supported by MockMongo")
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def _read(self, n: int) -> bytes:
+                data = b""
+                while len(data) < n:
+                    chunk = self.request.recv(n - len(data))
+                    if not chunk:
+                        raise ConnectionError
+                    data += chunk
+                return data
+
+            def _send(self, request_id: int, op_code: int, body: bytes):
+                header = struct.pack("<iiii", 16 + len(body), next(mock._ids), request_id, op_code)
+                self.request.sendall(header + body)
+
+            def handle(self):
+                try:
+                    while True:
+                        length, request_id, _, op_code = struct.unpack("<iiii", self._read(16))
+                        payload = self._read(length - 16)
+                        if mock.latency_ms:
+                            threading.Event().wait(mock.latency_ms / 1000)
+                        if op_code == OP_QUERY:
+                            self._handle_query(request_id, payload)
+                        elif op_code == OP_MSG:
+                            self._handle_msg(request_id, payload)
+                        else:
+                            return
+                except ConnectionError:
+                    pass
+
+            def _handle_query(self, request_id: int, payload: bytes):
+                # flags, "<db>.$cmd\0", skip, limit, query
+                end = payload.index(b"\0", 4)
+                db = payload[4:end].decode().split(".")[0]
+                query = bson.decode(payload[end + 9:end + 9 + struct.unpack("<i", payload[end + 9:end + 13])[0]])
+                reply = bson.encode(mock.run_command(db, query))
+                self._send(request_id, OP_REPLY, struct.pack("<iqii", 0, 0, 0, 1) + reply)
+
+            def _handle_msg(self, request_id: int, payload: bytes):
+                flags = struct.unpack("<I", payload[:4])[0]
+                end = len(payload) - (4 if flags & CHECKSUM_PRESENT else 0)
+                pos, body = 4, {}
+                while pos < end:
+                    kind = payload[pos]
+                    pos += 1
+                    size = struct.unpack("<i", payload[pos:pos + 4])[0]
+                    if kind == 0:
+                        body.update(bson.decode(payload[pos:pos + size]))
+                    else:
+                        # Document sequence: size, identifier, documents
+                        name_end = payload.index(b"\0", pos + 4)
+                        identifier = payload[pos + 4:name_end].decode()
+                        body[identifier] = bson.decode_all(payload[name_end + 1:pos + size])
+                    pos += size
+                reply = mock.run_command(body.pop("$db", "admin"), body)
+                if not flags & MORE_TO_COME:
+                    self._send(request_id, OP_MSG, struct.pack("<IB", 0, 0) + bson.encode(reply))
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Serve an in-memory MongoDB stand-in")
+    parser.add_argument("--port", type=int, default=27018)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    mongo = MockMongo(port=args.port, latency_ms=args.latency_ms).start()
+    print(f"Mock MongoDB on {mongo.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mongo.stop()
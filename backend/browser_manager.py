@@ -1,10 +1,19 @@
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 import asyncio
+import base64
 import os
 from pathlib import Path
 import logging
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
 import uuid
+import time
+
+from profile_state import ProfileStateCache, safe_profile_name
+from routing_policy import routing_policies
+from response_cache import response_cache
+from navigation import Readiness, page_navigator
+from tab_registry import TabRegistry
+from metrics import screenshot_capture_seconds, screenshot_encode_seconds, screenshot_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -14,60 +23,120 @@ class BrowserManager:
         self.browser: Optional[Browser] = None
         self.contexts: Dict[str, BrowserContext] = {}
         self.pages: Dict[str, Page] = {}
+        # Which context owns which tab, shared with the API's tab table
+        self.registry = TabRegistry()
+        self._listeners: Dict[str, List[Callable]] = {}
+        self.context_kwargs: Dict[str, dict] = {}  # context_id -> extra new_context() options
+        self._settings_lock = asyncio.Lock()
+        self._draining: set = set()
         self.user_data_dir = Path("/tmp/browser_profiles")
         self.user_data_dir.mkdir(exist_ok=True)
+        self.profile_state = ProfileStateCache(self.user_data_dir)
+        self.routing = routing_policies
+        self.response_cache = response_cache
+        self.navigator = page_navigator
+        self._state_refresh_task: Optional[asyncio.Task] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._untracked_seen: set = set()  # browser contexts seen unregistered by the last reap
+        self.reaped = {"runs": 0, "contexts": 0, "tabs": 0, "last": None}
         self.settings = {
             "browser_type": "chromium",
-            "headless": False,  # Default to HEADED mode for VNC streaming
+            # Default to HEADED mode for VNC streaming; BROWSER_HEADLESS=1 for benchmarks and CI
+            "headless": os.environ.get("BROWSER_HEADLESS", "").lower() in ("1", "true"),
             "viewport": {"width": 1920, "height": 1080},
             "user_agent": None,
             "timezone": None,
-            "language": "en-US"
+            "language": "en-US",
+            # Profiles that get a full on-disk Chromium profile (HTTP cache, IndexedDB, ...)
+            # via launch_persistent_context instead of a storage-state snapshot
+            "persistent_profiles": [],
+            "profile_state_max_age": 900,  # seconds before a snapshot is refreshed
+            "profile_state_refresh_interval": 120,
+            "reap_interval": 60,  # seconds between sweeps for leaked contexts and dead tabs
+            "idle_context_ttl": 300  # close contexts left without tabs this long; 0 keeps them
         }
 
     async def initialize(self):
         """Initialize Playwright and launch browser"""
         try:
-            self.playwright = await async_playwright().start()
+            await self.start_playwright()
             await self.launch_browser()
+            self.start_background_tasks()
             logger.info("Browser initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize browser: {e}")
             raise
 
+    async def start_playwright(self):
+        """Start the Playwright driver; a no-op once it is running"""
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+
+    def start_background_tasks(self):
+        self.start_state_refresher()
+        self.start_reaper()
+
     async def launch_browser(self):
         """Launch browser with current settings"""
         try:
-            browser_type = getattr(self.playwright, self.settings["browser_type"])
-            
-            # Launch args for VNC display support
-            launch_args = [
-                "--no-sandbox", 
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-blink-features=AutomationControlled",
-                "--disable-background-timer-throttling",
-                "--disable-backgrounding-occluded-windows",
-                "--disable-renderer-backgrounding"
-            ]
-            
-            # If headed mode, use VNC display
-            if not self.settings["headless"]:
-                os.environ["DISPLAY"] = ":99"
-            
-            self.browser = await browser_type.launch(
-                headless=self.settings["headless"],
-                args=launch_args
-            )
+            self.browser = await self._launch()
+            self._emit("browser_launched", self.browser)
             logger.info(f"Browser launched: {self.settings['browser_type']} (headless={self.settings['headless']}, DISPLAY={os.environ.get('DISPLAY', 'None')})")
         except Exception as e:
             logger.error(f"Failed to launch browser: {e}")
             raise
 
+    async def _launch(self) -> Browser:
+        browser_type = getattr(self.playwright, self.settings["browser_type"])
+        return await browser_type.launch(**self._launch_options())
+
+    def add_listener(self, event: str, callback: Callable):
+        """Subscribe to "browser_launched" (browser), "context_created" (context_id, profile),
+        "context_closed" (context_id), "page_created" (page_id, page), "page_closed" (page_id)
+        or "page_discarded" (page_id)"""
+        self._listeners.setdefault(event, []).append(callback)
+
+    def _emit(self, event: str, *args):
+        for callback in self._listeners.get(event, []):
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"Listener for {event} failed: {e}")
+
+    def _launch_options(self) -> dict:
+        """Launch options shared by launch() and launch_persistent_context()"""
+        # Launch args for VNC display support
+        launch_args = [
+            "--no-sandbox", 
+            "--disable-setuid-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-blink-features=AutomationControlled",
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding"
+        ]
+        
+        # If headed mode, use VNC display
+        if not self.settings["headless"]:
+            os.environ["DISPLAY"] = ":99"
+        
+        return {"headless": self.settings["headless"], "args": launch_args}
+
     async def create_context(self, profile_name: str = "default", **kwargs):
         """Create a new browser context (profile)"""
         context_id = str(uuid.uuid4())
+        context = await self._open_context(self.browser, profile_name, kwargs)
         
+        self.contexts[context_id] = context
+        self.registry.add_context(context_id, profile_name)
+        self.context_kwargs[context_id] = kwargs
+        self._emit("context_created", context_id, profile_name)
+        
+        logger.info(f"Created context: {context_id} with profile: {profile_name}")
+        return context_id, context
+
+    async def _open_context(self, browser: Browser, profile_name: str, kwargs: dict) -> BrowserContext:
+        """Open a context for a profile on the given browser using current settings"""
         context_options = {
             "viewport": self.settings["viewport"],
             "user_agent": self.settings["user_agent"],
@@ -76,62 +145,252 @@ class BrowserManager:
         }
         
         # Add persistent storage
-        profile_dir = self.user_data_dir / profile_name
+        profile_dir = self.user_data_dir / safe_profile_name(profile_name)
         profile_dir.mkdir(exist_ok=True)
         
         context_options.update(kwargs)
         
-        context = await self.browser.new_context(**context_options)
-        self.contexts[context_id] = context
+        if profile_name in self.settings["persistent_profiles"]:
+            # Full Chromium user data dir: cookies, HTTP cache and site storage survive restarts
+            browser_type = getattr(self.playwright, self.settings["browser_type"])
+            context = await browser_type.launch_persistent_context(
+                str(profile_dir / "user_data"),
+                **self._launch_options(),
+                **context_options
+            )
+        else:
+            # Restore the last storage-state snapshot so the profile starts logged in
+            if "storage_state" not in context_options:
+                state_path = self.profile_state.get(profile_name)
+                if state_path:
+                    context_options["storage_state"] = state_path
+                    logger.info(f"Restoring storage state for profile: {profile_name}")
+            context = await browser.new_context(**context_options)
         
-        logger.info(f"Created context: {context_id} with profile: {profile_name}")
-        return context_id, context
+        try:
+            router = await self.routing.attach(context, profile_name)
+            await self.response_cache.attach(context, profile_name, router)
+        except Exception:
+            await context.close()
+            raise
+        return context
+
+    def is_persistent_context(self, context_id: str) -> bool:
+        return self.registry.profile_of(context_id) in self.settings["persistent_profiles"]
+
+    async def save_profile_state(self, context_id: str) -> bool:
+        """Snapshot a context's cookies and localStorage for its profile"""
+        if context_id not in self.contexts or self.is_persistent_context(context_id):
+            return False
+        profile_name = self.registry.profile_of(context_id) or "default"
+        return await self.profile_state.save(profile_name, self.contexts[context_id])
+
+    async def refresh_stale_profile_states(self):
+        """Re-snapshot every live profile whose saved state is older than the max age"""
+        self.profile_state.max_age = self.settings["profile_state_max_age"]
+        refreshed = set()
+        for context_id in list(self.contexts.keys()):
+            profile_name = self.registry.profile_of(context_id)
+            if profile_name is None or profile_name in refreshed or self.is_persistent_context(context_id):
+                continue
+            if self.profile_state.is_stale(profile_name):
+                if await self.save_profile_state(context_id):
+                    refreshed.add(profile_name)
+        return refreshed
+
+    def start_state_refresher(self):
+        """Start the background task that keeps profile snapshots fresh"""
+        if self._state_refresh_task and not self._state_refresh_task.done():
+            return
+        self._state_refresh_task = asyncio.create_task(self._state_refresh_loop())
+
+    async def _state_refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.settings["profile_state_refresh_interval"])
+            try:
+                await self.refresh_stale_profile_states()
+            except Exception as e:
+                logger.error(f"Profile state refresh failed: {e}")
+
+    async def reap_orphans(self) -> dict:
+        """Reclaim what the registry no longer accounts for.
+
+        - tabs whose page died without close_page (window.close(), a renderer
+          that never came back) are dropped from the registry
+        - browser contexts that were never registered, e.g. left behind by a
+          create_context that failed half-way, are closed once they have been
+          seen unregistered on two consecutive sweeps
+        - contexts that have owned no tabs for idle_context_ttl are closed,
+          saving their storage state first
+        """
+        # Never race a blue/green restart or crash recovery, which build contexts before registering them
+        async with self._settings_lock:
+            report = {"time": time.time(), "tabs": [], "contexts": [], "untracked_contexts": 0}
+            
+            for page_id, page in list(self.pages.items()):
+                if page.is_closed():
+                    self.discard_page(page_id)
+                    report["tabs"].append(page_id)
+            
+            if self.browser and self.browser.is_connected():
+                known = set(self.contexts.values())
+                untracked = [c for c in self.browser.contexts if c not in known]
+                for context in untracked:
+                    if context in self._untracked_seen:
+                        try:
+                            await context.close()
+                            report["untracked_contexts"] += 1
+                        except Exception as e:
+                            logger.warning(f"Failed to close leaked context: {e}")
+                self._untracked_seen = {c for c in untracked if c not in self._untracked_seen}
+            
+            ttl = self.settings["idle_context_ttl"]
+            if ttl:
+                for context_id in self.registry.idle_contexts(ttl):
+                    try:
+                        await self.close_context(context_id)
+                        report["contexts"].append(context_id)
+                    except Exception as e:
+                        logger.warning(f"Failed to close idle context {context_id}: {e}")
+        
+        self.reaped["runs"] += 1
+        self.reaped["tabs"] += len(report["tabs"])
+        self.reaped["contexts"] += len(report["contexts"]) + report["untracked_contexts"]
+        self.reaped["last"] = report
+        if report["tabs"] or report["contexts"] or report["untracked_contexts"]:
+            logger.info(f"Reaped {len(report['tabs'])} dead tabs, {len(report['contexts'])} idle contexts "
+                        f"and {report['untracked_contexts']} leaked contexts")
+        return report
 
-    async def create_page(self, context_id: str):
+    def start_reaper(self):
+        """Start the background sweep for leaked contexts and dead tabs"""
+        if self._reaper_task and not self._reaper_task.done():
+            return
+        self._reaper_task = asyncio.create_task(self._reaper_loop())
+
+    async def _reaper_loop(self):
+        while True:
+            await asyncio.sleep(self.settings["reap_interval"])
+            try:
+                await self.reap_orphans()
+            except Exception as e:
+                logger.error(f"Orphan reaper failed: {e}")
+
+    async def create_page(self, context_id: str, page_id: Optional[str] = None):
         """Create a new page in a context"""
         if context_id not in self.contexts:
             raise ValueError(f"Context {context_id} not found")
         
-        page_id = str(uuid.uuid4())
+        page_id = page_id or str(uuid.uuid4())
         context = self.contexts[context_id]
         page = await context.new_page()
         
         self.pages[page_id] = page
+        self.registry.add_tab(page_id, context_id, page)
+        self._emit("page_created", page_id, page)
         logger.info(f"Created page: {page_id} in context: {context_id}")
         
         return page_id, page
 
-    async def navigate(self, page_id: str, url: str):
-        """Navigate page to URL"""
+    async def navigate(self, page_id: str, url: str, readiness: Optional[Readiness] = None,
+                       timeout: Optional[int] = None) -> dict:
+        """Navigate page to URL and wait for readiness; returns a timing breakdown"""
+        if page_id not in self.pages:
+            raise ValueError(f"Page {page_id} not found")
+        
+        page = self.pages[page_id]
+        result = await self.navigator.navigate(page, url, readiness, timeout)
+        logger.info(f"Navigated page {page_id} to {url} (ready={result['ready']}, {result['timings_ms']['ready']} ms)")
+        return result
+
+    async def snapshot_page(self, page_id: str) -> dict:
+        """Capture what is needed to reopen a page later (URL and scroll position)"""
+        if page_id not in self.pages:
+            raise ValueError(f"Page {page_id} not found")
+        return await self._snapshot_page(self.pages[page_id])
+
+    async def reopen_page(self, page_id: str, context_id: str, snapshot: dict) -> Page:
+        """Recreate a page under its old id from a snapshot_page() result"""
+        if context_id not in self.contexts:
+            raise ValueError(f"Context {context_id} not found")
+        page = await self._restore_page(self.contexts[context_id], snapshot)
+        self.pages[page_id] = page
+        if page_id in self.registry.tabs:
+            self.registry.set_page(page_id, page)
+        else:
+            self.registry.add_tab(page_id, context_id, page, url=snapshot["url"])
+        self._emit("page_created", page_id, page)
+        logger.info(f"Reopened page: {page_id} at {snapshot['url']}")
+        return page
+
+    async def capture_thumbnail(self, page_id: str, width: int = 320, quality: int = 50) -> bytes:
+        """Capture a small, low-quality JPEG preview of the visible viewport"""
         if page_id not in self.pages:
             raise ValueError(f"Page {page_id} not found")
         
         page = self.pages[page_id]
-        await page.goto(url, wait_until="domcontentloaded")
-        logger.info(f"Navigated page {page_id} to {url}")
+        viewport = page.viewport_size or self.settings["viewport"]
+        if self.settings["browser_type"] == "chromium":
+            # Let the compositor downscale instead of encoding a full-size frame
+            cdp = await page.context.new_cdp_session(page)
+            try:
+                with screenshot_capture_seconds.time("thumbnail"):
+                    result = await cdp.send("Page.captureScreenshot", {
+                        "format": "jpeg",
+                        "quality": quality,
+                        "clip": {
+                            "x": 0, "y": 0,
+                            "width": viewport["width"], "height": viewport["height"],
+                            "scale": min(1.0, width / viewport["width"])
+                        }
+                    })
+            finally:
+                await cdp.detach()
+            with screenshot_encode_seconds.time("thumbnail"):
+                thumbnail = base64.b64decode(result["data"])
+        else:
+            with screenshot_capture_seconds.time("thumbnail"):
+                thumbnail = await page.screenshot(type="jpeg", quality=quality, scale="css", animations="disabled")
+        screenshot_bytes.inc("thumbnail", amount=len(thumbnail))
+        return thumbnail
 
     async def get_page(self, page_id: str) -> Optional[Page]:
         """Get page by ID"""
         return self.pages.get(page_id)
 
-    async def close_page(self, page_id: str):
-        """Close a page"""
+    async def close_page(self, page_id: str, keep_tab: bool = False):
+        """Close a page; keep_tab leaves the tab registered without a page (hibernation)"""
         if page_id in self.pages:
             await self.pages[page_id].close()
             del self.pages[page_id]
             logger.info(f"Closed page: {page_id}")
+        if keep_tab:
+            if page_id in self.registry.tabs:
+                self.registry.set_page(page_id, None)
+        elif self.registry.remove_tab(page_id) is not None:
+            self._emit("page_closed", page_id)
+
+    def discard_page(self, page_id: str):
+        """Forget a tab whose page is already gone (crashed, failed to restore, closed by the site)"""
+        self.pages.pop(page_id, None)
+        if self.registry.remove_tab(page_id) is not None:
+            self._emit("page_discarded", page_id)
 
-    async def close_context(self, context_id: str):
+    async def close_context(self, context_id: str, save_state: bool = True):
         """Close a context"""
         if context_id in self.contexts:
+            if save_state:
+                await self.save_profile_state(context_id)
+            
             # Close all pages in this context
-            pages_to_close = [pid for pid, page in self.pages.items() 
-                            if page.context == self.contexts[context_id]]
-            for pid in pages_to_close:
+            for pid in self.registry.pages_of(context_id):
                 await self.close_page(pid)
             
             await self.contexts[context_id].close()
             del self.contexts[context_id]
+            self.registry.remove_context(context_id)
+            self.context_kwargs.pop(context_id, None)
+            self._emit("context_closed", context_id)
             logger.info(f"Closed context: {context_id}")
 
     async def take_screenshot(self, page_id: str, path: Optional[str] = None) -> bytes:
@@ -141,12 +400,14 @@ class BrowserManager:
         
         page = self.pages[page_id]
         # Optimize screenshot: reduce quality for faster loading, use JPEG
-        screenshot = await page.screenshot(
-            full_page=False, 
-            type="jpeg", 
-            quality=75,
-            animations="disabled"  # Disable animations for consistent screenshots
-        )
+        with screenshot_capture_seconds.time("screenshot"):
+            screenshot = await page.screenshot(
+                full_page=False, 
+                type="jpeg", 
+                quality=75,
+                animations="disabled"  # Disable animations for consistent screenshots
+            )
+        screenshot_bytes.inc("screenshot", amount=len(screenshot))
         
         if path:
             with open(path, "wb") as f:
@@ -154,34 +415,219 @@ class BrowserManager:
         
         return screenshot
 
-    async def update_settings(self, new_settings: dict):
-        """Update browser settings and restart if needed"""
-        restart_required = False
+    async def update_settings(self, new_settings: dict) -> dict:
+        """Update browser settings and hot-swap the browser if needed"""
+        async with self._settings_lock:
+            restart_required = False
+            
+            for key in ["browser_type", "headless"]:
+                if key in new_settings and new_settings[key] != self.settings[key]:
+                    restart_required = True
+            
+            self.settings.update(new_settings)
+            
+            if restart_required and self.browser:
+                return await self._blue_green_restart()
+            return {"restarted": False}
+
+    async def _snapshot_page(self, page: Page) -> dict:
+        snapshot = {"url": page.url, "scroll": [0, 0]}
+        try:
+            snapshot["scroll"] = await page.evaluate("() => [window.scrollX, window.scrollY]")
+        except Exception:
+            pass
+        return snapshot
+
+    async def _restore_page(self, context: BrowserContext, snapshot: dict, timeout: int = 15000) -> Page:
+        page = await context.new_page()
+        url = snapshot["url"]
+        if url and url != "about:blank":
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+                x, y = snapshot["scroll"]
+                if x or y:
+                    await page.evaluate("([x, y]) => window.scrollTo(x, y)", [x, y])
+            except Exception as e:
+                # Keep the tab even if the site is slow; it stays at whatever loaded
+                logger.warning(f"Restoring {url} was incomplete: {e}")
+        return page
+
+    async def _blue_green_restart(self) -> dict:
+        """Launch a new browser next to the old one, restore every context and tab
+        into it in parallel, then swap atomically and drain the old browser.
+
+        Context and page ids are preserved, so callers only need to pick up the new
+        Page objects from self.pages. Persistent-profile contexts run outside the
+        shared browser and are carried over untouched.
+        """
+        started = time.perf_counter()
+        old_browser = self.browser
         
-        for key in ["browser_type", "headless"]:
-            if key in new_settings and new_settings[key] != self.settings[key]:
-                restart_required = True
+        # Blue: snapshot storage state and tabs while the old browser keeps serving
+        migrating = [cid for cid in self.contexts if not self.is_persistent_context(cid)]
+        page_ids = [pid for pid in self.pages if self.registry.context_of(pid) in migrating]
         
-        self.settings.update(new_settings)
+        async def snapshot_context(cid):
+            try:
+                return await self.contexts[cid].storage_state()
+            except Exception as e:
+                logger.warning(f"Could not snapshot storage state of context {cid}: {e}")
+                return None
         
-        if restart_required and self.browser:
-            await self.browser.close()
-            await self.launch_browser()
-            logger.info("Browser restarted with new settings")
+        states = await asyncio.gather(*(snapshot_context(cid) for cid in migrating))
+        page_snapshots = await asyncio.gather(*(self._snapshot_page(self.pages[pid]) for pid in page_ids))
+        snapshot_done = time.perf_counter()
+        
+        # Green: launch alongside the old browser
+        new_browser = await self._launch()
+        launch_done = time.perf_counter()
+        
+        try:
+            new_contexts, new_pages, failed = await self._rebuild(
+                new_browser, dict(zip(migrating, states)), dict(zip(page_ids, page_snapshots))
+            )
+        except Exception:
+            await new_browser.close()
+            raise
+        restore_done = time.perf_counter()
+        
+        self._swap_in(new_browser, new_contexts, new_pages, page_ids)
+        swap_done = time.perf_counter()
+        
+        self._drain(old_browser)
+        
+        report = {
+            "restarted": True,
+            "contexts": len(new_contexts),
+            "restored_tabs": list(new_pages),
+            "failed_tabs": failed,
+            "timings_ms": {
+                "snapshot": round((snapshot_done - started) * 1000, 1),
+                "launch": round((launch_done - snapshot_done) * 1000, 1),
+                "restore": round((restore_done - launch_done) * 1000, 1),
+                "swap": round((swap_done - restore_done) * 1000, 3),
+                "total": round((swap_done - started) * 1000, 1),
+            }
+        }
+        logger.info(f"Browser hot-swapped: {len(new_pages)} tabs in {len(new_contexts)} contexts, "
+                    f"{report['timings_ms']['total']} ms total")
+        return report
+
+    async def recover_from_crash(self) -> dict:
+        """Relaunch after the browser died and rebuild every context and tab under its old id.
+
+        Live storage state is gone with the browser, so contexts come back from
+        their profile snapshots on disk; tabs reopen at their last known URL.
+        """
+        async with self._settings_lock:
+            started = time.perf_counter()
+            migrating = [cid for cid in self.contexts if not self.is_persistent_context(cid)]
+            page_ids = [pid for pid in self.pages if self.registry.context_of(pid) in migrating]
+            snapshots = {pid: {"url": self.pages[pid].url, "scroll": [0, 0]} for pid in page_ids}
+            
+            new_browser = await self._launch()
+            try:
+                new_contexts, new_pages, failed = await self._rebuild(
+                    new_browser, {cid: None for cid in migrating}, snapshots
+                )
+            except Exception:
+                await new_browser.close()
+                raise
+            self._swap_in(new_browser, new_contexts, new_pages, page_ids)
+        
+        return {
+            "contexts": len(new_contexts),
+            "restored_tabs": list(new_pages),
+            "failed_tabs": failed,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    async def _rebuild(self, browser: Browser, states: Dict[str, Optional[dict]], snapshots: Dict[str, dict]):
+        """Open the given contexts and pages on a browser in parallel.
+
+        states maps context_id -> storage state (None loads the profile snapshot);
+        snapshots maps page_id -> snapshot_page() result.
+        """
+        async def open_context(cid, state):
+            kwargs = dict(self.context_kwargs.get(cid, {}))
+            if state is not None:
+                kwargs["storage_state"] = state
+            return await self._open_context(browser, self.registry.profile_of(cid) or "default", kwargs)
+        
+        context_ids = list(states)
+        opened = await asyncio.gather(*(open_context(cid, states[cid]) for cid in context_ids))
+        new_contexts = dict(zip(context_ids, opened))
+        
+        page_ids = list(snapshots)
+        results = await asyncio.gather(
+            *(self._restore_page(new_contexts[self.registry.context_of(pid)], snapshots[pid]) for pid in page_ids),
+            return_exceptions=True
+        )
+        
+        new_pages = {}
+        failed = []
+        for pid, result in zip(page_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to restore tab {pid}: {result}")
+                failed.append(pid)
+            else:
+                new_pages[pid] = result
+        return new_contexts, new_pages, failed
+
+    def _swap_in(self, browser: Browser, new_contexts: Dict[str, BrowserContext], new_pages: Dict[str, Page], page_ids: List[str]):
+        """Point the manager at rebuilt objects; page_ids that failed to restore are dropped"""
+        # No awaits between these assignments, so no request sees a mix
+        self.browser = browser
+        for cid, context in new_contexts.items():
+            self.contexts[cid] = context
+        for pid in page_ids:
+            if pid in new_pages:
+                self.pages[pid] = new_pages[pid]
+                self.registry.set_page(pid, new_pages[pid])
+        self._emit("browser_launched", browser)
+        for pid in page_ids:
+            if pid not in new_pages:
+                self.discard_page(pid)
+        for pid, page in new_pages.items():
+            self._emit("page_created", pid, page)
+
+    def _drain(self, old_browser: Browser, grace: float = 5.0):
+        """Close the old browser after in-flight operations have had time to finish"""
+        async def drain():
+            await asyncio.sleep(grace)
+            try:
+                await old_browser.close()
+                logger.info("Old browser drained and closed")
+            except Exception as e:
+                logger.warning(f"Error closing drained browser: {e}")
+        
+        task = asyncio.create_task(drain())
+        self._draining.add(task)
+        task.add_done_callback(self._draining.discard)
 
     async def cleanup(self):
         """Cleanup all resources"""
-        for page_id in list(self.pages.keys()):
-            await self.close_page(page_id)
+        for task in (self._state_refresh_task, self._reaper_task):
+            if task:
+                task.cancel()
+        self._state_refresh_task = None
+        self._reaper_task = None
         
+        # Contexts first so their storage state is snapshotted while pages are still open
         for context_id in list(self.contexts.keys()):
             await self.close_context(context_id)
         
+        for page_id in list(self.pages.keys()):
+            await self.close_page(page_id)
+        
         if self.browser:
             await self.browser.close()
         
+        await self.response_cache.flush()
+        
         if self.playwright:
             await self.playwright.stop()
+            self.playwright = None
         
         logger.info("Browser manager cleaned up")
 
@@ -0,0 +1,187 @@
+from playwright.async_api import Browser, Page
+import asyncio
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Awaitable, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserCrashedError(RuntimeError):
+    """The browser or a tab's renderer crashed while an operation was running.
+
+    Retryable: the supervisor rebuilds the tab, so the same request can be sent again.
+    """
+    retryable = True
+
+
+class BrowserSupervisor:
+    """Watches for browser disconnects and renderer crashes and recovers from them"""
+
+    def __init__(self, browser_manager):
+        self.browser_manager = browser_manager
+        self.on_recovered: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None
+        self.browser_crashes = 0
+        self.renderer_crashes = 0
+        self.recoveries = deque(maxlen=20)
+        self.recovering = False
+        self._recovered = asyncio.Event()
+        self._recovered.set()
+        self._recovery_task: Optional[asyncio.Task] = None
+        self._page_recoveries: Set[asyncio.Task] = set()  # held so they are not collected mid-flight
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}  # page_id -> futures failed on crash
+        self._stopped = False
+        self.settings = {
+            "backoff_initial": 1.0,  # seconds before the second relaunch attempt
+            "backoff_max": 60.0,
+            "wait_for_recovery": 30.0  # how long a request waits on a recovery in progress
+        }
+        browser_manager.add_listener("browser_launched", self._watch_browser)
+        browser_manager.add_listener("page_created", self._watch_page)
+
+    def start(self, on_recovered: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        self.on_recovered = on_recovered
+        self._stopped = False
+
+    def stop(self):
+        """Stop recovering; called before an intentional shutdown"""
+        self._stopped = True
+        if self._recovery_task:
+            self._recovery_task.cancel()
+
+    def _watch_browser(self, browser: Browser):
+        browser.on("disconnected", lambda b: self._on_disconnected(b))
+
+    def _watch_page(self, page_id: str, page: Page):
+        page.on("crash", lambda p: self._on_page_crash(page_id, p))
+
+    def _on_disconnected(self, browser: Browser):
+        # Old browsers drained after a hot-swap disconnect on purpose
+        if self._stopped or browser is not self.browser_manager.browser:
+            return
+        self.browser_crashes += 1
+        logger.error(f"Browser disconnected unexpectedly (crash #{self.browser_crashes}); recovering")
+        self._fail_waiters(None, "Browser crashed")
+        if not self.recovering:
+            self.recovering = True
+            self._recovered.clear()
+            self._recovery_task = asyncio.create_task(self._recover_browser())
+
+    def _on_page_crash(self, page_id: str, page: Page):
+        if self._stopped or self.browser_manager.pages.get(page_id) is not page or self.recovering:
+            return
+        self.renderer_crashes += 1
+        logger.error(f"Renderer crashed for tab {page_id} (crash #{self.renderer_crashes}); reopening")
+        self._fail_waiters(page_id, "Tab renderer crashed")
+        task = asyncio.create_task(self._recover_page(page_id, page))
+        self._page_recoveries.add(task)
+        task.add_done_callback(self._page_recoveries.discard)
+
+    def _fail_waiters(self, page_id: Optional[str], reason: str):
+        """Fail guarded operations on one tab, or on every tab when page_id is None"""
+        targets = list(self._waiters) if page_id is None else [page_id]
+        for pid in targets:
+            for future in self._waiters.get(pid, ()):
+                if not future.done():
+                    future.set_exception(BrowserCrashedError(f"{reason} (tab {pid})"))
+
+    async def guard(self, page_id: str, awaitable: Awaitable):
+        """Run an operation on a tab, raising BrowserCrashedError instead of hanging if it crashes"""
+        crashed = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(page_id, set())
+        waiters.add(crashed)
+        task = asyncio.ensure_future(awaitable)
+        try:
+            done, _ = await asyncio.wait({task, crashed}, return_when=asyncio.FIRST_COMPLETED)
+            if task in done:
+                return task.result()
+            task.cancel()
+            raise crashed.exception()
+        finally:
+            waiters.discard(crashed)
+            if not waiters:
+                self._waiters.pop(page_id, None)
+            if not crashed.done():
+                crashed.cancel()
+
+    async def wait_until_healthy(self):
+        """Block a request while a browser recovery is in progress"""
+        if not self.recovering:
+            return
+        try:
+            await asyncio.wait_for(self._recovered.wait(), timeout=self.settings["wait_for_recovery"])
+        except asyncio.TimeoutError:
+            raise BrowserCrashedError("Browser is still recovering from a crash")
+
+    async def _recover_browser(self):
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while not self._stopped:
+                if attempt:
+                    delay = min(self.settings["backoff_max"], self.settings["backoff_initial"] * 2 ** (attempt - 1))
+                    logger.info(f"Relaunch attempt {attempt + 1} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                attempt += 1
+                try:
+                    report = await self.browser_manager.recover_from_crash()
+                    break
+                except Exception as e:
+                    logger.error(f"Browser relaunch attempt {attempt} failed: {e}")
+            else:
+                return
+            report.update({
+                "kind": "browser",
+                "time": time.time(),
+                "attempts": attempt,
+                "recovery_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+            self.recoveries.append(report)
+            logger.info(f"Browser recovered after {attempt} attempt(s) in {report['recovery_ms']} ms: "
+                        f"{len(report['restored_tabs'])} tabs restored")
+            if self.on_recovered:
+                await self.on_recovered(report)
+        finally:
+            self.recovering = False
+            self._recovered.set()
+
+    async def _recover_page(self, page_id: str, crashed_page: Page):
+        started = time.perf_counter()
+        context_id = self.browser_manager.registry.context_of(page_id)
+        try:
+            await self.browser_manager.reopen_page(page_id, context_id, {"url": crashed_page.url, "scroll": [0, 0]})
+            restored, failed = [page_id], []
+        except Exception as e:
+            logger.error(f"Failed to reopen crashed tab {page_id}: {e}")
+            self.browser_manager.discard_page(page_id)
+            restored, failed = [], [page_id]
+        try:
+            await crashed_page.close()
+        except Exception:
+            pass
+        report = {
+            "kind": "renderer",
+            "time": time.time(),
+            "restored_tabs": restored,
+            "failed_tabs": failed,
+            "recovery_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+        self.recoveries.append(report)
+        if self.on_recovered:
+            await self.on_recovered(report)
+
+    def crash_count(self) -> int:
+        return self.browser_crashes + self.renderer_crashes
+
+    def get_stats(self) -> Dict[str, Any]:
+        last = self.recoveries[-1] if self.recoveries else None
+        return {
+            "healthy": not self.recovering and self.browser_manager.browser is not None
+            and self.browser_manager.browser.is_connected(),
+            "recovering": self.recovering,
+            "browser_crashes": self.browser_crashes,
+            "renderer_crashes": self.renderer_crashes,
+            "last_recovery_ms": last["recovery_ms"] if last else None,
+            "recent_recoveries": list(self.recoveries)
+        }
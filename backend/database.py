@@ -0,0 +1,73 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Awaitable, Dict
+
+from metrics import mongo_operation_seconds, mongo_operation_failures
+
+logger = logging.getLogger(__name__)
+
+# Motor client options and the environment variables overriding them, read when the client is created
+CLIENT_OPTIONS = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", 100),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", 0),
+    "maxIdleTimeMS": ("MONGO_MAX_IDLE_TIME_MS", 60000),
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", 5000),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", 20000),
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000),
+}
+
+
+class Database:
+    """MongoDB connection opened on first use.
+
+    Motor and pymongo are imported lazily: they are a large share of the
+    server's import time and most requests never touch the database.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._db = None
+        self.options: Dict[str, int] = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            self.options = {option: int(os.environ.get(env, default)) for option, (env, default) in CLIENT_OPTIONS.items()}
+            self._client = AsyncIOMotorClient(os.environ['MONGO_URL'], **self.options)
+            logger.info(f"MongoDB client options: {self.options}")
+        return self._client
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = self.client[os.environ['DB_NAME']]
+        return self._db
+
+    async def ping(self, timeout: float = 5.0):
+        """Round-trip to the server; raises if it cannot be reached in time"""
+        await self.timed("ping", asyncio.wait_for(self.db.command("ping"), timeout=timeout))
+
+    @staticmethod
+    async def timed(operation: str, awaitable: Awaitable):
+        """Await a Motor call, recording its latency as mongo_operation_duration_seconds{operation}"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception:
+            mongo_operation_failures.inc(operation)
+            raise
+        finally:
+            mongo_operation_seconds.observe(time.perf_counter() - started, operation)
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            self._db = None
+
+
+mongo = Database()
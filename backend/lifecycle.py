@@ -0,0 +1,64 @@
+import asyncio
+import time
+import logging
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """Startup state of each subsystem, brought up in the background instead of blocking startup"""
+
+    def __init__(self, subsystems: List[str]):
+        self.started_at = time.time()
+        self.subsystems: Dict[str, Dict[str, Any]] = {
+            name: {"status": "pending", "error": None, "ready_ms": None} for name in subsystems
+        }
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def is_ready(self, name: str) -> bool:
+        return self.subsystems[name]["status"] == "ready"
+
+    async def run(self, name: str, step: Callable[[], Awaitable]):
+        """Run one bring-up step and record its outcome; steps that already succeeded are skipped"""
+        sub = self.subsystems[name]
+        if sub["status"] == "ready":
+            return
+        sub.update(status="starting", error=None)
+        started = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            sub.update(status="failed", error=str(e))
+            logger.error(f"Starting {name} failed: {e}")
+            raise
+        sub.update(status="ready", ready_ms=round((time.perf_counter() - started) * 1000, 1))
+        logger.info(f"{name} ready in {sub['ready_ms']} ms")
+
+    def start(self, key: str, bring_up: Callable[[], Awaitable]) -> asyncio.Task:
+        """Start a bring-up in the background unless it is running or already succeeded"""
+        task = self._tasks.get(key)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = self._tasks[key] = asyncio.create_task(bring_up())
+        return task
+
+    async def ensure(self, key: str, bring_up: Callable[[], Awaitable], timeout: Optional[float] = None):
+        """Wait for a bring-up, starting (or retrying) it on first use"""
+        task = self.start(key, bring_up)
+        if task.done():
+            return task.result()
+        return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+
+    def stop(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks = {}
+
+    def ready(self, required: List[str]) -> bool:
+        return all(self.is_ready(name) for name in required)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "subsystems": self.subsystems
+        }
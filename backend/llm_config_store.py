@@ -0,0 +1,122 @@
+import asyncio
+import time
+import uuid
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LLMConfigStore:
+    """Current LLM configuration, one document per provider, read through an in-process cache.
+
+    Writes upsert the provider's document and update the cache directly. Writes
+    by other workers invalidate it through a change stream when the deployment
+    supports them (replica sets); otherwise the cache expires after cache_ttl.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.collection = None
+        self._cache: Optional[Dict[str, Dict[str, Any]]] = None  # provider -> config
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+        self.change_streams = False
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self.settings = {
+            "cache_ttl": 30  # seconds; only used without change streams
+        }
+
+    async def start(self):
+        self.collection = self.database.db.llm_configs
+        await self._collapse_history()
+        timed = self.database.timed
+        await timed("llm_configs.create_index", self.collection.create_index("provider", unique=True))
+        await timed("llm_configs.create_index", self.collection.create_index([("updated_at", -1)]))
+        self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    async def _collapse_history(self):
+        """Older versions inserted a document per validation; keep only the newest per provider"""
+        seen, stale = set(), []
+        async for doc in self.collection.find({}, {"provider": 1}, sort=[("created_at", -1)]):
+            if doc.get("provider") in seen:
+                stale.append(doc["_id"])
+            seen.add(doc.get("provider"))
+        if stale:
+            await self.database.timed("llm_configs.delete_many", self.collection.delete_many({"_id": {"$in": stale}}))
+            logger.info(f"Removed {len(stale)} superseded LLM config documents")
+
+    async def _watch(self):
+        try:
+            async with self.collection.watch() as stream:
+                self.change_streams = True
+                async for _ in stream:
+                    self.invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"LLM config change streams unavailable ({e}); cache expires after {self.settings['cache_ttl']}s")
+        self.change_streams = False
+
+    def invalidate(self):
+        self._cache = None
+        self.stats["invalidations"] += 1
+
+    async def _configs(self) -> Dict[str, Dict[str, Any]]:
+        cache = self._cache
+        if cache is not None and (self.change_streams or time.monotonic() - self._loaded_at < self.settings["cache_ttl"]):
+            self.stats["hits"] += 1
+            return cache
+        async with self._lock:
+            # Another reader may have reloaded it while this one waited
+            if self._cache is not None and self._cache is not cache:
+                self.stats["hits"] += 1
+                return self._cache
+            self.stats["misses"] += 1
+            collection = self.collection if self.collection is not None else self.database.db.llm_configs
+            docs = await self.database.timed("llm_configs.find", collection.find({}, {"_id": 0}).to_list(None))
+            self._cache = {doc["provider"]: doc for doc in docs}
+            self._loaded_at = time.monotonic()
+            return self._cache
+
+    async def get(self, provider: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """One provider's config, or the most recently saved one"""
+        configs = await self._configs()
+        if provider:
+            return configs.get(provider)
+        return max(configs.values(), key=lambda c: c.get("updated_at") or c.get("created_at", ""), default=None)
+
+    async def save(self, provider: str, model: Optional[str], api_key: str) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc).isoformat()
+        fields = {
+            "provider": provider,
+            "model": model,
+            "updated_at": now,
+            "api_key_hash": api_key[:8] + "*" * 20  # Store only partial for security
+        }
+        on_insert = {"id": str(uuid.uuid4()), "created_at": now}
+        collection = self.collection if self.collection is not None else self.database.db.llm_configs
+        # Under the reload lock, so a reload that read before this write cannot replace the cache after it
+        async with self._lock:
+            await self.database.timed("llm_configs.update_one", collection.update_one(
+                {"provider": provider}, {"$set": fields, "$setOnInsert": on_insert}, upsert=True
+            ))
+            # Write-through, so this worker never serves its own stale config
+            if self._cache is not None:
+                self._cache[provider] = {**(self._cache.get(provider) or on_insert), **fields}
+            return self._cache[provider] if self._cache is not None else {**on_insert, **fields}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached_providers": sorted(self._cache) if self._cache is not None else None,
+            "change_streams": self.change_streams,
+            **self.stats,
+            "settings": self.settings
+        }
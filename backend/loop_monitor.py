@@ -0,0 +1,194 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import logging
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+
+from metrics import event_loop_lag_seconds, event_loop_slow_callbacks
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _describe(handle: asyncio.Handle) -> str:
+    """The coroutine behind a task step, or the plain callback's name"""
+    callback = handle._callback
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return f"task {owner.get_name()}: {getattr(coro, '__qualname__', repr(coro))}"
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def _offender(stack: List[traceback.FrameSummary]) -> Optional[str]:
+    """Innermost frame in this project's code: usually the line that blocked"""
+    for frame in reversed(stack):
+        if (frame.filename.startswith(BACKEND_DIR) and frame.filename != __file__
+                and "site-packages" not in frame.filename):
+            return f"{frame.name} ({os.path.relpath(frame.filename, BACKEND_DIR)}:{frame.lineno})"
+    return None
+
+
+class LoopMonitor:
+    """Event loop lag sampler and slow-callback detector.
+
+    Lag is how late a periodic timer fires: the time every tab, WebSocket
+    and request waited for the loop. Slow callbacks are found by timing each
+    loop step; a watchdog thread grabs the loop thread's stack while a step
+    is still running past the threshold, so the record shows where it blocked
+    rather than where it ended.
+    """
+
+    def __init__(self):
+        self.lag_ms: deque = deque(maxlen=2400)
+        self.recent: deque = deque(maxlen=50)
+        self.offenders: Dict[str, Dict[str, Any]] = {}
+        self.slow_callbacks = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._lag_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._original_run = None
+        # Step being run on the loop: (handle, started); written by the loop, read by the watchdog
+        self._current = None
+        self._captured = None  # (handle, stack) grabbed by the watchdog for the current step
+        self.settings = {
+            "lag_interval": 0.25,  # seconds between lag samples
+            "slow_callback_ms": 100,
+            "max_offenders": 100
+        }
+
+    def start(self):
+        if self._lag_task:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._lag_task = asyncio.create_task(self._sample_lag())
+        self._install()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        self._stop.set()
+        if self._original_run:
+            asyncio.events.Handle._run = self._original_run
+            self._original_run = None
+
+    async def _sample_lag(self):
+        while True:
+            interval = self.settings["lag_interval"]
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(0.0, time.perf_counter() - started - interval)
+            self.lag_ms.append(lag * 1000)
+            event_loop_lag_seconds.observe(lag)
+
+    def _install(self):
+        monitor = self
+        original = self._original_run = asyncio.events.Handle._run
+
+        def _run(handle):
+            # Only the monitored loop's thread is timed; other loops (e.g. in threads) pass through
+            if threading.get_ident() != monitor._loop_thread:
+                return original(handle)
+            started = time.perf_counter()
+            monitor._current = (handle, started)
+            try:
+                return original(handle)
+            finally:
+                monitor._current = None
+                elapsed = time.perf_counter() - started
+                if elapsed * 1000 >= monitor.settings["slow_callback_ms"]:
+                    monitor._record(handle, elapsed)
+
+        asyncio.events.Handle._run = _run
+
+    def _watch(self):
+        while not self._stop.wait(self.settings["slow_callback_ms"] / 4000):
+            current = self._current
+            if current is None or (self._captured and self._captured[0] is current[0]):
+                continue
+            handle, started = current
+            if (time.perf_counter() - started) * 1000 < self.settings["slow_callback_ms"]:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None and self._current is current:
+                self._captured = (handle, traceback.extract_stack(frame))
+
+    def _record(self, handle: asyncio.Handle, elapsed: float):
+        captured, self._captured = self._captured, None
+        stack = captured[1] if captured and captured[0] is handle else []
+        callback = _describe(handle)
+        key = _offender(stack) or callback
+        ms = round(elapsed * 1000, 1)
+        self.slow_callbacks += 1
+        event_loop_slow_callbacks.inc()
+
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": ms,
+            "offender": key,
+            "callback": callback,
+            "stack": traceback.format_list(stack[-15:]) if stack else []
+        }
+        self.recent.append(entry)
+        offender = self.offenders.get(key)
+        if offender is None:
+            if len(self.offenders) >= self.settings["max_offenders"]:
+                # Make room by dropping the offender that cost the least in total
+                del self.offenders[min(self.offenders, key=lambda k: self.offenders[k]["total_ms"])]
+            offender = self.offenders[key] = {"offender": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        offender["count"] += 1
+        offender["total_ms"] = round(offender["total_ms"] + ms, 1)
+        offender["max_ms"] = max(offender["max_ms"], ms)
+        offender.update(last_at=entry["at"], callback=callback, stack=entry["stack"])
+        logger.warning(f"Event loop blocked for {ms} ms by {key}")
+
+    def lag_percentiles(self) -> Dict[str, Any]:
+        if not self.lag_ms:
+            return {"samples": 0}
+        ordered = sorted(self.lag_ms)
+        return {
+            "samples": len(ordered),
+            "p50": round(_percentile(ordered, 0.50), 2),
+            "p95": round(_percentile(ordered, 0.95), 2),
+            "p99": round(_percentile(ordered, 0.99), 2),
+            "max": round(ordered[-1], 2)
+        }
+
+    def top_offenders(self, limit: int = 10) -> List[Dict[str, Any]]:
+        return sorted(self.offenders.values(), key=lambda o: o["total_ms"], reverse=True)[:limit]
+
+    def get_stats(self, limit: int = 10) -> Dict[str, Any]:
+        return {
+            "running": self._lag_task is not None,
+            "lag_ms": self.lag_percentiles(),
+            "slow_callbacks": self.slow_callbacks,
+            "top_offenders": self.top_offenders(limit),
+            "recent": list(self.recent)[-limit:],
+            "settings": self.settings
+        }
+
+    def reset(self):
+        self.lag_ms.clear()
+        self.recent.clear()
+        self.offenders.clear()
+        self.slow_callbacks = 0
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,247 @@
+from playwright.async_api import Page, Request, TimeoutError as PlaywrightTimeout
+import asyncio
+import time
+import logging
+from collections import deque
+from urllib.parse import urlsplit
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Hosts/paths known to hold long-poll or streaming connections open, which keep
+# "networkidle" from ever settling on Gmail, YouTube and friends
+DEFAULT_LONG_POLL = [
+    "mail.google.com/sync/",
+    "mail.google.com/mail/u/0/channel/",
+    "signaler-pa.clients6.google.com",
+    "play.google.com/log",
+    "www.youtube.com/youtubei/v1/log_event",
+    "studio.youtube.com/youtubei/v1/notification",
+    "gemini.google.com/_/BardChatUi/data/batchexecute",
+]
+
+# Navigation Timing entry relative to navigation start, in ms
+NAVIGATION_TIMING_JS = """() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) return null;
+    return {
+        ttfb: nav.responseStart,
+        dom_content_loaded: nav.domContentLoadedEventEnd || null,
+        load: nav.loadEventEnd || null,
+        transfer_size: nav.transferSize
+    };
+}"""
+
+
+class Readiness:
+    """When a navigated page counts as ready; every condition given must hold"""
+
+    def __init__(
+        self,
+        selector: Optional[str] = None,
+        network_quiet_ms: Optional[int] = None,
+        js: Optional[str] = None,
+        ignore_hosts: Optional[List[str]] = None,
+        long_request_ms: int = 5000,
+    ):
+        self.selector = selector
+        self.network_quiet_ms = network_quiet_ms
+        self.js = js
+        self.ignore = list(DEFAULT_LONG_POLL) + list(ignore_hosts or [])
+        # Requests open longer than this are treated as long-poll and stop counting
+        self.long_request_ms = long_request_ms
+
+    @classmethod
+    def from_dict(cls, spec: Optional[Dict[str, Any]]) -> Optional["Readiness"]:
+        if not spec:
+            return None
+        return cls(**spec)
+
+    def is_empty(self) -> bool:
+        return not (self.selector or self.network_quiet_ms or self.js)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"selector": self.selector, "network_quiet_ms": self.network_quiet_ms, "js": self.js}
+
+
+class NetworkQuietTracker:
+    """Counts in-flight requests of a page, ignoring long-poll hosts"""
+
+    def __init__(self, page: Page, readiness: Readiness):
+        self.page = page
+        self.ignore = readiness.ignore
+        self.long_request_s = readiness.long_request_ms / 1000
+        self.inflight: Dict[Request, float] = {}
+        self.last_activity = time.perf_counter()
+
+    def _ignored(self, url: str) -> bool:
+        stripped = url.split("://", 1)[-1]
+        return any(stripped.startswith(prefix) for prefix in self.ignore)
+
+    def _on_request(self, request: Request):
+        if not self._ignored(request.url):
+            self.inflight[request] = time.perf_counter()
+            self.last_activity = time.perf_counter()
+
+    def _on_done(self, request: Request):
+        if self.inflight.pop(request, None) is not None:
+            self.last_activity = time.perf_counter()
+
+    def attach(self):
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_done)
+        self.page.on("requestfailed", self._on_done)
+
+    def detach(self):
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_done)
+        self.page.remove_listener("requestfailed", self._on_done)
+
+    async def wait_quiet(self, quiet_ms: int, timeout_s: float):
+        deadline = time.perf_counter() + timeout_s
+        quiet_s = quiet_ms / 1000
+        while True:
+            now = time.perf_counter()
+            active = any(now - started < self.long_request_s for started in self.inflight.values())
+            if not active and now - self.last_activity >= quiet_s:
+                return
+            if now >= deadline:
+                raise PlaywrightTimeout(f"Network not quiet for {quiet_ms} ms within {timeout_s * 1000:.0f} ms")
+            await asyncio.sleep(min(0.05, max(0.0, deadline - now)))
+
+
+class HostReadyStats:
+    """Recent ready times for one host"""
+
+    def __init__(self, window: int = 50):
+        self.samples = deque(maxlen=window)
+        self.timeouts = 0
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class AdaptiveNavigator:
+    """Navigates pages to a readiness predicate and learns per-host ready times"""
+
+    def __init__(self):
+        self.hosts: Dict[str, HostReadyStats] = {}
+        self.settings = {
+            "default_timeout": 30000,  # ms, until a host has samples
+            "min_timeout": 5000,
+            "max_timeout": 60000,
+            "headroom": 2.5,  # timeout = p90 ready time * headroom
+            "min_samples": 3
+        }
+
+    def timeout_for(self, host: Optional[str]) -> int:
+        stats = self.hosts.get(host or "")
+        if stats is None or len(stats.samples) < self.settings["min_samples"]:
+            return self.settings["default_timeout"]
+        learned = stats.percentile(0.9) * self.settings["headroom"]
+        return int(min(self.settings["max_timeout"], max(self.settings["min_timeout"], learned)))
+
+    async def navigate(
+        self,
+        page: Page,
+        url: str,
+        readiness: Optional[Readiness] = None,
+        timeout: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Navigate and wait until ready; returns a timing breakdown in ms.
+
+        Without a readiness predicate this waits for DOMContentLoaded, like a
+        plain goto(wait_until="domcontentloaded").
+        """
+        host = urlsplit(url).hostname
+        timeout = timeout or self.timeout_for(host)
+        tracker = None
+        if readiness and readiness.network_quiet_ms:
+            tracker = NetworkQuietTracker(page, readiness)
+            tracker.attach()
+
+        started = time.perf_counter()
+        ready = True
+        try:
+            await page.goto(url, wait_until="commit", timeout=timeout)
+            committed = time.perf_counter()
+            remaining = max(0.0, timeout / 1000 - (committed - started))
+            try:
+                await self._wait_ready(page, readiness, tracker, remaining)
+            except PlaywrightTimeout as e:
+                ready = False
+                logger.warning(f"Page {url} not ready within {timeout} ms: {e}")
+        finally:
+            if tracker:
+                tracker.detach()
+        finished = time.perf_counter()
+
+        timings = {"commit": round((committed - started) * 1000, 1), "ready": None}
+        try:
+            nav_timing = await page.evaluate(NAVIGATION_TIMING_JS)
+        except Exception:
+            nav_timing = None
+        if nav_timing:
+            timings.update({k: round(v, 1) if isinstance(v, (int, float)) else v for k, v in nav_timing.items()})
+
+        stats = self.hosts.setdefault(host or "", HostReadyStats())
+        if ready:
+            timings["ready"] = round((finished - started) * 1000, 1)
+            stats.samples.append(timings["ready"])
+        else:
+            # The page took at least the whole budget; counting that as a sample lets a
+            # host that got slower raise its learned timeout instead of timing out forever
+            stats.timeouts += 1
+            stats.samples.append(float(timeout))
+
+        return {
+            "url": page.url,
+            "ready": ready,
+            "timeout_ms": timeout,
+            "readiness": readiness.describe() if readiness else {"dom_content_loaded": True},
+            "timings_ms": timings
+        }
+
+    async def _wait_ready(self, page: Page, readiness: Optional[Readiness], tracker, timeout_s: float):
+        # Playwright reads a timeout of 0 as "wait forever"
+        if timeout_s <= 0:
+            raise PlaywrightTimeout("Navigation budget used up before the page committed")
+        timeout_ms = max(1.0, timeout_s * 1000)
+        if readiness is None or readiness.is_empty():
+            await page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+            return
+
+        waits = []
+        if readiness.selector:
+            waits.append(page.wait_for_selector(readiness.selector, state="attached", timeout=timeout_ms))
+        if readiness.js:
+            waits.append(page.wait_for_function(readiness.js, timeout=timeout_ms))
+        if tracker:
+            waits.append(tracker.wait_quiet(readiness.network_quiet_ms, timeout_s))
+        tasks = [asyncio.ensure_future(w) for w in waits]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "settings": self.settings,
+            "hosts": {
+                host or "(none)": {
+                    "samples": len(stats.samples),
+                    "p50_ms": stats.percentile(0.5),
+                    "p90_ms": stats.percentile(0.9),
+                    "timeouts": stats.timeouts,
+                    "timeout_ms": self.timeout_for(host)
+                }
+                for host, stats in self.hosts.items()
+            }
+        }
+
+
+page_navigator = AdaptiveNavigator()
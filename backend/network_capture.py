@@ -0,0 +1,313 @@
+from playwright.async_api import Page, Request, Response
+import asyncio
+import base64
+import gzip
+import json
+import re
+import time
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Set
+
+logger = logging.getLogger(__name__)
+
+TEXT_MIME = re.compile(r"^(text/|application/(json|javascript|xml|x-www-form-urlencoded)|[^;]*\+(json|xml))")
+
+
+def _headers(headers: Dict[str, str]) -> List[Dict[str, str]]:
+    return [{"name": name, "value": value} for name, value in headers.items()]
+
+
+def _span(timing: Dict[str, float], start: str, end: str) -> float:
+    if timing.get(start, -1) < 0 or timing.get(end, -1) < 0:
+        return -1
+    return round(timing[end] - timing[start], 3)
+
+
+class TabCapture:
+    """Ring buffer of one tab's finished requests, plus the ones still in flight"""
+
+    def __init__(self, size: int):
+        self.entries: deque = deque(maxlen=size)
+        self.pending: Dict[Request, Dict[str, Any]] = {}
+        self.untracked = 0  # responses whose status and headers were not kept because too many were in flight
+
+
+class NetworkCapture:
+    """Per-tab request/response capture into fixed-size ring buffers, flushed as gzipped HAR.
+
+    Listeners are attached only to tabs being captured, so tabs without
+    capture pay nothing. Flushing copies the buffer and hands it to a single
+    background writer; serialising and compressing run in a worker thread.
+    """
+
+    def __init__(self, browser_manager, output_dir: Path = Path("/tmp/network_captures")):
+        self.browser_manager = browser_manager
+        self.output_dir = output_dir
+        self.tabs: Dict[str, TabCapture] = {}
+        self.requested: Set[str] = set()  # tabs with capture turned on individually
+        self._attached: Dict[str, tuple] = {}  # page_id -> (page, handlers)
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._body_tasks: Set[asyncio.Task] = set()  # held so they are not collected mid-flight
+        self.files: deque = deque(maxlen=50)
+        self.settings = {
+            "enabled": False,  # capture every tab, not just the ones started through the API
+            "buffer_size": 300,  # entries kept per tab
+            "capture_bodies": False,
+            "max_body_bytes": 32 * 1024,
+            "flush_on_step_failure": True
+        }
+        browser_manager.add_listener("page_created", self._on_page_created)
+
+    def _wanted(self, page_id: str) -> bool:
+        return self.settings["enabled"] or page_id in self.requested
+
+    def _on_page_created(self, page_id: str, page: Page):
+        # Reopened pages (hibernation, crash recovery) keep capturing under the same id
+        if self._wanted(page_id):
+            self._attach(page_id, page)
+
+    def _attach(self, page_id: str, page: Page):
+        attached = self._attached.get(page_id)
+        if attached and attached[0] is page:
+            return
+        self._detach(page_id)
+        capture = self.tabs.get(page_id)
+        if capture is None:
+            capture = self.tabs[page_id] = TabCapture(self.settings["buffer_size"])
+        handlers = {
+            "response": lambda response: self._on_response(capture, response),
+            "requestfinished": lambda request: self._on_finished(capture, request, None),
+            "requestfailed": lambda request: self._on_finished(capture, request, request.failure or "failed")
+        }
+        for event, handler in handlers.items():
+            page.on(event, handler)
+        self._attached[page_id] = (page, handlers)
+
+    def _detach(self, page_id: str):
+        attached = self._attached.pop(page_id, None)
+        if attached:
+            page, handlers = attached
+            for event, handler in handlers.items():
+                page.remove_listener(event, handler)
+
+    def start(self, page_id: str):
+        self.requested.add(page_id)
+        page = self.browser_manager.pages.get(page_id)
+        if page is not None:
+            self._attach(page_id, page)
+
+    def stop(self, page_id: str):
+        """Stop capturing a tab; what was captured stays available for flushing"""
+        self.requested.discard(page_id)
+        if not self.settings["enabled"]:
+            self._detach(page_id)
+
+    def apply_settings(self):
+        """Resize buffers and attach to or detach from every live tab after the settings changed"""
+        size = self.settings["buffer_size"]
+        for capture in self.tabs.values():
+            if capture.entries.maxlen != size:
+                capture.entries = deque(capture.entries, maxlen=size)
+        for page_id, page in list(self.browser_manager.pages.items()):
+            if self._wanted(page_id):
+                self._attach(page_id, page)
+            else:
+                self._detach(page_id)
+
+    def forget(self, page_id: str):
+        self._detach(page_id)
+        self.requested.discard(page_id)
+        self.tabs.pop(page_id, None)
+
+    def _on_response(self, capture: TabCapture, response: Response):
+        request = response.request
+        if len(capture.pending) >= capture.entries.maxlen:
+            capture.untracked += 1  # the request is still listed when it finishes, without its response
+            return
+        capture.pending[request] = {
+            "status": response.status,
+            "status_text": response.status_text,
+            "response_headers": response.headers,
+        }
+
+    def _on_finished(self, capture: TabCapture, request: Request, failure: Optional[str]):
+        response = capture.pending.pop(request, None) or {}
+        timing = request.timing
+        entry = {
+            "started": (timing.get("startTime") or time.time() * 1000) / 1000,
+            "method": request.method,
+            "url": request.url,
+            "resource_type": request.resource_type,
+            "request_headers": request.headers,
+            "timing": timing,
+            "failure": failure,
+            **response
+        }
+        if self.settings["capture_bodies"]:
+            post_data = request.post_data_buffer
+            if post_data and len(post_data) <= self.settings["max_body_bytes"]:
+                entry["post_data"] = post_data.decode("utf-8", "replace")
+            if response and failure is None:
+                task = asyncio.create_task(self._capture_body(entry, request))
+                self._body_tasks.add(task)
+                task.add_done_callback(self._body_tasks.discard)
+        capture.entries.append(entry)
+
+    async def _capture_body(self, entry: Dict[str, Any], request: Request):
+        headers = entry.get("response_headers") or {}
+        length = headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.settings["max_body_bytes"]:
+            return
+        try:
+            response = await request.response()
+            body = await response.body() if response else None
+        except Exception:
+            return  # page closed or body already evicted by the browser
+        if body is None or len(body) > self.settings["max_body_bytes"]:
+            return
+        if TEXT_MIME.match(headers.get("content-type", "")):
+            entry["body"] = body.decode("utf-8", "replace")
+        else:
+            entry["body"], entry["body_encoding"] = base64.b64encode(body).decode(), "base64"
+
+    def recent(self, page_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        capture = self.tabs.get(page_id)
+        if capture is None:
+            return []
+        return [
+            {k: v for k, v in entry.items() if k not in ("request_headers", "response_headers", "timing", "body", "post_data")}
+            for entry in list(capture.entries)[-limit:]
+        ]
+
+    def flush(self, page_id: str, reason: str = "manual") -> Optional[str]:
+        """Queue the tab's buffer for writing; returns the file it will be written to"""
+        capture = self.tabs.get(page_id)
+        if capture is None or not capture.entries:
+            return None
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._write_loop())
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        name = f"{page_id[:8]}-{stamp}-{re.sub(r'[^a-z0-9]+', '-', reason.lower()).strip('-')[:40]}.har.gz"
+        self._queue.put_nowait((self.output_dir / name, page_id, reason, list(capture.entries)))
+        return name
+
+    async def _write_loop(self):
+        while True:
+            path, page_id, reason, entries = await self._queue.get()
+            try:
+                size = await asyncio.to_thread(lambda: self._write(path, self.to_har(entries, page_id, reason)))
+                if len(self.files) == self.files.maxlen:
+                    # The oldest file drops out of the listing, so it goes from disk too
+                    evicted = self.output_dir / self.files[0]["name"]
+                    await asyncio.to_thread(evicted.unlink, missing_ok=True)
+                self.files.append({
+                    "name": path.name,
+                    "page_id": page_id,
+                    "reason": reason,
+                    "entries": len(entries),
+                    "bytes": size,
+                    "written_at": datetime.now(timezone.utc).isoformat()
+                })
+                logger.info(f"Wrote {len(entries)} requests of tab {page_id} to {path} ({reason})")
+            except Exception as e:
+                logger.error(f"Failed to write network capture {path}: {e}")
+
+    @staticmethod
+    def _write(path: Path, har: Dict[str, Any]) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = gzip.compress(json.dumps(har).encode(), compresslevel=6)
+        path.write_bytes(data)
+        return len(data)
+
+    def path_of(self, name: str) -> Optional[Path]:
+        if not re.fullmatch(r"[\w.-]+\.har\.gz", name):
+            return None
+        path = self.output_dir / name
+        return path if path.is_file() else None
+
+    @staticmethod
+    def to_har(entries: List[Dict[str, Any]], page_id: str, reason: str) -> Dict[str, Any]:
+        har_entries = []
+        for entry in entries:
+            timing = entry["timing"]
+            content = {"size": -1, "mimeType": (entry.get("response_headers") or {}).get("content-type", "")}
+            if "body" in entry:
+                content.update(size=len(entry["body"]), text=entry["body"])
+                if entry.get("body_encoding"):
+                    content["encoding"] = entry["body_encoding"]
+            request = {
+                "method": entry["method"],
+                "url": entry["url"],
+                "httpVersion": "HTTP/1.1",
+                "headers": _headers(entry["request_headers"]),
+                "queryString": [],
+                "cookies": [],
+                "headersSize": -1,
+                "bodySize": len(entry["post_data"]) if "post_data" in entry else -1
+            }
+            if "post_data" in entry:
+                request["postData"] = {"mimeType": entry["request_headers"].get("content-type", ""), "text": entry["post_data"]}
+            har_entry = {
+                "pageref": page_id,
+                "startedDateTime": datetime.fromtimestamp(entry["started"], timezone.utc).isoformat(),
+                "time": max(timing.get("responseEnd", -1), 0),
+                "request": request,
+                "response": {
+                    "status": entry.get("status", 0),
+                    "statusText": entry.get("status_text", ""),
+                    "httpVersion": "HTTP/1.1",
+                    "headers": _headers(entry.get("response_headers") or {}),
+                    "cookies": [],
+                    "content": content,
+                    "redirectURL": (entry.get("response_headers") or {}).get("location", ""),
+                    "headersSize": -1,
+                    "bodySize": -1
+                },
+                "cache": {},
+                "timings": {
+                    "blocked": -1,
+                    "dns": _span(timing, "domainLookupStart", "domainLookupEnd"),
+                    "connect": _span(timing, "connectStart", "connectEnd"),
+                    "ssl": _span(timing, "secureConnectionStart", "connectEnd"),
+                    "send": 0,
+                    "wait": _span(timing, "requestStart", "responseStart"),
+                    "receive": _span(timing, "responseStart", "responseEnd")
+                },
+                "_resourceType": entry["resource_type"]
+            }
+            if entry["failure"]:
+                har_entry["response"]["_error"] = entry["failure"]
+            har_entries.append(har_entry)
+        started = entries[0]["started"] if entries else time.time()
+        return {
+            "log": {
+                "version": "1.2",
+                "creator": {"name": "browser-automation", "version": "1.0"},
+                "comment": reason,
+                "pages": [{
+                    "id": page_id,
+                    "title": page_id,
+                    "startedDateTime": datetime.fromtimestamp(started, timezone.utc).isoformat(),
+                    "pageTimings": {}
+                }],
+                "entries": har_entries
+            }
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "capturing": sorted(self._attached),
+            "tabs": {
+                page_id: {"entries": len(c.entries), "in_flight": len(c.pending), "untracked": c.untracked}
+                for page_id, c in self.tabs.items()
+            },
+            "queued_writes": self._queue.qsize() if self._queue else 0,
+            "files": list(self.files),
+            "settings": self.settings
+        }
+
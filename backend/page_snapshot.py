@@ -0,0 +1,223 @@
+from playwright.async_api import Page
+import logging
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# One pass over the DOM (and open shadow roots) building a pruned, flat
+# accessibility-style tree. Element ids live in a WeakMap on the page, so the
+# same element keeps its id across snapshots until the document changes. A
+# MutationObserver plus input/focus/scroll listeners bump a counter; when it
+# has not moved since the caller's snapshot the page answers "unchanged"
+# without walking the DOM.
+SNAPSHOT_JS = """(args) => {
+    const KEY = '__pageSnapshot';
+    let state = window[KEY];
+    if (!state || state.document !== document) {
+        state = window[KEY] = {
+            document, doc: Math.random().toString(36).slice(2, 10), mutations: 0, nextId: 1, ids: new WeakMap()
+        };
+        const bump = () => { state.mutations++; };
+        new MutationObserver(bump).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+        for (const type of ['input', 'change', 'focusin', 'scroll']) {
+            addEventListener(type, bump, {capture: true, passive: true});
+        }
+        addEventListener('resize', bump, {passive: true});
+    }
+    if (args.doc === state.doc && args.mutations === state.mutations) {
+        return {doc: state.doc, mutations: state.mutations, unchanged: true};
+    }
+    const mutations = state.mutations;
+
+    const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'HEAD', 'META', 'LINK', 'svg']);
+    // Their whole text becomes the name, so their children are not listed separately
+    const LEAF = new Set(['A', 'BUTTON', 'OPTION', 'SUMMARY', 'LABEL', 'TEXTAREA', 'SELECT']);
+    const INTERACTIVE = 'a[href], button, input, select, textarea, summary, [role=button], [role=link], ' +
+        '[role=checkbox], [role=radio], [role=tab], [role=menuitem], [role=option], [role=switch], ' +
+        '[role=combobox], [role=textbox], [contenteditable=""], [contenteditable=true], [tabindex]:not([tabindex="-1"])';
+    const LANDMARKS = new Set(['main', 'navigation', 'banner', 'contentinfo', 'form', 'dialog', 'alertdialog',
+        'heading', 'img', 'list', 'table', 'row', 'search', 'region', 'alert', 'tablist', 'menu', 'listbox']);
+    const INPUT_ROLES = {checkbox: 'checkbox', radio: 'radio', submit: 'button', button: 'button', reset: 'button',
+        range: 'slider', search: 'searchbox', image: 'button'};
+    const TAG_ROLES = {A: 'link', BUTTON: 'button', TEXTAREA: 'textbox', IMG: 'img', NAV: 'navigation', MAIN: 'main',
+        HEADER: 'banner', FOOTER: 'contentinfo', FORM: 'form', DIALOG: 'dialog', UL: 'list', OL: 'list',
+        LI: 'listitem', TABLE: 'table', TR: 'row', TD: 'cell', TH: 'columnheader', OPTION: 'option',
+        SUMMARY: 'button', H1: 'heading', H2: 'heading', H3: 'heading', H4: 'heading', H5: 'heading',
+        H6: 'heading', IFRAME: 'iframe', VIDEO: 'video', LABEL: 'label'};
+
+    const clip = (text, n) => {
+        text = (text || '').replace(/\\s+/g, ' ').trim();
+        return text.length > n ? text.slice(0, n) + '…' : text;
+    };
+    const roleOf = (el) => {
+        const explicit = el.getAttribute('role');
+        if (explicit) return explicit.split(' ')[0];
+        if (el.tagName === 'INPUT') return INPUT_ROLES[el.type] || 'textbox';
+        if (el.tagName === 'SELECT') return el.multiple ? 'listbox' : 'combobox';
+        if (el.tagName === 'A' && !el.hasAttribute('href')) return null;
+        return TAG_ROLES[el.tagName] || null;
+    };
+    const directText = (el) => {
+        let text = '';
+        for (const child of el.childNodes) {
+            if (child.nodeType === 3) text += child.data;
+        }
+        return text;
+    };
+    const nameOf = (el, leaf) => {
+        const labelledBy = el.getAttribute('aria-labelledby');
+        const label = el.getAttribute('aria-label')
+            || (labelledBy && labelledBy.split(' ').map((id) => document.getElementById(id)?.innerText || '').join(' '))
+            || el.getAttribute('alt') || el.getAttribute('title') || el.getAttribute('placeholder')
+            || (el.labels && el.labels[0] && el.labels[0].innerText);
+        return clip(label || (leaf ? el.innerText : directText(el)), args.max_text);
+    };
+    const visible = (el) => el.checkVisibility
+        ? el.checkVisibility({visibilityProperty: true, checkVisibilityCSS: true})
+        : !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+
+    const nodes = [];
+    let truncated = false;
+    const stack = [[document.body || document.documentElement, null]];
+    while (stack.length) {
+        const [el, parent] = stack.pop();
+        if (SKIP.has(el.tagName) || el.getAttribute('aria-hidden') === 'true' || !visible(el)) continue;
+
+        const role = roleOf(el);
+        const interactive = el.matches(INTERACTIVE);
+        const leaf = LEAF.has(el.tagName) || interactive && el.tagName !== 'DIV' && el.tagName !== 'SPAN';
+        const name = nameOf(el, leaf);
+        let id = parent;
+        if (interactive || (role && LANDMARKS.has(role)) || name) {
+            if (nodes.length >= args.max_nodes) { truncated = true; break; }
+            let sid = state.ids.get(el);
+            if (!sid) { sid = 'e' + state.nextId++; state.ids.set(el, sid); }
+            id = sid;
+            const node = {id, parent, role: role || el.tagName.toLowerCase()};
+            if (name) node.name = name;
+            if (el.tagName === 'A' && el.href) node.href = el.href;
+            if (/^H[1-6]$/.test(el.tagName)) node.level = Number(el.tagName[1]);
+            if ('value' in el && ['INPUT', 'TEXTAREA', 'SELECT'].includes(el.tagName) && !['checkbox', 'radio', 'submit', 'button'].includes(el.type)) {
+                node.value = el.type === 'password' ? (el.value ? '••••' : '') : clip(el.value, args.max_text);
+            }
+            if (el.disabled || el.getAttribute('aria-disabled') === 'true') node.disabled = true;
+            if (el.checked || el.getAttribute('aria-checked') === 'true') node.checked = true;
+            if (el.getAttribute('aria-expanded')) node.expanded = el.getAttribute('aria-expanded') === 'true';
+            if (el.selected || el.getAttribute('aria-selected') === 'true') node.selected = true;
+            if (document.activeElement === el) node.focused = true;
+            if (interactive && args.bbox) {
+                const r = el.getBoundingClientRect();
+                node.bbox = [Math.round(r.x), Math.round(r.y), Math.round(r.width), Math.round(r.height)];
+            }
+            nodes.push(node);
+        }
+        if (leaf) continue;
+        const children = el.shadowRoot ? [...el.shadowRoot.children, ...el.children] : el.children;
+        for (let i = children.length - 1; i >= 0; i--) stack.push([children[i], id]);
+    }
+    return {doc: state.doc, mutations, url: location.href, title: document.title, nodes, truncated};
+}"""
+
+
+class TabSnapshots:
+    """Snapshot versions of one tab's document"""
+
+    def __init__(self, history: int):
+        self.doc: Optional[str] = None
+        self.mutations: Optional[int] = None
+        self.version = 0
+        self.url = ""
+        self.title = ""
+        self.truncated = False
+        self.params: Optional[tuple] = None  # (bbox, max_nodes) the held nodes were built with
+        self.versions: deque = deque(maxlen=history)  # (version, {id: node}) newest last
+
+    def latest(self) -> Dict[str, Dict[str, Any]]:
+        return self.versions[-1][1] if self.versions else {}
+
+    def nodes_at(self, version: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        for v, nodes in self.versions:
+            if v == version:
+                return nodes
+        return None
+
+
+class PageSnapshots:
+    """Compact page snapshots for LLM agents, cached per tab.
+
+    A snapshot is a flat list of visible, meaningful nodes (interactive
+    elements, landmarks, named or text-bearing elements) with stable ids and
+    parent links. Each changed snapshot gets a new version; asking with
+    since=<version> returns only the nodes added, changed or removed since
+    then, or a full snapshot if that version is no longer held or the page
+    navigated to a new document.
+    """
+
+    def __init__(self):
+        self.tabs: Dict[str, TabSnapshots] = {}
+        self.stats = {"snapshots": 0, "unchanged": 0, "diffs": 0, "full": 0}
+        self.settings = {
+            "max_nodes": 2000,
+            "max_text": 200,
+            "history": 4  # versions kept per tab for diffs
+        }
+
+    async def snapshot(self, page_id: str, page: Page, since: Optional[int] = None, bbox: bool = True,
+                       max_nodes: Optional[int] = None) -> Dict[str, Any]:
+        tab = self.tabs.get(page_id)
+        if tab is None:
+            tab = self.tabs[page_id] = TabSnapshots(self.settings["history"])
+        self.stats["snapshots"] += 1
+
+        # Held nodes only answer a request built with the same options
+        params = (bbox, max_nodes or self.settings["max_nodes"])
+        same_params = params == tab.params
+        result = await page.evaluate(SNAPSHOT_JS, {
+            "doc": tab.doc if same_params else None,
+            "mutations": tab.mutations,
+            "bbox": bbox,
+            "max_nodes": params[1],
+            "max_text": self.settings["max_text"]
+        })
+        if result.get("unchanged"):
+            self.stats["unchanged"] += 1
+        else:
+            if result["doc"] != tab.doc or not same_params:
+                # Ids from another document, or nodes built with other options, do not diff against these
+                tab.versions.clear()
+            tab.doc = result["doc"]
+            tab.mutations = result["mutations"]
+            tab.params = params
+            nodes = {node["id"]: node for node in result["nodes"]}
+            if nodes != tab.latest() or not tab.versions:
+                tab.version += 1
+                tab.versions.append((tab.version, nodes))
+            tab.url, tab.title, tab.truncated = result["url"], result["title"], result["truncated"]
+
+        response = {"version": tab.version, "url": tab.url, "title": tab.title, "truncated": tab.truncated}
+        base = tab.nodes_at(since) if since is not None else None
+        if base is None:
+            self.stats["full"] += 1
+            nodes = tab.latest()
+            return {**response, "full": True, "count": len(nodes), "nodes": list(nodes.values())}
+
+        self.stats["diffs"] += 1
+        current = tab.latest()
+        return {
+            **response,
+            "full": False,
+            "since": since,
+            "added": [node for nid, node in current.items() if nid not in base],
+            "changed": [node for nid, node in current.items() if nid in base and base[nid] != node],
+            "removed": [nid for nid in base if nid not in current]
+        }
+
+    def forget(self, page_id: str):
+        self.tabs.pop(page_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"tabs": len(self.tabs), **self.stats, "settings": self.settings}
+
+
+page_snapshots = PageSnapshots()
@@ -0,0 +1,76 @@
+from playwright.async_api import BrowserContext
+import asyncio
+import json
+import os
+import re
+import time
+from pathlib import Path
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = "storage_state.json"
+
+
+def safe_profile_name(profile_name: str) -> str:
+    """Map a profile name onto a single safe path component"""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", profile_name).strip(".") or "default"
+
+
+class ProfileStateCache:
+    """Snapshots context storage state (cookies + localStorage) per profile on disk"""
+
+    def __init__(self, root: Path, max_age: float = 900):
+        self.root = root
+        self.max_age = max_age
+        self.saved_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def state_path(self, profile_name: str) -> Path:
+        return self.root / safe_profile_name(profile_name) / STATE_FILENAME
+
+    def get(self, profile_name: str) -> Optional[str]:
+        """Return the snapshot path for a profile if one has been saved"""
+        path = self.state_path(profile_name)
+        if path.is_file():
+            if profile_name not in self.saved_at:
+                self.saved_at[profile_name] = path.stat().st_mtime
+            return str(path)
+        return None
+
+    def is_stale(self, profile_name: str) -> bool:
+        saved = self.saved_at.get(profile_name)
+        return saved is None or time.time() - saved > self.max_age
+
+    async def save(self, profile_name: str, context: BrowserContext) -> bool:
+        """Snapshot a context's storage state for its profile"""
+        lock = self._locks.setdefault(profile_name, asyncio.Lock())
+        async with lock:
+            try:
+                state = await context.storage_state()
+            except Exception as e:
+                logger.warning(f"Could not read storage state for profile {profile_name}: {e}")
+                return False
+
+            path = self.state_path(profile_name)
+            await asyncio.to_thread(self._write_atomic, path, state)
+            self.saved_at[profile_name] = time.time()
+            logger.info(f"Saved storage state for profile {profile_name} ({len(state.get('cookies', []))} cookies)")
+            return True
+
+    def discard(self, profile_name: str):
+        """Drop a profile snapshot, e.g. after the session was logged out"""
+        self.saved_at.pop(profile_name, None)
+        try:
+            self.state_path(profile_name).unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _write_atomic(path: Path, state: dict):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
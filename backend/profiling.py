@@ -0,0 +1,235 @@
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+import logging
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+MODES = ("sampling", "cprofile")
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a helper thread and counts collapsed stacks.
+
+    The event loop thread is never interrupted: the helper reads its current
+    frame every interval, so cost on the loop is only the GIL hand-off.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        labels: Dict[Any, str] = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if self._stop.is_set():
+                break  # the thread is now just waiting for us to finish
+            parts = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                parts.append(label)
+                frame = frame.f_back
+            if parts:
+                self.stacks[";".join(reversed(parts))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, one "frame;frame;frame count" per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """On-demand profiling of the next N matching requests or of one workflow job.
+
+    Rules are armed through the admin API; while none are armed the request
+    path pays a single empty-dict check. A profile covers everything the event
+    loop thread runs during the profiled request or job, so concurrent work
+    shows up too; only one profile runs at a time and other matches pass
+    through unprofiled.
+    """
+
+    def __init__(self):
+        self.rules: Dict[str, Dict[str, Any]] = {}
+        self.profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._active: Optional[str] = None
+        self.settings = {
+            "sample_interval_ms": 5,
+            "max_profiles": 20,
+            "top_functions": 25
+        }
+
+    def arm(self, route: Optional[str] = None, method: Optional[str] = None, job_id: Optional[str] = None,
+            count: int = 1, mode: str = "sampling") -> Dict[str, Any]:
+        """Profile the next `count` requests to a route (template or path), or the workflow job `job_id`"""
+        if bool(route) == bool(job_id):
+            raise ValueError("Give exactly one of route or job_id")
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}; expected one of {list(MODES)}")
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        rule = {
+            "id": uuid.uuid4().hex[:12],
+            "route": route,
+            "method": method.upper() if method else None,
+            "job_id": job_id,
+            "remaining": 1 if job_id else count,
+            "mode": mode,
+            # "/api/tabs/{page_id}/navigate" also matches the concrete path of any tab
+            "_pattern": re.compile("^" + re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(route)) + "$") if route else None
+        }
+        self.rules[rule["id"]] = rule
+        logger.info(f"Profiling armed ({mode}) for {route or f'job {job_id}'} x{rule['remaining']}")
+        return self._public_rule(rule)
+
+    def disarm(self, rule_id: str) -> bool:
+        return self.rules.pop(rule_id, None) is not None
+
+    def match_request(self, method: str, path: str) -> Optional[Dict[str, Any]]:
+        for rule in self.rules.values():
+            if rule["_pattern"] and rule["_pattern"].match(path) and rule["method"] in (None, method):
+                return rule
+        return None
+
+    def request(self, method: str, path: str):
+        """Context manager profiling this request if an armed rule matches it"""
+        rule = self.match_request(method, path) if self.rules else None
+        return self._session(rule, f"{method} {path}") if rule else nullcontext()
+
+    def job(self, job_id: str):
+        """Context manager profiling a workflow job if a rule is armed for its id"""
+        rule = next((r for r in self.rules.values() if r["job_id"] == job_id), None) if self.rules else None
+        return self._session(rule, f"job {job_id}") if rule else nullcontext()
+
+    @contextmanager
+    def _session(self, rule: Dict[str, Any], target: str):
+        if self._active is not None:
+            yield None
+            return
+        profile_id = uuid.uuid4().hex[:12]
+        self._active = profile_id
+        rule["remaining"] -= 1
+        if rule["remaining"] <= 0:
+            self.rules.pop(rule["id"], None)
+
+        sampler = StackSampler(threading.get_ident(), self.settings["sample_interval_ms"] / 1000)
+        profile = cProfile.Profile() if rule["mode"] == "cprofile" else None
+        started_at = datetime.now(timezone.utc).isoformat()
+        started = time.perf_counter()
+        sampler.start()
+        if profile:
+            profile.enable()
+        try:
+            yield profile_id
+        finally:
+            if profile:
+                profile.disable()
+            sampler.stop()
+            self._active = None
+            self._store(profile_id, rule, target, started_at, time.perf_counter() - started, sampler, profile)
+
+    def _store(self, profile_id: str, rule: Dict[str, Any], target: str, started_at: str, elapsed: float,
+               sampler: StackSampler, profile: Optional[cProfile.Profile]):
+        stats = pstats.Stats(profile) if profile else None
+        self.profiles[profile_id] = {
+            "id": profile_id,
+            "rule_id": rule["id"],
+            "target": target,
+            "mode": rule["mode"],
+            "started_at": started_at,
+            "duration_ms": round(elapsed * 1000, 1),
+            "samples": sampler.samples,
+            "collapsed": sampler.collapsed(),
+            "pstats": stats,
+            "top": self._top_functions(stats) if stats else self._top_stacks(sampler)
+        }
+        while len(self.profiles) > self.settings["max_profiles"]:
+            self.profiles.popitem(last=False)
+        logger.info(f"Profile {profile_id} of {target}: {elapsed * 1000:.0f} ms, {sampler.samples} samples")
+
+    def _top_functions(self, stats: pstats.Stats) -> List[Dict[str, Any]]:
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{name} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 2),
+                "cumtime_ms": round(cumtime * 1000, 2)
+            }
+            for (filename, line, name), (_, calls, tottime, cumtime, _) in rows[:self.settings["top_functions"]]
+        ]
+
+    def _top_stacks(self, sampler: StackSampler) -> List[Dict[str, Any]]:
+        # Leaf frames by sample count: where the loop thread actually was
+        leaves: Counter = Counter()
+        for stack, count in sampler.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sampler.samples or 1
+        return [
+            {"function": leaf, "samples": count, "percent": round(count / total * 100, 1)}
+            for leaf, count in leaves.most_common(self.settings["top_functions"])
+        ]
+
+    def get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self.profiles.get(profile_id)
+
+    def pstats_text(self, profile_id: str) -> Optional[str]:
+        """Human-readable pstats report, for quick looks without downloading"""
+        profile = self.profiles.get(profile_id)
+        if not profile or profile["pstats"] is None:
+            return None
+        stats = profile["pstats"]
+        stats.stream = io.StringIO()
+        stats.sort_stats("cumulative").print_stats(self.settings["top_functions"])
+        return stats.stream.getvalue()
+
+    def pstats_dump(self, profile_id: str) -> Optional[bytes]:
+        """The profile in the format pstats.Stats(path) and snakeviz load"""
+        profile = self.profiles.get(profile_id)
+        if not profile or profile["pstats"] is None:
+            return None
+        return marshal.dumps(profile["pstats"].stats)
+
+    @staticmethod
+    def _public_rule(rule: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in rule.items() if not k.startswith("_")}
+
+    @staticmethod
+    def summary(profile: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in profile.items() if k not in ("collapsed", "pstats")}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "rules": [self._public_rule(r) for r in self.rules.values()],
+            "profiles": [self.summary(p) for p in reversed(self.profiles.values())],
+            "settings": self.settings
+        }
+
+
+profiler = Profiler()
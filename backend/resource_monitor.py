@@ -0,0 +1,268 @@
+from playwright.async_api import CDPSession
+import asyncio
+import os
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+
+from tab_actors import PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Subset of Performance.getMetrics that is useful for ranking tabs by cost
+TAB_METRICS = (
+    "JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "Documents", "Frames",
+    "JSEventListeners", "LayoutCount", "RecalcStyleCount", "ScriptDuration", "TaskDuration"
+)
+
+
+def read_process_tree_rss(root_pid: int, exclude: tuple = ("node",)) -> Dict[int, Dict[str, Any]]:
+    """Resident set size of every descendant of root_pid, read from /proc.
+
+    Blocking; run it in a worker thread. The Playwright node driver is excluded
+    so the total reflects the browser processes only.
+    """
+    parents: Dict[int, int] = {}
+    names: Dict[int, str] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # comm may contain spaces, so split around the parenthesised name
+        name = stat[stat.index("(") + 1:stat.rindex(")")]
+        fields = stat[stat.rindex(")") + 2:].split()
+        parents[int(entry)] = int(fields[1])
+        names[int(entry)] = name
+
+    children: Dict[int, List[int]] = {}
+    for pid, ppid in parents.items():
+        children.setdefault(ppid, []).append(pid)
+
+    result = {}
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        if names.get(pid) in exclude:
+            continue
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                resident = int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+        result[pid] = {"name": names[pid], "rss": resident}
+    return result
+
+
+class ResourceMonitor:
+    """Samples per-tab CDP metrics and browser RSS, and relieves memory pressure"""
+
+    def __init__(self, browser_manager, tab_hibernator, tab_actors=None):
+        self.browser_manager = browser_manager
+        self.tab_hibernator = tab_hibernator
+        self.tab_actors = tab_actors  # when given, hibernation is queued behind the tab's running work
+        self.active_tabs: Dict[str, Dict[str, Any]] = {}
+        self.close_tab: Optional[Callable[[str], Awaitable[Any]]] = None
+        self.tab_metrics: Dict[str, Dict[str, Any]] = {}
+        self.processes: Dict[int, Dict[str, Any]] = {}
+        self.total_rss = 0
+        self.sampled_at: Optional[float] = None
+        self.throttled: set = set()
+        # page_id -> index of the next pressure action; kept for the whole pressure episode,
+        # across hibernation and restore, so a tab that stays heavy walks the full list
+        self.escalation: Dict[str, int] = {}
+        self.actions = deque(maxlen=50)
+        self._sessions: Dict[str, CDPSession] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.settings = {
+            "enabled": True,
+            "interval": 15,  # seconds between samples
+            "rss_budget_mb": 2048,  # total browser RSS that triggers the pressure policy
+            # Escalation applied to the heaviest background tab each time the budget is exceeded
+            "pressure_actions": ["throttle", "hibernate"],  # "close" may be appended
+            "max_actions_per_cycle": 1
+        }
+
+    def start(self, active_tabs: Dict[str, Dict[str, Any]], close_tab: Callable[[str], Awaitable[Any]]):
+        self.active_tabs = active_tabs
+        self.close_tab = close_tab
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._sample_loop())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def forget(self, page_id: str):
+        self.tab_metrics.pop(page_id, None)
+        self.throttled.discard(page_id)
+        self._sessions.pop(page_id, None)
+
+    async def _session(self, page_id: str, page) -> CDPSession:
+        session = self._sessions.get(page_id)
+        if session is None:
+            session = await page.context.new_cdp_session(page)
+            await session.send("Performance.enable")
+            self._sessions[page_id] = session
+        return session
+
+    async def _sample_tab(self, page_id: str, page):
+        try:
+            session = await self._session(page_id, page)
+            response = await asyncio.wait_for(session.send("Performance.getMetrics"), timeout=5)
+        except Exception as e:
+            # Page closed, hibernated or swapped by a browser restart; reopen next time
+            self._sessions.pop(page_id, None)
+            logger.debug(f"Metrics for tab {page_id} unavailable: {e}")
+            return
+        metrics = {m["name"]: m["value"] for m in response["metrics"] if m["name"] in TAB_METRICS}
+        metrics["sampled_at"] = time.time()
+        self.tab_metrics[page_id] = metrics
+
+    async def sample(self):
+        """Collect CDP metrics for every live tab and RSS for the browser process tree"""
+        if self.browser_manager.settings["browser_type"] == "chromium":
+            live = [(pid, info["page"]) for pid, info in self.active_tabs.items()
+                    if info.get("page") and not info["page"].is_closed()]
+            await asyncio.gather(*(self._sample_tab(pid, page) for pid, page in live))
+
+        for page_id in list(self.tab_metrics):
+            if page_id not in self.active_tabs or self.tab_hibernator.is_hibernated(page_id):
+                self.forget(page_id)
+        for page_id in list(self.escalation):
+            if page_id not in self.active_tabs:
+                del self.escalation[page_id]
+
+        # /proc walk is blocking; keep it off the event loop
+        self.processes = await asyncio.to_thread(read_process_tree_rss, os.getpid())
+        self.total_rss = sum(p["rss"] for p in self.processes.values())
+        self.sampled_at = time.time()
+
+    def _background_tabs_by_weight(self) -> List[str]:
+        """Live, unpinned tabs except the most recently used one, heaviest first"""
+        candidates = [
+            pid for pid in self.tab_metrics
+            if pid in self.active_tabs
+            and pid not in self.tab_hibernator.pinned
+            and not self.tab_hibernator.is_hibernated(pid)
+        ]
+        last_access = self.tab_hibernator.last_access
+        if candidates:
+            foreground = max(candidates, key=lambda pid: last_access.get(pid, 0))
+            candidates.remove(foreground)
+        return sorted(candidates, key=lambda pid: self.tab_metrics[pid].get("JSHeapUsedSize", 0), reverse=True)
+
+    async def apply_pressure_policy(self) -> List[Dict[str, Any]]:
+        """Throttle, hibernate or close the heaviest background tabs while over budget"""
+        budget = self.settings["rss_budget_mb"] * 1024 * 1024
+        if self.total_rss <= budget:
+            self.escalation.clear()  # pressure is over; the next episode starts gently again
+            return []
+
+        taken = []
+        steps = self.settings["pressure_actions"]
+        for page_id in self._background_tabs_by_weight():
+            if len(taken) >= self.settings["max_actions_per_cycle"]:
+                break
+            # Each action taken on a tab moves it one step further down the list
+            step = self.escalation.get(page_id, 0)
+            if step >= len(steps):
+                continue
+            action = steps[step]
+            js_heap = self.tab_metrics[page_id].get("JSHeapUsedSize")
+            try:
+                if await self._apply(action, page_id):
+                    self.escalation[page_id] = step + 1
+                    entry = {
+                        "time": time.time(),
+                        "action": action,
+                        "page_id": page_id,
+                        "total_rss": self.total_rss,
+                        "js_heap": js_heap
+                    }
+                    self.actions.append(entry)
+                    taken.append(entry)
+                    logger.warning(f"Memory pressure ({self.total_rss // (1024 * 1024)} MB > "
+                                   f"{self.settings['rss_budget_mb']} MB): {action} tab {page_id}")
+            except Exception as e:
+                logger.error(f"Pressure action {action} on tab {page_id} failed: {e}")
+        return taken
+
+    async def _apply(self, action: str, page_id: str) -> bool:
+        if action == "throttle":
+            page = self.active_tabs[page_id]["page"]
+            session = await self._session(page_id, page)
+            # Frozen pages stop running timers and tasks until resumed
+            await session.send("Page.setWebLifecycleState", {"state": "frozen"})
+            self.throttled.add(page_id)
+            return True
+        if action == "hibernate":
+            if self.tab_actors is not None:
+                # Queued like any other operation so the page is not closed under a running one
+                hibernated = await self.tab_actors.submit(
+                    page_id, lambda: self.tab_hibernator.hibernate(page_id), PRIORITY_BACKGROUND
+                )
+            else:
+                hibernated = await self.tab_hibernator.hibernate(page_id)
+            if hibernated:
+                self.forget(page_id)
+            return hibernated
+        if action == "close" and self.close_tab:
+            await self.close_tab(page_id)
+            self.forget(page_id)
+            self.escalation.pop(page_id, None)
+            return True
+        return False
+
+    async def unthrottle(self, page_id: str):
+        """Resume a frozen tab; called before any operation on it"""
+        if page_id not in self.throttled:
+            return
+        self.throttled.discard(page_id)
+        session = self._sessions.get(page_id)
+        if session:
+            try:
+                await session.send("Page.setWebLifecycleState", {"state": "active"})
+            except Exception as e:
+                logger.warning(f"Failed to resume tab {page_id}: {e}")
+
+    async def _sample_loop(self):
+        while True:
+            await asyncio.sleep(self.settings["interval"])
+            if not self.settings["enabled"]:
+                continue
+            try:
+                await self.sample()
+                await self.apply_pressure_policy()
+            except Exception as e:
+                logger.error(f"Resource sampling failed: {e}")
+
+    def get_summary(self) -> Dict[str, Any]:
+        return {
+            "total_rss": self.total_rss,
+            "rss_budget": self.settings["rss_budget_mb"] * 1024 * 1024,
+            "processes": len(self.processes),
+            "sampled_at": self.sampled_at,
+            "throttled_tabs": len(self.throttled),
+            "escalated_tabs": len(self.escalation)
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.get_summary(),
+            "settings": self.settings,
+            "tabs": {
+                pid: {**metrics, "throttled": pid in self.throttled, "escalation": self.escalation.get(pid, 0)}
+                for pid, metrics in self.tab_metrics.items()
+            },
+            "process_list": [{"pid": pid, **info} for pid, info in self.processes.items()],
+            "recent_actions": list(self.actions)
+        }
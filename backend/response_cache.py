@@ -0,0 +1,310 @@
+from playwright.async_api import BrowserContext, Route, Request
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+import logging
+from typing import Dict, Any, Optional
+
+from profile_state import safe_profile_name
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_TYPES = {"image", "font", "stylesheet", "script", "media", "document", "xhr", "fetch", "manifest", "other"}
+# Hop-by-hop and encoding headers that no longer describe the decoded body we store
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+CACHE_MODES = ("off", "cache", "replay", "record")
+# Requests carrying these are personalised; Playwright usually adds cookies later, hence the profile in the key too
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float, heuristic_cap: float) -> Optional[float]:
+    """Seconds a response may be served from cache, or None if it must not be stored"""
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "private" in cache_control or headers.get("vary", "").strip() == "*":
+        return None
+    if "set-cookie" in headers:
+        return None  # personalised response
+    vary = {v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()}
+    if vary - {"accept-encoding", "origin"}:
+        return None  # responses that vary on cookies, user agent, ... are not keyed that way here
+    if "no-cache" in cache_control:
+        return 0.0  # storable, but must be revalidated before every use
+    match = re.search(r"(?:s-maxage|max-age)=(\d+)", cache_control)
+    if match:
+        return float(match.group(1))
+    date = _http_date(headers.get("date")) or now
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        return max(0.0, expires - date)
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        # RFC 9111 heuristic: 10% of the time since the resource last changed
+        return min(heuristic_cap, max(0.0, (date - last_modified) * 0.1))
+    return None
+
+
+class ResponseCache:
+    """Disk-backed HTTP response cache served through context routing.
+
+    Bodies are stored content-addressed under bodies/ (identical assets on
+    different URLs are kept once) and a small JSON index maps profile and URL
+    to status, headers, body hash and expiry, so one profile is never served
+    another's responses. Per-profile modes:
+
+    - "cache": serve fresh entries from disk, revalidate stale ones, store misses
+    - "replay": strict HAR replay via route_from_har; unknown requests are aborted
+    - "record": record the profile's traffic into its HAR for later replay
+    """
+
+    def __init__(self, root: Path = Path("/tmp/browser_cache")):
+        self.root = root
+        self.bodies_dir = root / "bodies"
+        self.har_dir = root / "har"
+        self.index_path = root / "index.json"
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stored = 0
+        self.bytes_served = 0
+        self.settings = {
+            "default_mode": "off",
+            "profile_modes": {},  # profile name -> one of CACHE_MODES
+            "max_bytes": 512 * 1024 * 1024,
+            "max_entry_bytes": 20 * 1024 * 1024,
+            "heuristic_cap": 86400,  # upper bound for Last-Modified based freshness
+            "flush_delay": 5
+        }
+
+    def mode_for(self, profile_name: str) -> str:
+        return self.settings["profile_modes"].get(profile_name, self.settings["default_mode"])
+
+    def har_path(self, profile_name: str) -> Path:
+        return self.har_dir / f"{safe_profile_name(profile_name)}.har"
+
+    async def attach(self, context: BrowserContext, profile_name: str, router) -> str:
+        """Hook a new context up to the cache according to its profile's mode"""
+        mode = self.mode_for(profile_name)
+        if mode == "cache":
+            await self._load_index()
+            await router.set_cache(self)
+        elif mode == "replay":
+            har = self.har_path(profile_name)
+            if not har.exists():
+                # Failing here would abort a restart for every profile, not just this one
+                logger.warning(f"No HAR recorded for profile {profile_name} at {har}; replay is off for it")
+                return "off"
+            await context.route_from_har(har, not_found="abort")
+        elif mode == "record":
+            self.har_dir.mkdir(parents=True, exist_ok=True)
+            # Written out when the context closes
+            await context.route_from_har(self.har_path(profile_name), update=True, update_content="embed")
+        return mode
+
+    @staticmethod
+    def _key(profile_name: str, method: str, url: str) -> str:
+        return hashlib.sha1(f"{profile_name} {method} {url.split('#', 1)[0]}".encode()).hexdigest()
+
+    def _body_path(self, digest: str) -> Path:
+        return self.bodies_dir / digest[:2] / digest
+
+    async def _load_index(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.index_path.exists():
+            try:
+                self.index = await asyncio.to_thread(lambda: json.loads(self.index_path.read_text()))
+                logger.info(f"Response cache index loaded: {len(self.index)} entries")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable response cache index: {e}")
+                self.index = {}
+
+    async def handle(self, route: Route, request: Request, profile_name: str = "") -> bool:
+        """Answer a routed request from the cache; returns False to let it pass through"""
+        if request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+            return False
+        # all_headers() includes the cookie header that request.headers leaves out
+        request_headers = await request.all_headers()
+        if "no-store" in (request_headers.get("cache-control") or ""):
+            return False
+        if any(name in request_headers for name in CREDENTIAL_HEADERS):
+            return False
+
+        key = self._key(profile_name, request.method, request.url)
+        entry = self.index.get(key)
+        now = time.time()
+
+        if entry is not None and entry["expires_at"] > now:
+            body = await self._read_body(entry)
+            if body is not None:
+                self.hits += 1
+                await self._fulfill(route, entry, body)
+                return True
+
+        fetch_headers = None
+        if entry is not None:
+            # Stale: revalidate with the stored validators
+            fetch_headers = dict(request.headers)
+            if entry["headers"].get("etag"):
+                fetch_headers["if-none-match"] = entry["headers"]["etag"]
+            if entry["headers"].get("last-modified"):
+                fetch_headers["if-modified-since"] = entry["headers"]["last-modified"]
+
+        # Redirects go back to the browser, which then requests (and caches) the target under its own URL
+        response = await route.fetch(headers=fetch_headers, max_redirects=0)
+        headers = {k.lower(): v for k, v in response.headers.items()}
+
+        if response.status == 304 and entry is not None:
+            body = await self._read_body(entry)
+            if body is not None:
+                lifetime = freshness_lifetime({**entry["headers"], **headers}, now, self.settings["heuristic_cap"]) or 0.0
+                entry["expires_at"] = now + lifetime
+                self._mark_dirty()
+                self.revalidated += 1
+                await self._fulfill(route, entry, body)
+                return True
+            # The stored body is gone and the browser did not ask conditionally, so a 304 means nothing to it
+            self.index.pop(key, None)
+            self._mark_dirty()
+            response = await route.fetch(max_redirects=0)
+            headers = {k.lower(): v for k, v in response.headers.items()}
+
+        self.misses += 1
+        body = await response.body()
+        if response.status == 200 and len(body) <= self.settings["max_entry_bytes"]:
+            lifetime = freshness_lifetime(headers, now, self.settings["heuristic_cap"])
+            if lifetime is not None:
+                await self._store(key, request.url, response.status, headers, body, now + lifetime)
+        await route.fulfill(response=response, body=body)
+        return True
+
+    async def _fulfill(self, route: Route, entry: Dict[str, Any], body: bytes):
+        entry["last_used"] = time.time()
+        self.bytes_served += len(body)
+        await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+
+    async def _read_body(self, entry: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            return await asyncio.to_thread(self._body_path(entry["body"]).read_bytes)
+        except OSError:
+            return None
+
+    async def _store(self, key: str, url: str, status: int, headers: Dict[str, str], body: bytes, expires_at: float):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._body_path(digest)
+
+        def write():
+            if path.exists():
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+
+        await asyncio.to_thread(write)
+        self.index[key] = {
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k not in DROPPED_HEADERS},
+            "body": digest,
+            "size": len(body),
+            "expires_at": expires_at,
+            "last_used": time.time()
+        }
+        self.stored += 1
+        self._evict()
+        self._mark_dirty()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        sizes = {}
+        for entry in self.index.values():
+            sizes[entry["body"]] = entry["size"]
+        total = sum(sizes.values())
+        if total <= self.settings["max_bytes"]:
+            return
+
+        refs: Dict[str, int] = {}
+        for entry in self.index.values():
+            refs[entry["body"]] = refs.get(entry["body"], 0) + 1
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.settings["max_bytes"]:
+                break
+            del self.index[key]
+            refs[entry["body"]] -= 1
+            if refs[entry["body"]] == 0:
+                total -= entry["size"]
+                try:
+                    self._body_path(entry["body"]).unlink()
+                except OSError:
+                    pass
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        # Coalesce index writes from a burst of stores into one
+        await asyncio.sleep(self.settings["flush_delay"])
+        await self.flush()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        snapshot = json.dumps(self.index)
+
+        def write():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_suffix(".tmp")
+            tmp.write_text(snapshot)
+            os.replace(tmp, self.index_path)
+
+        await asyncio.to_thread(write)
+
+    async def clear(self):
+        """Remove every cached response"""
+        self.index = {}
+        self._dirty = False
+        await asyncio.to_thread(shutil.rmtree, self.bodies_dir, True)
+        try:
+            self.index_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.revalidated
+        return {
+            "settings": self.settings,
+            "entries": len(self.index),
+            "bytes": sum({e["body"]: e["size"] for e in self.index.values()}.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "stored": self.stored,
+            "hit_ratio": round((self.hits + self.revalidated) / lookups, 3) if lookups else None,
+            "bytes_served": self.bytes_served
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,266 @@
+from playwright.async_api import BrowserContext, Page, Route, Request, Response
+import re
+import logging
+from urllib.parse import urlsplit
+from typing import Dict, Any, Optional, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Typical transfer sizes used to estimate bytes saved before real sizes are observed
+DEFAULT_RESOURCE_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "script": 25_000,
+    "stylesheet": 15_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+    "other": 5_000,
+}
+
+AD_HOSTS = [
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com", "analytics.google.com",
+    "facebook.net", "connect.facebook.net", "scorecardresearch.com", "quantserve.com",
+    "hotjar.com", "segment.io", "segment.com", "mixpanel.com", "amplitude.com", "fullstory.com",
+    "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "adnxs.com", "rubiconproject.com",
+    "pubmatic.com", "openx.net", "moatads.com", "amazon-adsystem.com", "bat.bing.com", "clarity.ms",
+]
+
+PRESETS: Dict[str, Dict[str, Any]] = {
+    "ads": {
+        "hosts": AD_HOSTS,
+        # Patterns see the whole URL; this one is anchored past the host so it only matches path segments
+        "url_patterns": [r"^[a-z]+://[^/]+/(?:[^?#]*/)?(?:ads|adserver|analytics|collect|tracking|pixel|beacon)(?:[/.?]|$)"],
+    },
+    "media": {"resource_types": ["media"]},
+    "images": {"resource_types": ["image"]},
+    "fonts": {"resource_types": ["font"]},
+}
+
+
+class RoutingPolicy:
+    """A compiled set of block rules: resource types, host suffixes and URL regexes"""
+
+    def __init__(
+        self,
+        presets: Iterable[str] = (),
+        resource_types: Iterable[str] = (),
+        hosts: Iterable[str] = (),
+        url_patterns: Iterable[str] = (),
+    ):
+        self.presets = list(presets)
+        types = set(resource_types)
+        host_set = set(hosts)
+        patterns = list(url_patterns)
+        for name in self.presets:
+            if name not in PRESETS:
+                raise ValueError(f"Unknown routing preset: {name}")
+            preset = PRESETS[name]
+            types.update(preset.get("resource_types", []))
+            host_set.update(preset.get("hosts", []))
+            patterns.extend(preset.get("url_patterns", []))
+
+        self.resource_types = frozenset(types)
+        self.hosts = frozenset(h.lower().lstrip(".") for h in host_set)
+        self.url_pattern = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+
+    def is_empty(self) -> bool:
+        return not (self.resource_types or self.hosts or self.url_pattern)
+
+    def _host_blocked(self, host: str) -> bool:
+        # Check the host and each parent domain: a.b.example.com, b.example.com, example.com
+        while host:
+            if host in self.hosts:
+                return True
+            dot = host.find(".")
+            if dot == -1:
+                return False
+            host = host[dot + 1:]
+        return False
+
+    def match(self, url: str, resource_type: str) -> Optional[str]:
+        """Return why a request is blocked, or None if it may proceed"""
+        if resource_type in self.resource_types:
+            return f"type:{resource_type}"
+        if self.hosts or self.url_pattern:
+            parts = urlsplit(url)
+            if self.hosts and parts.hostname and self._host_blocked(parts.hostname):
+                return "host"
+            if self.url_pattern and self.url_pattern.search(url):
+                return "url"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "presets": self.presets,
+            "resource_types": sorted(self.resource_types),
+            "hosts": len(self.hosts),
+            "url_pattern": self.url_pattern.pattern if self.url_pattern else None,
+        }
+
+
+class RoutingStats:
+    def __init__(self):
+        self.requests_seen = 0
+        self.requests_blocked = 0
+        self.bytes_saved_estimate = 0
+        self.blocked_by_reason: Dict[str, int] = {}
+        # Running average of observed response sizes, per resource type
+        self._size_totals: Dict[str, List[int]] = {}
+
+    def observe_size(self, resource_type: str, size: int):
+        totals = self._size_totals.setdefault(resource_type, [0, 0])
+        totals[0] += size
+        totals[1] += 1
+
+    def estimated_size(self, resource_type: str) -> int:
+        totals = self._size_totals.get(resource_type)
+        if totals and totals[1]:
+            return totals[0] // totals[1]
+        return DEFAULT_RESOURCE_BYTES.get(resource_type, DEFAULT_RESOURCE_BYTES["other"])
+
+    def record_block(self, resource_type: str, reason: str):
+        self.requests_blocked += 1
+        self.bytes_saved_estimate += self.estimated_size(resource_type)
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests_seen": self.requests_seen,
+            "requests_blocked": self.requests_blocked,
+            "bytes_saved_estimate": self.bytes_saved_estimate,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+        }
+
+
+class ContextRouter:
+    """The single route handler of one context: block policy first, then the response cache.
+
+    The route is only registered once a policy or cache is set, since routing
+    every request through Python has a cost of its own. After that the policy
+    can be swapped at any time without re-registering. A page can carry its
+    own policy (e.g. for one workflow step) that applies to its requests only,
+    leaving the other tabs of the context on the profile policy.
+    """
+
+    def __init__(self, context: BrowserContext, profile_name: str, stats: RoutingStats):
+        self.context = context
+        self.profile_name = profile_name
+        self.policy: Optional[RoutingPolicy] = None
+        self.page_policies: Dict[Page, RoutingPolicy] = {}
+        self.cache = None
+        self.stats = stats
+        self.installed = False
+
+    async def _install(self):
+        if not self.installed:
+            self.installed = True
+            await self.context.route("**/*", self._handle)
+            self.context.on("response", self._on_response)
+
+    async def set_policy(self, policy: Optional[RoutingPolicy]):
+        self.policy = policy
+        if policy is not None:
+            await self._install()
+
+    async def set_page_policy(self, page: Page, policy: Optional[RoutingPolicy]):
+        """Override the policy for one page's requests; None removes the override"""
+        if policy is None:
+            self.page_policies.pop(page, None)
+            return
+        if page not in self.page_policies:
+            page.once("close", lambda p: self.page_policies.pop(p, None))
+        self.page_policies[page] = policy
+        await self._install()
+
+    def _policy_for(self, request: Request) -> Optional[RoutingPolicy]:
+        if self.page_policies:
+            try:
+                page = request.frame.page
+            except Exception:
+                page = None  # service worker requests have no frame
+            if page in self.page_policies:
+                return self.page_policies[page]
+        return self.policy
+
+    async def set_cache(self, cache):
+        """Serve requests that pass the policy through a ResponseCache"""
+        self.cache = cache
+        if cache is not None:
+            await self._install()
+
+    async def _handle(self, route: Route, request: Request):
+        policy = self._policy_for(request)
+        self.stats.requests_seen += 1
+        if policy is not None:
+            reason = policy.match(request.url, request.resource_type)
+            if reason:
+                self.stats.record_block(request.resource_type, reason)
+                await route.abort("blockedbyclient")
+                return
+        if self.cache is not None:
+            try:
+                if await self.cache.handle(route, request, self.profile_name):
+                    return
+            except Exception as e:
+                logger.warning(f"Response cache failed for {request.url}: {e}")
+        # fallback() hands the request to any other handlers on the context
+        await route.fallback()
+
+    def _on_response(self, response: Response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.stats.observe_size(response.request.resource_type, int(length))
+
+
+class RoutingPolicies:
+    """Per-profile routing policies and the routers attached to live contexts"""
+
+    def __init__(self):
+        self.profile_policies: Dict[str, RoutingPolicy] = {}
+        self.stats: Dict[str, RoutingStats] = {}
+        self._routers: Dict[BrowserContext, ContextRouter] = {}
+
+    async def set_profile_policy(self, profile_name: str, policy: Optional[RoutingPolicy]):
+        """Set the default policy for a profile and apply it to its live contexts"""
+        if policy is None or policy.is_empty():
+            self.profile_policies.pop(profile_name, None)
+            policy = None
+        else:
+            self.profile_policies[profile_name] = policy
+        for router in list(self._routers.values()):
+            if router.profile_name == profile_name:
+                await router.set_policy(policy)
+
+    async def attach(self, context: BrowserContext, profile_name: str):
+        """Register a freshly created context and apply its profile policy"""
+        stats = self.stats.setdefault(profile_name, RoutingStats())
+        router = ContextRouter(context, profile_name, stats)
+        self._routers[context] = router
+        context.on("close", lambda _: self._routers.pop(context, None))
+        await router.set_policy(self.profile_policies.get(profile_name))
+        return router
+
+    def router_for(self, context: BrowserContext) -> Optional[ContextRouter]:
+        return self._routers.get(context)
+
+    async def use_policy(self, page: Page, policy: Optional[RoutingPolicy]):
+        """Temporarily override the policy of one page, e.g. for one workflow step.
+
+        Other pages of the same context keep the profile policy. Pass None to
+        fall back to the profile default.
+        """
+        router = self._routers.get(page.context)
+        if router is None:
+            return
+        await router.set_page_policy(page, policy)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "profiles": {name: stats.to_dict() for name, stats in self.stats.items()},
+            "policies": {name: policy.to_dict() for name, policy in self.profile_policies.items()},
+        }
+
+
+routing_policies = RoutingPolicies()
@@ -1,31 +1,43 @@
-from fastapi import FastAPI, APIRouter, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import FastAPI, APIRouter, Request, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 import uuid
-from datetime import datetime, timezone
 import asyncio
 import json
 import base64
+import re
+import time
 
 from browser_manager import browser_manager
-from automation_engine import AutomationEngine
-from workflows.gmail_gemini_youtube import GmailGeminiYouTubeWorkflow
+from tab_hibernation import TabHibernator
+from resource_monitor import ResourceMonitor
+from routing_policy import RoutingPolicy, PRESETS
+from response_cache import CACHE_MODES
+from navigation import Readiness, page_navigator
+from crash_watchdog import BrowserSupervisor, BrowserCrashedError
+from admission import admission_controller
+from session_registry import create_session_registry, FORWARDED_HEADER
+from tab_actors import TabActors, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+from database import mongo
+from lifecycle import Lifecycle
+from profiling import profiler
+from loop_monitor import loop_monitor
+from llm_config_store import LLMConfigStore
+from page_snapshot import page_snapshots
+from thumbnails import ThumbnailService
+from network_capture import NetworkCapture
+from session_recording import SessionRecorder, SessionReplayer
+import metrics
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # Create the main app without a prefix
 app = FastAPI()
 
@@ -47,17 +59,21 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        metrics.websocket_connections.inc()
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
+        metrics.websocket_connections.dec()
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
     async def broadcast(self, message: dict):
+        metrics.websocket_broadcasts.inc(message.get("type", "unknown"))
         for connection in self.active_connections:
             try:
                 await connection.send_json(message)
             except Exception as e:
+                metrics.websocket_send_failures.inc()
                 logger.error(f"Error broadcasting to WebSocket: {e}")
 
 manager = ConnectionManager()
@@ -65,11 +81,79 @@ manager = ConnectionManager()
 # Models
 class BrowserSettings(BaseModel):
     browser_type: Optional[str] = "chromium"
-    headless: Optional[bool] = False
+    headless: Optional[bool] = None  # left as deployed (BROWSER_HEADLESS) unless given
     viewport: Optional[Dict[str, int]] = {"width": 1920, "height": 1080}
     user_agent: Optional[str] = None
     timezone: Optional[str] = None
     language: Optional[str] = "en-US"
+    persistent_profiles: Optional[List[str]] = None
+    profile_state_max_age: Optional[int] = None
+    idle_context_ttl: Optional[int] = None
+
+class ResourceMonitorSettings(BaseModel):
+    enabled: Optional[bool] = None
+    interval: Optional[int] = None
+    rss_budget_mb: Optional[int] = None
+    pressure_actions: Optional[List[str]] = None
+    max_actions_per_cycle: Optional[int] = None
+
+class RoutingPolicyRequest(BaseModel):
+    profile: Optional[str] = "default"
+    presets: Optional[List[str]] = []
+    resource_types: Optional[List[str]] = []
+    hosts: Optional[List[str]] = []
+    url_patterns: Optional[List[str]] = []  # regexes searched anywhere in the full URL
+
+class ResponseCacheSettings(BaseModel):
+    default_mode: Optional[str] = None
+    profile_modes: Optional[Dict[str, str]] = None
+    max_bytes: Optional[int] = None
+    max_entry_bytes: Optional[int] = None
+
+class HibernationSettings(BaseModel):
+    enabled: Optional[bool] = None
+    idle_timeout: Optional[int] = None
+    check_interval: Optional[int] = None
+    min_live_tabs: Optional[int] = None
+
+class AdmissionClassSettings(BaseModel):
+    # Unknown keys are rejected rather than silently stored next to the real ones
+    model_config = ConfigDict(extra="forbid")
+    
+    limit: Optional[int] = Field(None, ge=1)
+    queue: Optional[int] = Field(None, ge=0)
+    shed_at: Optional[float] = Field(None, gt=0, le=1)
+    max_wait: Optional[float] = Field(None, gt=0)
+    expected_s: Optional[float] = Field(None, gt=0)
+
+class AdmissionSettings(BaseModel):
+    enabled: Optional[bool] = None
+    max_waiting: Optional[int] = None
+    classes: Optional[Dict[str, AdmissionClassSettings]] = None  # class name -> settings
+
+class TabQueueSettings(BaseModel):
+    priority_lane: Optional[bool] = None
+
+class NetworkCaptureSettings(BaseModel):
+    enabled: Optional[bool] = None
+    buffer_size: Optional[int] = None
+    capture_bodies: Optional[bool] = None
+    max_body_bytes: Optional[int] = None
+    flush_on_step_failure: Optional[bool] = None
+
+class ReplayRequest(BaseModel):
+    recording_id: str
+    speed: Optional[float] = 1.0  # 2.0 = twice as fast; 0 = as fast as conditions allow
+    condition_timeout: Optional[int] = None  # ms per event
+
+class ThumbnailSettings(BaseModel):
+    enabled: Optional[bool] = None
+    interval: Optional[float] = None
+    settle: Optional[float] = None
+    max_per_cycle: Optional[int] = None
+    max_bytes: Optional[int] = None
+    width: Optional[int] = None
+    quality: Optional[int] = None
 
 class TabCreate(BaseModel):
     url: Optional[str] = "about:blank"
@@ -77,6 +161,25 @@ class TabCreate(BaseModel):
 
 class NavigateRequest(BaseModel):
     url: str
+    # Readiness predicate: {"selector": ..., "network_quiet_ms": ..., "js": ..., "ignore_hosts": [...]}
+    wait_for: Optional[Dict[str, Any]] = None
+    timeout: Optional[int] = None  # ms; learned per host when omitted
+
+class BulkTabCreate(BaseModel):
+    tabs: List[TabCreate]
+    concurrency: Optional[int] = None
+
+class BulkNavigateItem(NavigateRequest):
+    page_id: str
+
+class BulkNavigate(BaseModel):
+    tabs: List[BulkNavigateItem]
+    concurrency: Optional[int] = None
+
+class BulkTabIds(BaseModel):
+    page_ids: List[str]
+    concurrency: Optional[int] = None
+    thumbnail: Optional[bool] = False  # screenshots only: small previews instead of full frames
 
 class AutomationSettings(BaseModel):
     human_delays: Optional[bool] = True
@@ -88,6 +191,29 @@ class WorkflowRequest(BaseModel):
     workflow_type: str  # "gmail_gemini_youtube"
     sender_filter: Optional[str] = "ChatGPT"
     page_id: str
+    job_id: Optional[str] = None  # generated when omitted; arm a profiling rule with it beforehand
+
+class ProfilingRule(BaseModel):
+    route: Optional[str] = None  # e.g. "/api/tabs/{page_id}/navigate"
+    method: Optional[str] = None
+    job_id: Optional[str] = None
+    count: Optional[int] = 1
+    mode: Optional[str] = "sampling"  # or "cprofile"
+
+class LoopMonitorSettings(BaseModel):
+    lag_interval: Optional[float] = None
+    slow_callback_ms: Optional[float] = None
+    max_offenders: Optional[int] = None
+
+class SnapshotSettings(BaseModel):
+    max_nodes: Optional[int] = None
+    max_text: Optional[int] = None
+    history: Optional[int] = None
+
+class ProfilingSettings(BaseModel):
+    sample_interval_ms: Optional[float] = None
+    max_profiles: Optional[int] = None
+    top_functions: Optional[int] = None
 
 class LLMConfig(BaseModel):
     api_key: str
@@ -99,39 +225,214 @@ class ChatMessage(BaseModel):
     page_id: str
     llm_config: Optional[LLMConfig] = None
 
-# Store active tabs and contexts
-active_tabs = {}  # page_id -> {context_id, page, title, url, favicon}
-active_contexts = {}  # context_id -> {pages: []}
+# Tab table owned by the browser manager's registry: page_id -> {context_id, page, title, url, favicon}.
+# Read it freely; tabs and contexts are added and removed through browser_manager only.
+active_tabs = browser_manager.registry.tabs
+tab_actors = TabActors()
+tab_hibernator = TabHibernator(browser_manager, tab_actors)
+resource_monitor = ResourceMonitor(browser_manager, tab_hibernator, tab_actors)
+supervisor = BrowserSupervisor(browser_manager)
+thumbnails = ThumbnailService(browser_manager, tab_hibernator, tab_actors)
+network_capture = NetworkCapture(browser_manager)
+session_recorder = SessionRecorder(browser_manager)
+session_replayer = SessionReplayer()
+# Which worker owns each tab; shared through Mongo when several workers run (WORKER_URL)
+session_registry = create_session_registry(mongo)
+llm_configs = LLMConfigStore(mongo)
+# Bring-up state of each subsystem, reported by /api/ready
+lifecycle = Lifecycle(["mongo", "session_registry", "llm_configs", "playwright", "browser", "default_tab"])
 
-# Initialize browser on startup
-@app.on_event("startup")
-async def startup_event():
-    await browser_manager.initialize()
-    logger.info("Browser Manager initialized")
+def crash_retry_exception(error: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail={"error": str(error), "retryable": True},
+        headers={"Retry-After": "5"}
+    )
+
+background_tasks: Set[asyncio.Task] = set()  # fire-and-forget work, held so it is not collected mid-flight
+
+def spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+def on_page_discarded(page_id: str):
+    """The browser manager dropped a tab whose page was lost (crash, failed restore, reaped)"""
+    tab_hibernator.forget(page_id)
+    resource_monitor.forget(page_id)
+    tab_actors.forget(page_id)
+    page_snapshots.forget(page_id)
+    thumbnails.forget(page_id)
+    network_capture.forget(page_id)
+    session_recorder.forget(page_id)
+    session_registry.release(page_id)
+    spawn(manager.broadcast({"type": "tab_closed", "data": {"id": page_id}}))
+
+def on_page_created(page_id: str, page):
+    tab_info = active_tabs[page_id]
+    session_registry.claim_tab(page_id, tab_info["context_id"], tab_info["url"], tab_info["title"])
+
+browser_manager.add_listener("page_discarded", on_page_discarded)
+browser_manager.add_listener("page_created", on_page_created)
+browser_manager.add_listener("page_closed", session_registry.release)
+browser_manager.add_listener("context_created", session_registry.claim_context)
+browser_manager.add_listener("context_closed", session_registry.release)
+
+async def on_browser_recovered(report: Dict[str, Any]):
+    await manager.broadcast({"type": "browser_recovered", "data": report})
+
+async def get_tab_page(page_id: str):
+    """Resolve a tab to its live page, transparently restoring it if hibernated"""
+    await ensure_browser()
+    try:
+        await supervisor.wait_until_healthy()
+    except BrowserCrashedError as e:
+        raise crash_retry_exception(e)
+    
+    if page_id not in active_tabs:
+        raise HTTPException(status_code=404, detail="Tab not found")
     
+    tab_hibernator.touch(page_id)
+    if tab_hibernator.is_hibernated(page_id):
+        return await tab_hibernator.restore(page_id)
+    await resource_monitor.unthrottle(page_id)
+    
+    page = active_tabs[page_id].get("page")
+    if not page or page.is_closed():
+        raise HTTPException(status_code=404, detail="Page is closed")
+    return page
+
+async def run_on_tab(page_id: str, operation, priority: int = PRIORITY_NORMAL):
+    """Run operation(page) through the tab's actor so operations on one page never overlap.
+
+    The page is resolved when the operation starts, not when it is queued, so a
+    restart or restore while it waits does not leave it holding a stale Page.
+    """
+    if page_id not in active_tabs:
+        raise HTTPException(status_code=404, detail="Tab not found")
+    
+    async def call():
+        return await operation(await get_tab_page(page_id))
+    
+    return await tab_actors.submit(page_id, call, priority)
+
+async def open_default_tab():
     # Create default context and page
     context_id, context = await browser_manager.create_context("default")
     page_id, page = await browser_manager.create_page(context_id)
     
-    active_contexts[context_id] = {"pages": [page_id]}
-    active_tabs[page_id] = {
-        "context_id": context_id,
-        "page": page,
-        "title": "New Tab",
-        "url": "about:blank",
-        "favicon": ""
-    }
-    
     # Navigate to a default page
     await page.goto("about:blank")
     logger.info(f"Default tab created: {page_id}")
 
+async def bring_up_browser():
+    """Start Playwright, the browser and the default tab; steps that already succeeded are skipped on retry"""
+    await lifecycle.run("playwright", browser_manager.start_playwright)
+    await lifecycle.run("browser", browser_manager.launch_browser)
+    browser_manager.start_background_tasks()
+    logger.info("Browser Manager initialized")
+    await lifecycle.run("default_tab", open_default_tab)
+    
+    supervisor.start(on_browser_recovered)
+    tab_hibernator.start(active_tabs)
+    resource_monitor.start(active_tabs, discard_tab)
+    thumbnails.start(active_tabs)
+
+async def bring_up_mongo():
+    """Wait for Mongo, then start what depends on it; failed steps are retried with backoff until all are up"""
+    steps = [("mongo", mongo.ping), ("session_registry", session_registry.start), ("llm_configs", llm_configs.start)]
+    delay = 1.0
+    while True:
+        failed = False
+        for name, step in steps:
+            try:
+                await lifecycle.run(name, step)
+            except Exception:
+                failed = True
+                if name == "mongo":
+                    break  # nothing else can start without it
+        if not failed:
+            return
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 60)
+
+async def ensure_browser():
+    """Wait for the background browser bring-up, retrying it on first use if it failed"""
+    try:
+        await lifecycle.ensure("browser", bring_up_browser, timeout=60)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail={"error": "Browser is still starting", "retryable": True},
+                            headers={"Retry-After": "5"})
+    except Exception as e:
+        raise HTTPException(status_code=503, detail={"error": f"Browser unavailable: {e}", "retryable": True},
+                            headers={"Retry-After": "5"})
+
+# Startup returns right away; the browser and Mongo come up in the background
+@app.on_event("startup")
+async def startup_event():
+    loop_monitor.start()
+    lifecycle.start("browser", bring_up_browser)
+    lifecycle.start("mongo", bring_up_mongo)
+
 @app.on_event("shutdown")
 async def shutdown_event():
+    lifecycle.stop()
+    loop_monitor.stop()
+    supervisor.stop()
+    tab_hibernator.stop()
+    resource_monitor.stop()
+    thumbnails.stop()
     await browser_manager.cleanup()
-    client.close()
+    await session_registry.stop()
+    await llm_configs.stop()
+    mongo.close()
     logger.info("Application shutdown complete")
 
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    # Innermost, so time queued for admission is not profiled; free while no rule is armed
+    if not profiler.rules:
+        return await call_next(request)
+    with profiler.request(request.method, request.url.path):
+        return await call_next(request)
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    # Sheds /api requests with 429 + Retry-After before they start browser work
+    return await admission_controller.middleware(request, call_next)
+
+TAB_PATH = re.compile(r"^/api/tabs/([0-9a-f-]{36})(?:/|$)")  # page ids are UUIDs
+
+@app.middleware("http")
+async def tab_affinity(request: Request, call_next):
+    # Tabs live in the worker that created them; send requests for another worker's tab there
+    match = TAB_PATH.match(request.url.path)
+    if (session_registry.distributed and match and match.group(1) not in active_tabs
+            and FORWARDED_HEADER not in request.headers):
+        owner = await session_registry.owner_of(match.group(1))
+        if owner:
+            return await session_registry.forward(request, owner)
+    return await call_next(request)
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    # Outermost, so shed and forwarded requests are measured too
+    metrics.http_requests_in_flight.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.http_requests_in_flight.dec()
+        route = request.scope.get("route")
+        # Label by route template, not raw path, so tab ids do not explode the series count
+        metrics.http_request_seconds.observe(
+            time.perf_counter() - started, request.method, route.path if route else "unmatched", str(status)
+        )
+
 # Routes
 @api_router.get("/")
 async def root():
@@ -144,74 +445,165 @@ async def get_browser_status():
         "headless": browser_manager.settings["headless"],
         "active_contexts": len(browser_manager.contexts),
         "active_pages": len(browser_manager.pages),
+        "memory": resource_monitor.get_summary(),
+        "health": supervisor.get_stats(),
         "settings": browser_manager.settings
     }
 
+@api_router.get("/live")
+async def liveness():
+    """The process is up and its event loop is responding"""
+    return {"alive": True, "uptime_s": lifecycle.report()["uptime_s"]}
+
+@api_router.get("/ready")
+async def readiness():
+    """Ready once the browser and default tab are up (and Mongo when tabs are shared across workers)"""
+    required = ["playwright", "browser", "default_tab"] + (
+        ["mongo", "session_registry"] if session_registry.distributed else []
+    )
+    ready = lifecycle.ready(required) and supervisor.get_stats()["healthy"]
+    return Response(
+        content=json.dumps({"ready": ready, "required": required, **lifecycle.report()}),
+        status_code=200 if ready else 503,
+        media_type="application/json"
+    )
+
+@api_router.get("/browser/health")
+async def get_browser_health():
+    """Crash counts and recent recoveries"""
+    return supervisor.get_stats()
+
+@api_router.get("/browser/registry")
+async def get_browser_registry():
+    """Tab ownership per context and what the orphan reaper has reclaimed"""
+    return {**browser_manager.registry.get_stats(), "reaped": browser_manager.reaped}
+
+@api_router.post("/browser/reap")
+async def reap_browser_orphans():
+    """Run the orphan reaper now instead of waiting for its next sweep"""
+    await ensure_browser()
+    return await browser_manager.reap_orphans()
+
+@api_router.get("/browser/metrics")
+async def get_browser_metrics(refresh: bool = False):
+    """Per-tab CDP metrics, browser process RSS and recent memory-pressure actions"""
+    if refresh:
+        await resource_monitor.sample()
+    return resource_monitor.get_metrics()
+
+@api_router.post("/browser/metrics/settings")
+async def update_metrics_settings(settings: ResourceMonitorSettings):
+    resource_monitor.settings.update(settings.dict(exclude_none=True))
+    return {"success": True, "settings": resource_monitor.settings}
+
+@api_router.get("/sessions")
+async def get_session_registry():
+    """This worker's identity and the tabs and contexts it owns"""
+    return session_registry.get_stats()
+
+@api_router.get("/admission")
+async def get_admission_stats():
+    """Per-class concurrency, queue depth and shed counts"""
+    return admission_controller.get_stats()
+
+@api_router.post("/admission/settings")
+async def update_admission_settings(settings: AdmissionSettings):
+    new_settings = settings.dict(exclude_none=True)
+    classes = new_settings.pop("classes", {})
+    unknown = [name for name in classes if name not in admission_controller.classes]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown admission class(es): {unknown}")
+    try:
+        for name, config in classes.items():
+            admission_controller.update_class(name, config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    admission_controller.settings.update(new_settings)
+    return {"success": True, **admission_controller.get_stats()}
+
 @api_router.post("/browser/settings")
 async def update_browser_settings(settings: BrowserSettings):
+    await ensure_browser()
     try:
-        # Store current tab info before restart
-        tabs_backup = []
-        for page_id, tab_info in active_tabs.items():
-            page = tab_info["page"]
-            try:
-                tabs_backup.append({
-                    "url": page.url if page else tab_info["url"],
-                    "title": await page.title() if page else tab_info["title"]
-                })
-            except:
-                tabs_backup.append({
-                    "url": tab_info.get("url", "about:blank"),
-                    "title": tab_info.get("title", "New Tab")
-                })
-        
-        # Update settings (this may restart browser)
-        await browser_manager.update_settings(settings.dict(exclude_none=True))
+        # Restarts are blue/green: tabs keep serving from the old browser until the swap
+        report = await browser_manager.update_settings(settings.dict(exclude_none=True))
         
-        # Clear old tabs and contexts
-        active_tabs.clear()
-        active_contexts.clear()
+        if report["restarted"]:
+            # Page ids survive the swap and the registry already points tabs at their restored Pages
+            await manager.broadcast({"type": "browser_restarted", "data": report})
         
-        # Recreate default context
-        context_id, context = await browser_manager.create_context("default")
-        active_contexts[context_id] = {"pages": [], "profile": "default"}
-        
-        # Recreate tabs with backed up URLs
-        for tab_data in tabs_backup[:3]:  # Limit to 3 tabs to avoid issues
-            page_id, page = await browser_manager.create_page(context_id)
-            active_contexts[context_id]["pages"].append(page_id)
-            active_tabs[page_id] = {
-                "context_id": context_id,
-                "page": page,
-                "title": tab_data["title"],
-                "url": tab_data["url"],
-                "favicon": ""
-            }
-            try:
-                await page.goto(tab_data["url"], wait_until="domcontentloaded", timeout=10000)
-            except:
-                pass
-        
-        # If no tabs were backed up, create a default one
-        if not tabs_backup:
-            page_id, page = await browser_manager.create_page(context_id)
-            active_contexts[context_id]["pages"].append(page_id)
-            active_tabs[page_id] = {
-                "context_id": context_id,
-                "page": page,
-                "title": "New Tab",
-                "url": "about:blank",
-                "favicon": ""
-            }
-            await page.goto("about:blank")
-        
-        return {"success": True, "settings": browser_manager.settings}
+        return {"success": True, "settings": browser_manager.settings, "restart": report}
     except Exception as e:
         logger.error(f"Failed to update settings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/profiles/{profile}/state")
+async def save_profile_state(profile: str):
+    """Snapshot the storage state of a profile's live context"""
+    await ensure_browser()
+    context_id = browser_manager.registry.context_for_profile(profile)
+    if context_id is None:
+        raise HTTPException(status_code=404, detail="No open context for profile")
+    saved = await browser_manager.save_profile_state(context_id)
+    return {"success": saved, "profile": profile}
+
+@api_router.delete("/profiles/{profile}/state")
+async def clear_profile_state(profile: str):
+    """Forget a profile's saved storage state"""
+    browser_manager.profile_state.discard(profile)
+    return {"success": True, "profile": profile}
+
+@api_router.post("/routing/policies")
+async def set_routing_policy(request: RoutingPolicyRequest):
+    """Set the request-blocking policy for a profile; an empty policy removes it"""
+    try:
+        policy = RoutingPolicy(
+            presets=request.presets or [],
+            resource_types=request.resource_types or [],
+            hosts=request.hosts or [],
+            url_patterns=request.url_patterns or []
+        )
+    except (ValueError, re.error) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    await browser_manager.routing.set_profile_policy(request.profile, policy)
+    return {"success": True, "profile": request.profile, "policy": policy.to_dict()}
+
+@api_router.get("/routing/stats")
+async def get_routing_stats():
+    return {"presets": list(PRESETS), **browser_manager.routing.get_stats()}
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    return browser_manager.response_cache.get_stats()
+
+@api_router.post("/cache/settings")
+async def update_cache_settings(settings: ResponseCacheSettings):
+    """Set cache modes (off/cache/replay/record); applies to contexts created afterwards"""
+    new_settings = settings.dict(exclude_none=True)
+    modes = list(new_settings.get("profile_modes", {}).values())
+    if "default_mode" in new_settings:
+        modes.append(new_settings["default_mode"])
+    invalid = [m for m in modes if m not in CACHE_MODES]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid cache mode(s): {invalid}; expected one of {list(CACHE_MODES)}")
+    
+    browser_manager.response_cache.settings.update(new_settings)
+    return {"success": True, "settings": browser_manager.response_cache.settings}
+
+@api_router.delete("/cache")
+async def clear_cache():
+    await browser_manager.response_cache.clear()
+    return {"success": True}
+
+@api_router.get("/navigation/stats")
+async def get_navigation_stats():
+    """Learned ready times and timeouts per host"""
+    return page_navigator.get_stats()
+
 @api_router.get("/tabs")
 async def get_tabs():
+    await ensure_browser()
     tabs_list = []
     for page_id, tab_info in active_tabs.items():
         page = tab_info["page"]
@@ -219,123 +611,137 @@ async def get_tabs():
             "id": page_id,
             "title": await page.title() if page else tab_info["title"],
             "url": page.url if page else tab_info["url"],
-            "favicon": tab_info.get("favicon", "")
+            "favicon": tab_info.get("favicon", ""),
+            "hibernated": tab_hibernator.is_hibernated(page_id)
         })
+    # Tabs of other workers, as last recorded by their owners
+    tabs_list.extend(await session_registry.remote_tabs())
     return {"tabs": tabs_list}
 
+_context_lock = asyncio.Lock()
+
+async def context_for_profile(profile: str) -> str:
+    """The profile's context, created on first use; concurrent creates for one profile share it"""
+    context_id = browser_manager.registry.context_for_profile(profile)
+    if context_id:
+        return context_id
+    async with _context_lock:
+        context_id = browser_manager.registry.context_for_profile(profile)
+        if not context_id:
+            context_id, context = await browser_manager.create_context(profile)
+        return context_id
+
+async def open_tab(tab_request: TabCreate) -> Dict[str, Any]:
+    """Open a page in the profile's context and navigate it; returns {id, title, url}"""
+    context_id = await context_for_profile(tab_request.profile or "default")
+    page_id, page = await browser_manager.create_page(context_id)
+    
+    active_tabs[page_id]["url"] = tab_request.url or "about:blank"
+    tab_hibernator.touch(page_id)
+    
+    # Navigate if URL provided
+    title = ""
+    if tab_request.url and tab_request.url != "about:blank":
+        try:
+            await page_navigator.navigate(page, tab_request.url)
+            title = await page.title()
+        except Exception:
+            # Nobody was told about this tab yet, so nobody could close it
+            await discard_tab(page_id, broadcast=False)
+            raise
+        session_registry.update_tab(page_id, url=page.url, title=title)
+    return {"id": page_id, "title": title, "url": page.url}
+
 @api_router.post("/tabs")
 async def create_tab(tab_request: TabCreate):
+    await ensure_browser()
     try:
-        # Get or create context
-        profile = tab_request.profile or "default"
-        context_id = None
-        
-        # Find existing context for this profile
-        for cid, ctx_info in active_contexts.items():
-            if ctx_info.get("profile") == profile:
-                context_id = cid
-                break
-        
-        # Create new context if not found
-        if not context_id:
-            context_id, context = await browser_manager.create_context(profile)
-            active_contexts[context_id] = {"pages": [], "profile": profile}
-        
-        # Create new page
-        page_id, page = await browser_manager.create_page(context_id)
-        
-        active_contexts[context_id]["pages"].append(page_id)
-        active_tabs[page_id] = {
-            "context_id": context_id,
-            "page": page,
-            "title": "New Tab",
-            "url": tab_request.url or "about:blank",
-            "favicon": ""
-        }
-        
-        # Navigate if URL provided
-        if tab_request.url and tab_request.url != "about:blank":
-            await page.goto(tab_request.url, wait_until="domcontentloaded")
+        tab = await open_tab(tab_request)
         
         # Broadcast tab creation
-        await manager.broadcast({
-            "type": "tab_created",
-            "data": {
-                "id": page_id,
-                "title": await page.title(),
-                "url": page.url
-            }
-        })
+        await manager.broadcast({"type": "tab_created", "data": tab})
         
-        return {
-            "success": True,
-            "tab": {
-                "id": page_id,
-                "title": await page.title(),
-                "url": page.url
-            }
-        }
+        return {"success": True, "tab": tab}
     except Exception as e:
         logger.error(f"Failed to create tab: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def discard_tab(page_id: str, broadcast: bool = True):
+    """Close a tab's page and drop its bookkeeping"""
+    # Also unregisters the tab from its context
+    await browser_manager.close_page(page_id)
+    tab_hibernator.forget(page_id)
+    resource_monitor.forget(page_id)
+    tab_actors.forget(page_id)
+    page_snapshots.forget(page_id)
+    thumbnails.forget(page_id)
+    network_capture.forget(page_id)
+    session_recorder.forget(page_id)
+    
+    # Broadcast tab closure
+    if broadcast:
+        await manager.broadcast({
+            "type": "tab_closed",
+            "data": {"id": page_id}
+        })
+
 @api_router.delete("/tabs/{page_id}")
 async def close_tab(page_id: str):
     try:
         if page_id not in active_tabs:
             raise HTTPException(status_code=404, detail="Tab not found")
         
-        tab_info = active_tabs[page_id]
-        context_id = tab_info["context_id"]
-        
-        await browser_manager.close_page(page_id)
-        
-        # Remove from active tabs
-        del active_tabs[page_id]
-        
-        # Remove from context pages list
-        if context_id in active_contexts:
-            active_contexts[context_id]["pages"].remove(page_id)
-        
-        # Broadcast tab closure
-        await manager.broadcast({
-            "type": "tab_closed",
-            "data": {"id": page_id}
-        })
+        # Not queued on the tab's actor, so a tab can be closed even behind a long workflow;
+        # operations still queued for it fail with 404
+        await discard_tab(page_id)
         
         return {"success": True}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to close tab: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.post("/tabs/{page_id}/navigate")
-async def navigate_tab(page_id: str, request: NavigateRequest):
+async def navigate_on_tab(page_id: str, request: NavigateRequest) -> Dict[str, Any]:
+    """Navigate a tab through its actor; returns {url, title, ready, timings_ms}"""
     try:
-        if page_id not in active_tabs:
-            raise HTTPException(status_code=404, detail="Tab not found")
-        
-        page = active_tabs[page_id]["page"]
-        await page.goto(request.url, wait_until="domcontentloaded")
+        readiness = Readiness.from_dict(request.wait_for)
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid wait_for: {e}")
+    
+    async def navigate(page):
+        navigation = await page_navigator.navigate(page, request.url, readiness, request.timeout)
         
         # Update tab info
         active_tabs[page_id]["url"] = page.url
         active_tabs[page_id]["title"] = await page.title()
+        session_registry.update_tab(page_id, url=page.url, title=active_tabs[page_id]["title"])
+        return navigation
+    
+    navigation = await run_on_tab(page_id, navigate)
+    tab_info = active_tabs[page_id]
+    return {
+        "url": tab_info["url"],
+        "title": tab_info["title"],
+        "ready": navigation["ready"],
+        "timings_ms": navigation["timings_ms"]
+    }
+
+@api_router.post("/tabs/{page_id}/navigate")
+async def navigate_tab(page_id: str, request: NavigateRequest):
+    try:
+        result = await navigate_on_tab(page_id, request)
+        session_recorder.record(page_id, "navigate", url=request.url)
         
         # Broadcast navigation
         await manager.broadcast({
             "type": "tab_navigated",
-            "data": {
-                "id": page_id,
-                "url": page.url,
-                "title": await page.title()
-            }
+            "data": {"id": page_id, "url": result["url"], "title": result["title"]}
         })
         
-        return {
-            "success": True,
-            "url": page.url,
-            "title": await page.title()
-        }
+        return {"success": True, **result}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Navigation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -343,14 +749,9 @@ async def navigate_tab(page_id: str, request: NavigateRequest):
 @api_router.get("/tabs/{page_id}/screenshot")
 async def get_tab_screenshot(page_id: str):
     try:
-        if page_id not in active_tabs:
-            raise HTTPException(status_code=404, detail="Tab not found")
-        
-        page = active_tabs[page_id].get("page")
-        if not page or page.is_closed():
-            raise HTTPException(status_code=404, detail="Page is closed")
-        
-        screenshot = await browser_manager.take_screenshot(page_id)
+        screenshot = await run_on_tab(
+            page_id, lambda page: browser_manager.take_screenshot(page_id), PRIORITY_BACKGROUND
+        )
         
         return StreamingResponse(
             iter([screenshot]),
@@ -363,6 +764,227 @@ async def get_tab_screenshot(page_id: str):
         logger.error(f"Screenshot failed: {e}")
         raise HTTPException(status_code=500, detail=f"Screenshot error: {str(e)}")
 
+# Bulk tab operations: bounded concurrency, a result per tab, one broadcast per request
+BULK_MAX_TABS = 100
+BULK_CONCURRENCY = 8
+
+async def run_bulk(items: list, operation, concurrency: Optional[int], key=None) -> List[Dict[str, Any]]:
+    """Run operation(item) for every item, at most `concurrency` at once; failures stay per item.
+
+    key(item) names the tab in failed results so callers can match them up.
+    """
+    if len(items) > BULK_MAX_TABS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_TABS} tabs per bulk request")
+    semaphore = asyncio.Semaphore(max(1, min(concurrency or BULK_CONCURRENCY, BULK_MAX_TABS)))
+    
+    async def run(item):
+        async with semaphore:
+            try:
+                return {"success": True, **await operation(item)}
+            except HTTPException as e:
+                failure = {"success": False, "status": e.status_code, "error": e.detail}
+            except Exception as e:
+                failure = {"success": False, "status": 500, "error": str(e)}
+            return {"id": key(item), **failure} if key else failure
+    
+    return await asyncio.gather(*(run(item) for item in items))
+
+async def ensure_local_tab(page_id: str):
+    """Fail a bulk item whose tab lives in another worker, naming the owner so the client can go there.
+
+    Bulk requests name many tabs, so the affinity middleware cannot route them as a whole.
+    """
+    if page_id in active_tabs or not session_registry.distributed:
+        return
+    owner = await session_registry.owner_of(page_id)
+    if owner:
+        raise HTTPException(status_code=421, detail={
+            "error": "Tab is owned by another worker",
+            "worker_id": owner["worker_id"],
+            "worker_url": owner["worker_url"]
+        })
+
+async def broadcast_bulk(action: str, results: List[Dict[str, Any]]):
+    tabs = [r for r in results if r["success"]]
+    if tabs:
+        await manager.broadcast({"type": "tabs_bulk", "data": {"action": action, "tabs": tabs}})
+
+def bulk_response(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    succeeded = sum(1 for r in results if r["success"])
+    return {"success": succeeded == len(results), "succeeded": succeeded, "failed": len(results) - succeeded,
+            "results": results}
+
+@api_router.post("/bulk/tabs")
+async def bulk_create_tabs(request: BulkTabCreate):
+    """Open many tabs at once; results are in request order"""
+    await ensure_browser()
+    results = await run_bulk(request.tabs, open_tab, request.concurrency)
+    await broadcast_bulk("created", results)
+    return bulk_response(results)
+
+@api_router.post("/bulk/tabs/navigate")
+async def bulk_navigate_tabs(request: BulkNavigate):
+    async def navigate(item: BulkNavigateItem):
+        await ensure_local_tab(item.page_id)
+        return {"id": item.page_id, **await navigate_on_tab(item.page_id, item)}
+    
+    results = await run_bulk(request.tabs, navigate, request.concurrency, key=lambda item: item.page_id)
+    await broadcast_bulk("navigated", results)
+    return bulk_response(results)
+
+@api_router.post("/bulk/tabs/close")
+async def bulk_close_tabs(request: BulkTabIds):
+    async def close(page_id: str):
+        await ensure_local_tab(page_id)
+        if page_id not in active_tabs:
+            raise HTTPException(status_code=404, detail="Tab not found")
+        await discard_tab(page_id, broadcast=False)
+        return {"id": page_id}
+    
+    results = await run_bulk(request.page_ids, close, request.concurrency, key=str)
+    await broadcast_bulk("closed", results)
+    return bulk_response(results)
+
+@api_router.post("/bulk/tabs/screenshot")
+async def bulk_screenshot_tabs(request: BulkTabIds):
+    """Screenshots of many tabs as base64 JPEGs in one response"""
+    capture = browser_manager.capture_thumbnail if request.thumbnail else browser_manager.take_screenshot
+    
+    async def screenshot(page_id: str):
+        await ensure_local_tab(page_id)
+        image = await run_on_tab(page_id, lambda page: capture(page_id), PRIORITY_BACKGROUND)
+        return {"id": page_id, "image": base64.b64encode(image).decode()}
+    
+    return bulk_response(await run_bulk(request.page_ids, screenshot, request.concurrency, key=str))
+
+@api_router.get("/tabs/queues")
+async def get_tab_queues():
+    """Per-tab queue depth, wait and service times"""
+    return tab_actors.get_stats()
+
+@api_router.post("/tabs/queues/settings")
+async def update_tab_queue_settings(settings: TabQueueSettings):
+    tab_actors.settings.update(settings.dict(exclude_none=True))
+    return {"success": True, "settings": tab_actors.settings}
+
+@api_router.get("/tabs/{page_id}/thumbnail")
+async def get_tab_thumbnail(page_id: str):
+    """Cached preview of a tab; never captures or wakes the tab"""
+    if page_id not in active_tabs:
+        raise HTTPException(status_code=404, detail="Tab not found")
+    
+    thumbnail = thumbnails.get(page_id) or tab_hibernator.get_thumbnail(page_id)
+    if thumbnail is None:
+        raise HTTPException(status_code=404, detail="No thumbnail available")
+    
+    return Response(content=thumbnail, media_type="image/jpeg")
+
+@api_router.get("/tabs/{page_id}/snapshot")
+async def get_tab_snapshot(page_id: str, since: Optional[int] = None, bbox: bool = True,
+                           max_nodes: Optional[int] = None):
+    """Pruned element tree for agents; with since=<version>, only what changed after it"""
+    try:
+        return await run_on_tab(
+            page_id, lambda page: page_snapshots.snapshot(page_id, page, since, bbox, max_nodes)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to snapshot tab {page_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/snapshots")
+async def get_snapshot_stats():
+    return page_snapshots.get_stats()
+
+@api_router.post("/snapshots/settings")
+async def update_snapshot_settings(settings: SnapshotSettings):
+    page_snapshots.settings.update(settings.dict(exclude_none=True))
+    return {"success": True, "settings": page_snapshots.settings}
+
+@api_router.get("/thumbnails")
+async def get_thumbnails(since: Optional[float] = None):
+    """Every tab's cached preview as base64 JPEG in one response; since=<epoch> returns only newer ones"""
+    return {
+        "thumbnails": [
+            {**thumb, "image": base64.b64encode(thumb["image"]).decode()}
+            for thumb in thumbnails.get_all(since)
+        ],
+        "time": time.time()
+    }
+
+@api_router.get("/thumbnails/stats")
+async def get_thumbnail_stats():
+    return thumbnails.get_stats()
+
+@api_router.post("/thumbnails/settings")
+async def update_thumbnail_settings(settings: ThumbnailSettings):
+    thumbnails.settings.update(settings.dict(exclude_none=True))
+    return {"success": True, "settings": thumbnails.settings}
+
+@api_router.post("/tabs/{page_id}/network/start")
+async def start_network_capture(page_id: str):
+    if page_id not in active_tabs:
+        raise HTTPException(status_code=404, detail="Tab not found")
+    network_capture.start(page_id)
+    return {"success": True}
+
+@api_router.post("/tabs/{page_id}/network/stop")
+async def stop_network_capture(page_id: str):
+    network_capture.stop(page_id)
+    return {"success": True}
+
+@api_router.get("/tabs/{page_id}/network")
+async def get_network_capture(page_id: str, limit: int = 50):
+    """Most recent captured requests of a tab, metadata only"""
+    return {"entries": network_capture.recent(page_id, limit)}
+
+@api_router.post("/tabs/{page_id}/network/flush")
+async def flush_network_capture(page_id: str):
+    """Write the tab's capture buffer to a gzipped HAR file in the background"""
+    name = network_capture.flush(page_id)
+    if name is None:
+        raise HTTPException(status_code=404, detail="Nothing captured for this tab")
+    return {"success": True, "file": name}
+
+@api_router.get("/network")
+async def get_network_capture_stats():
+    return network_capture.get_stats()
+
+@api_router.post("/network/settings")
+async def update_network_capture_settings(settings: NetworkCaptureSettings):
+    network_capture.settings.update(settings.dict(exclude_none=True))
+    network_capture.apply_settings()
+    return {"success": True, "settings": network_capture.settings}
+
+@api_router.get("/network/files/{name}")
+async def download_network_capture(name: str):
+    path = network_capture.path_of(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Capture file not found")
+    return FileResponse(path, media_type="application/gzip", filename=name)
+
+@api_router.post("/tabs/{page_id}/hibernate")
+async def hibernate_tab(page_id: str):
+    """Hibernate a tab now instead of waiting for the idle timeout"""
+    if page_id not in active_tabs:
+        raise HTTPException(status_code=404, detail="Tab not found")
+    
+    # Queued like any other operation so the page is not closed under a running one
+    hibernated = await tab_actors.submit(page_id, lambda: tab_hibernator.hibernate(page_id), PRIORITY_BACKGROUND)
+    if hibernated:
+        await manager.broadcast({"type": "tab_hibernated", "data": {"id": page_id}})
+    return {"success": hibernated}
+
+@api_router.get("/hibernation")
+async def get_hibernation_status():
+    return tab_hibernator.get_status()
+
+@api_router.post("/hibernation/settings")
+async def update_hibernation_settings(settings: HibernationSettings):
+    tab_hibernator.settings.update(settings.dict(exclude_none=True))
+    return {"success": True, "settings": tab_hibernator.settings}
+
 # Mouse and Keyboard Interaction APIs
 class MouseClick(BaseModel):
     x: int
@@ -382,20 +1004,19 @@ class ScrollInput(BaseModel):
 async def click_on_page(page_id: str, click_data: MouseClick):
     """Send mouse click to the browser at specified coordinates"""
     try:
-        if page_id not in active_tabs:
-            raise HTTPException(status_code=404, detail="Tab not found")
-        
-        page = active_tabs[page_id].get("page")
-        if not page or page.is_closed():
-            raise HTTPException(status_code=404, detail="Page is closed")
-        
         # Perform mouse click at coordinates
-        await page.mouse.click(
-            click_data.x, 
-            click_data.y,
-            button=click_data.button,
-            click_count=click_data.click_count
-        )
+        async def click(page):
+            target = await session_recorder.describe_target(page_id, page, click_data.x, click_data.y)
+            await page.mouse.click(
+                click_data.x, 
+                click_data.y,
+                button=click_data.button,
+                click_count=click_data.click_count
+            )
+            session_recorder.record(page_id, "click", x=click_data.x, y=click_data.y, button=click_data.button,
+                                    count=click_data.click_count, target=target)
+        
+        await run_on_tab(page_id, click, PRIORITY_INTERACTIVE)
         
         logger.info(f"Clicked at ({click_data.x}, {click_data.y}) on tab {page_id}")
         
@@ -410,15 +1031,13 @@ async def click_on_page(page_id: str, click_data: MouseClick):
 async def type_on_page(page_id: str, keyboard_data: KeyboardInput):
     """Send keyboard input to the browser"""
     try:
-        if page_id not in active_tabs:
-            raise HTTPException(status_code=404, detail="Tab not found")
-        
-        page = active_tabs[page_id].get("page")
-        if not page or page.is_closed():
-            raise HTTPException(status_code=404, detail="Page is closed")
-        
         # Type text with human-like delays
-        await page.keyboard.type(keyboard_data.text, delay=keyboard_data.delay)
+        async def type_text(page):
+            secret = await session_recorder.is_secret_field(page_id, page)
+            await page.keyboard.type(keyboard_data.text, delay=keyboard_data.delay)
+            session_recorder.record_typing(page_id, keyboard_data.text, keyboard_data.delay, secret)
+        
+        await run_on_tab(page_id, type_text, PRIORITY_INTERACTIVE)
         
         logger.info(f"Typed text on tab {page_id}")
         
@@ -433,15 +1052,16 @@ async def type_on_page(page_id: str, keyboard_data: KeyboardInput):
 async def press_key(page_id: str, key: str):
     """Press a specific key (Enter, Backspace, etc.)"""
     try:
-        if page_id not in active_tabs:
-            raise HTTPException(status_code=404, detail="Tab not found")
-        
-        page = active_tabs[page_id].get("page")
-        if not page or page.is_closed():
-            raise HTTPException(status_code=404, detail="Page is closed")
-        
         # Press the specified key
-        await page.keyboard.press(key)
+        async def press(page):
+            secret = await session_recorder.is_secret_field(page_id, page)
+            await page.keyboard.press(key)
+            if secret:
+                session_recorder.record(page_id, "key", secret=True)
+            else:
+                session_recorder.record(page_id, "key", key=key)
+        
+        await run_on_tab(page_id, press, PRIORITY_INTERACTIVE)
         
         logger.info(f"Pressed key '{key}' on tab {page_id}")
         
@@ -456,15 +1076,11 @@ async def press_key(page_id: str, key: str):
 async def scroll_page(page_id: str, scroll_data: ScrollInput):
     """Scroll the page"""
     try:
-        if page_id not in active_tabs:
-            raise HTTPException(status_code=404, detail="Tab not found")
-        
-        page = active_tabs[page_id].get("page")
-        if not page or page.is_closed():
-            raise HTTPException(status_code=404, detail="Page is closed")
-        
         # Scroll using mouse wheel
-        await page.mouse.wheel(scroll_data.delta_x, scroll_data.delta_y)
+        await run_on_tab(
+            page_id, lambda page: page.mouse.wheel(scroll_data.delta_x, scroll_data.delta_y), PRIORITY_INTERACTIVE
+        )
+        session_recorder.record(page_id, "scroll", dx=scroll_data.delta_x, dy=scroll_data.delta_y)
         
         logger.info(f"Scrolled page {page_id}")
         
@@ -475,29 +1091,201 @@ async def scroll_page(page_id: str, scroll_data: ScrollInput):
         logger.error(f"Scroll failed: {e}")
         raise HTTPException(status_code=500, detail=f"Scroll error: {str(e)}")
 
+@api_router.post("/tabs/{page_id}/recording/start")
+async def start_recording(page_id: str):
+    """Record this tab's input and navigations until stopped"""
+    async def start(page):
+        return session_recorder.start(page_id, page)
+    
+    try:
+        return await run_on_tab(page_id, start)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/tabs/{page_id}/recording/stop")
+async def stop_recording(page_id: str):
+    recording = session_recorder.stop(page_id)
+    if recording is None:
+        raise HTTPException(status_code=404, detail="Tab is not being recorded")
+    return recording
+
+@api_router.get("/recordings")
+async def list_recordings():
+    await session_recorder.drain()
+    return {"recordings": session_recorder.list(), "replays": session_replayer.get_stats()}
+
+@api_router.get("/recordings/{recording_id}")
+async def get_recording(recording_id: str):
+    await session_recorder.drain()
+    events = session_recorder.load(recording_id)
+    if events is None:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    return {"id": recording_id, "events": events}
+
+@api_router.delete("/recordings/{recording_id}")
+async def delete_recording(recording_id: str):
+    await session_recorder.drain()
+    try:
+        if not session_recorder.delete(recording_id):
+            raise HTTPException(status_code=404, detail="Recording not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True}
+
+@api_router.post("/tabs/{page_id}/replay")
+async def replay_recording(page_id: str, request: ReplayRequest):
+    """Play a recording back on a tab, waiting on page conditions rather than recorded delays"""
+    await session_recorder.drain()
+    events = session_recorder.load(request.recording_id)
+    if events is None:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    
+    async def replay(page):
+        tab_hibernator.pin(page_id)
+        try:
+            return await supervisor.guard(
+                page_id, session_replayer.replay(page, events, request.speed or 0, request.condition_timeout)
+            )
+        finally:
+            tab_hibernator.unpin(page_id)
+    
+    # Holds the tab's actor for the whole replay, like a workflow
+    try:
+        return await run_on_tab(page_id, replay)
+    except BrowserCrashedError as e:
+        raise crash_retry_exception(e)
+
 @api_router.post("/automation/workflow")
-async def run_workflow(workflow_request: WorkflowRequest):
+async def run_workflow(workflow_request: WorkflowRequest, request: Request):
     try:
         page_id = workflow_request.page_id
         
-        if page_id not in active_tabs:
-            raise HTTPException(status_code=404, detail="Tab not found")
-        
-        page = active_tabs[page_id]["page"]
-        automation = AutomationEngine(page)
+        # The tab is named in the body, so the affinity middleware cannot route this one
+        if page_id not in active_tabs and FORWARDED_HEADER not in request.headers:
+            owner = await session_registry.owner_of(page_id)
+            if owner:
+                return await session_registry.forward(request, owner)
         
         if workflow_request.workflow_type == "gmail_gemini_youtube":
-            workflow = GmailGeminiYouTubeWorkflow(automation)
-            result = await workflow.run_full_workflow(workflow_request.sender_filter)
+            crashes_before = supervisor.crash_count()
             
-            return result
+            # Imported on first use; workflow code is not needed to serve the API
+            from automation_engine import AutomationEngine
+            from workflows.gmail_gemini_youtube import GmailGeminiYouTubeWorkflow
+            
+            job_id = workflow_request.job_id or str(uuid.uuid4())
+            
+            async def run(page):
+                engine = AutomationEngine(page)
+                if network_capture.settings["flush_on_step_failure"]:
+                    engine.on_step_failed = lambda step: network_capture.flush(page_id, f"{job_id} {step} failed")
+                workflow = GmailGeminiYouTubeWorkflow(engine)
+                tab_hibernator.pin(page_id)
+                try:
+                    with profiler.job(job_id):
+                        return await supervisor.guard(page_id, workflow.run_full_workflow(workflow_request.sender_filter))
+                finally:
+                    tab_hibernator.unpin(page_id)
+            
+            # The whole run holds the tab's actor; input sent meanwhile waits for it
+            try:
+                result = await run_on_tab(page_id, run)
+            except BrowserCrashedError as e:
+                raise crash_retry_exception(e)
+            
+            # Steps swallow their own errors; a crash mid-run still means "try again"
+            if not result.get("success") and supervisor.crash_count() != crashes_before:
+                raise crash_retry_exception(BrowserCrashedError(result.get("error", "Workflow interrupted by a crash")))
+            
+            # Keep the logged-in session so the next context for this profile skips login
+            # The tab may have been closed during the run; close_tab does not queue behind it
+            tab_info = active_tabs.get(page_id)
+            if result.get("success") and tab_info is not None:
+                await browser_manager.save_profile_state(tab_info["context_id"])
+            
+            return {**result, "job_id": job_id}
         else:
             raise HTTPException(status_code=400, detail="Unknown workflow type")
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Workflow execution failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/loop")
+async def get_loop_stats(limit: int = 10):
+    """Event loop lag percentiles and the callbacks that blocked it longest"""
+    return loop_monitor.get_stats(limit)
+
+@api_router.post("/loop/settings")
+async def update_loop_settings(settings: LoopMonitorSettings):
+    loop_monitor.settings.update(settings.dict(exclude_none=True))
+    return {"success": True, "settings": loop_monitor.settings}
+
+@api_router.delete("/loop")
+async def reset_loop_stats():
+    loop_monitor.reset()
+    return {"success": True}
+
+@api_router.get("/profiling")
+async def get_profiling():
+    """Armed profiling rules and stored profiles"""
+    return profiler.get_stats()
+
+@api_router.post("/profiling/rules")
+async def arm_profiling(rule: ProfilingRule):
+    """Profile the next `count` requests to a route, or the workflow run with `job_id`"""
+    try:
+        armed = profiler.arm(route=rule.route, method=rule.method, job_id=rule.job_id, count=rule.count, mode=rule.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "rule": armed}
+
+@api_router.delete("/profiling/rules/{rule_id}")
+async def disarm_profiling(rule_id: str):
+    if not profiler.disarm(rule_id):
+        raise HTTPException(status_code=404, detail="Profiling rule not found")
+    return {"success": True}
+
+@api_router.post("/profiling/settings")
+async def update_profiling_settings(settings: ProfilingSettings):
+    profiler.settings.update(settings.dict(exclude_none=True))
+    return {"success": True, "settings": profiler.settings}
+
+@api_router.get("/profiling/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Summary and hottest functions of one profile"""
+    profile = profiler.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profiler.summary(profile)
+
+@api_router.get("/profiling/profiles/{profile_id}/pstats")
+async def download_profile_pstats(profile_id: str, format: str = "binary"):
+    """cProfile stats: binary for pstats/snakeviz, or format=text for a printed report"""
+    if not profiler.get_profile(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "text":
+        report = profiler.pstats_text(profile_id)
+        if report is None:
+            raise HTTPException(status_code=404, detail="Profile was sampled; only collapsed stacks are available")
+        return Response(content=report, media_type="text/plain")
+    dump = profiler.pstats_dump(profile_id)
+    if dump is None:
+        raise HTTPException(status_code=404, detail="Profile was sampled; only collapsed stacks are available")
+    return Response(content=dump, media_type="application/octet-stream",
+                    headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'})
+
+@api_router.get("/profiling/profiles/{profile_id}/collapsed")
+async def download_profile_collapsed(profile_id: str):
+    """Collapsed stacks for flamegraph.pl, speedscope or inferno"""
+    profile = profiler.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=profile["collapsed"], media_type="text/plain",
+                    headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed"'})
+
 @api_router.post("/automation/settings")
 async def update_automation_settings(settings: AutomationSettings):
     # Store settings globally (can be per-page later)
@@ -508,16 +1296,8 @@ async def validate_llm_key(config: LLMConfig):
     """Validate LLM API key"""
     # This is a placeholder - actual validation would test the API
     try:
-        # Store in database if valid
-        llm_doc = {
-            "id": str(uuid.uuid4()),
-            "provider": config.provider,
-            "model": config.model,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "api_key_hash": config.api_key[:8] + "*" * 20  # Store only partial for security
-        }
-        
-        await db.llm_configs.insert_one(llm_doc)
+        # Store in database if valid; replaces the provider's previous config
+        await llm_configs.save(config.provider, config.model, config.api_key)
         
         return {
             "success": True,
@@ -529,13 +1309,34 @@ async def validate_llm_key(config: LLMConfig):
         raise HTTPException(status_code=400, detail="Invalid API key")
 
 @api_router.get("/llm/config")
-async def get_llm_config():
-    """Get stored LLM configuration"""
-    config = await db.llm_configs.find_one({}, {"_id": 0}, sort=[("created_at", -1)])
+async def get_llm_config(provider: Optional[str] = None):
+    """Get stored LLM configuration: the given provider's, or the most recently saved"""
+    config = await llm_configs.get(provider)
     if config:
         return {"success": True, "config": config}
     return {"success": False, "config": None}
 
+def _tab_states():
+    hibernated = sum(1 for page_id in active_tabs if tab_hibernator.is_hibernated(page_id))
+    return {("live",): len(active_tabs) - hibernated, ("hibernated",): hibernated}
+
+metrics.browser_contexts.set_function(lambda: len(browser_manager.contexts))
+metrics.browser_pages.set_function(lambda: len(browser_manager.pages))
+metrics.browser_tabs.set_function(_tab_states)
+metrics.browser_connected.set_function(
+    lambda: int(bool(browser_manager.browser and browser_manager.browser.is_connected()))
+)
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@api_router.get("/llm/cache")
+async def get_llm_config_cache():
+    """Config cache hit rate and whether change streams keep it fresh"""
+    return {**llm_configs.get_stats(), "mongo_options": mongo.options}
+
 # WebSocket endpoint for real-time updates
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -0,0 +1,376 @@
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
+import asyncio
+import json
+import re
+import time
+import uuid
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+from typing import Dict, Any, Optional, List, Set
+
+from navigation import page_navigator
+
+logger = logging.getLogger(__name__)
+
+# Describes the element under a click so a replay can wait for it and click
+# it where it is now, instead of trusting recorded coordinates
+TARGET_JS = """([x, y]) => {
+    let el = document.elementFromPoint(x, y);
+    if (!el) return null;
+    const actionable = el.closest('a, button, input, select, textarea, label, summary, [role], [onclick], [tabindex]');
+    if (actionable) el = actionable;
+    const unique = (selector) => {
+        try { return document.querySelectorAll(selector).length === 1 ? selector : null; } catch (e) { return null; }
+    };
+    const attrSelector = (node) => {
+        const tag = node.tagName.toLowerCase();
+        if (node.id && !/\\d{3,}/.test(node.id)) return '#' + CSS.escape(node.id);
+        for (const attr of ['data-testid', 'data-test', 'aria-label', 'name', 'placeholder', 'title']) {
+            const value = node.getAttribute(attr);
+            if (value) return `${tag}[${attr}="${CSS.escape(value)}"]`;
+        }
+        return null;
+    };
+    let selector = attrSelector(el) && unique(attrSelector(el));
+    if (!selector) {
+        // Short nth-of-type path below the nearest ancestor with a usable selector
+        const parts = [];
+        let node = el;
+        for (let depth = 0; node && node !== document.body && depth < 6; depth++) {
+            const own = depth > 0 && attrSelector(node);
+            if (own) { parts.unshift(own); break; }
+            const siblings = node.parentElement ? [...node.parentElement.children].filter((s) => s.tagName === node.tagName) : [];
+            const tag = node.tagName.toLowerCase();
+            parts.unshift(siblings.length > 1 ? `${tag}:nth-of-type(${siblings.indexOf(node) + 1})` : tag);
+            node = node.parentElement;
+        }
+        selector = unique(parts.join(' > '));
+    }
+    return {selector, text: (el.innerText || el.value || '').replace(/\\s+/g, ' ').trim().slice(0, 80)};
+}"""
+
+# Whether keystrokes are about to land in a password field, following focus
+# into open shadow roots and same-origin frames
+SECRET_FIELD_JS = """() => {
+    let el = document.activeElement;
+    for (;;) {
+        if (el && el.shadowRoot && el.shadowRoot.activeElement) { el = el.shadowRoot.activeElement; continue; }
+        let inner = null;
+        try { inner = el && el.contentDocument && el.contentDocument.activeElement; } catch (e) {}
+        if (inner) { el = inner; continue; }
+        break;
+    }
+    if (!el) return false;
+    return el.type === 'password' || /password/i.test(el.getAttribute('autocomplete') || '');
+}"""
+
+
+def _same_page(url: str, expected: str) -> bool:
+    """Origin and path match; query strings and fragments often carry per-session tokens"""
+    a, b = urlsplit(url), urlsplit(expected)
+    return (a.scheme, a.netloc, a.path.rstrip("/")) == (b.scheme, b.netloc, b.path.rstrip("/"))
+
+
+class Recording:
+    """An open recording: its append-only file, the lines not yet written to it and the tab it follows"""
+
+    def __init__(self, recording_id: str, page_id: str, path: Path):
+        self.id = recording_id
+        self.page_id = page_id
+        self.path = path
+        self.started = time.monotonic()
+        self.events = 0
+        self.pending: List[str] = []
+
+    def write(self, event: Dict[str, Any]):
+        self.pending.append(json.dumps(event, separators=(",", ":")) + "\n")
+        self.events += 1
+
+    def take(self) -> List[str]:
+        lines, self.pending = self.pending, []
+        return lines
+
+
+class SessionRecorder:
+    """Records the input and navigation stream of a tab as timestamped JSONL.
+
+    Each line is one event with "t", milliseconds since the recording started.
+    Input events come from the click/type/keypress/scroll endpoints; clicks
+    also carry a description of the element under the pointer. Navigations
+    come from the navigate endpoint and from the page's own main-frame
+    navigations. Tabs that are not being recorded pay one dict lookup.
+    Text typed and keys pressed into password fields are not stored; their
+    events are marked secret. Lines are buffered and appended by a background writer in a
+    worker thread, so recording never blocks the loop on disk.
+    """
+
+    def __init__(self, browser_manager, output_dir: Path = Path("/tmp/recordings")):
+        self.browser_manager = browser_manager
+        self.output_dir = output_dir
+        self.active: Dict[str, Recording] = {}  # page_id -> recording
+        self._watched: Dict[str, tuple] = {}  # page_id -> (page, handler)
+        self._unflushed: Set[Recording] = set()
+        self._writer: Optional[asyncio.Task] = None
+        browser_manager.add_listener("page_created", self._on_page_created)
+
+    def is_recording(self, page_id: str) -> bool:
+        return page_id in self.active
+
+    def start(self, page_id: str, page: Page) -> Dict[str, Any]:
+        if page_id in self.active:
+            raise ValueError(f"Tab {page_id} is already being recorded")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        recording_id = uuid.uuid4().hex[:12]
+        recording = self.active[page_id] = Recording(recording_id, page_id, self.output_dir / f"{recording_id}.jsonl")
+        recording.write({
+            "t": 0,
+            "type": "start",
+            "page_id": page_id,
+            "url": page.url,
+            "viewport": page.viewport_size,
+            "at": datetime.now(timezone.utc).isoformat()
+        })
+        self._flush_soon(recording)
+        self._watch(page_id, page)
+        logger.info(f"Recording {recording_id} started on tab {page_id}")
+        return {"id": recording_id, "page_id": page_id, "url": page.url}
+
+    def stop(self, page_id: str) -> Optional[Dict[str, Any]]:
+        recording = self.active.pop(page_id, None)
+        if recording is None:
+            return None
+        self.record_on(recording, "stop")
+        self._unwatch(page_id)
+        logger.info(f"Recording {recording.id} stopped after {recording.events} events")
+        return {"id": recording.id, "page_id": page_id, "events": recording.events}
+
+    def forget(self, page_id: str):
+        self.stop(page_id)
+
+    def _on_page_created(self, page_id: str, page: Page):
+        # Hibernation and crash recovery swap the page under the same tab id
+        if page_id in self.active:
+            self._watch(page_id, page)
+
+    def _watch(self, page_id: str, page: Page):
+        self._unwatch(page_id)
+
+        def on_navigated(frame):
+            if frame.parent_frame is None:
+                self.record(page_id, "navigated", url=frame.url)
+
+        page.on("framenavigated", on_navigated)
+        self._watched[page_id] = (page, on_navigated)
+
+    def _unwatch(self, page_id: str):
+        watched = self._watched.pop(page_id, None)
+        if watched:
+            watched[0].remove_listener("framenavigated", watched[1])
+
+    def record(self, page_id: str, event_type: str, **data):
+        recording = self.active.get(page_id)
+        if recording is not None:
+            self.record_on(recording, event_type, **data)
+
+    def record_on(self, recording: Recording, event_type: str, **data):
+        recording.write({"t": round((time.monotonic() - recording.started) * 1000), "type": event_type, **data})
+        self._flush_soon(recording)
+
+    def _flush_soon(self, recording: Recording):
+        self._unflushed.add(recording)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+
+    def record_typing(self, page_id: str, text: str, delay: float, secret: bool):
+        if secret:
+            self.record(page_id, "type", secret=True, length=len(text), delay=delay)
+        else:
+            self.record(page_id, "type", text=text, delay=delay)
+
+    async def _write_loop(self):
+        while self._unflushed:
+            batch = [(recording.path, recording.take()) for recording in self._unflushed]
+            self._unflushed.clear()
+            try:
+                await asyncio.to_thread(self._append, batch)
+            except Exception as e:
+                logger.error(f"Failed to write recording events: {e}")
+
+    @staticmethod
+    def _append(batch: List[tuple]):
+        for path, lines in batch:
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+
+    async def drain(self):
+        """Wait until every recorded event is on disk"""
+        while self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
+
+    async def is_secret_field(self, page_id: str, page: Page) -> bool:
+        """Whether typing now would go into a password field, only while the tab is recorded"""
+        if page_id not in self.active:
+            return False
+        try:
+            return await page.evaluate(SECRET_FIELD_JS)
+        except Exception:
+            return True  # could not tell, so keep the text out of the recording
+
+    async def describe_target(self, page_id: str, page: Page, x: float, y: float) -> Optional[Dict[str, Any]]:
+        """What is under (x, y), only while the tab is recorded"""
+        if page_id not in self.active:
+            return None
+        try:
+            return await page.evaluate(TARGET_JS, [x, y])
+        except Exception:
+            return None
+
+    def path_of(self, recording_id: str) -> Optional[Path]:
+        if not re.fullmatch(r"[0-9a-f]{12}", recording_id):
+            return None
+        path = self.output_dir / f"{recording_id}.jsonl"
+        return path if path.is_file() else None
+
+    def load(self, recording_id: str) -> Optional[List[Dict[str, Any]]]:
+        path = self.path_of(recording_id)
+        if path is None:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def delete(self, recording_id: str) -> bool:
+        if any(r.id == recording_id for r in self.active.values()):
+            raise ValueError("Stop the recording before deleting it")
+        path = self.path_of(recording_id)
+        if path is None:
+            return False
+        path.unlink()
+        return True
+
+    def list(self) -> List[Dict[str, Any]]:
+        if not self.output_dir.is_dir():
+            return []
+        recordings = []
+        for path in sorted(self.output_dir.glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True):
+            with open(path, encoding="utf-8") as f:
+                first = f.readline()
+            try:
+                header = json.loads(first)
+            except ValueError:
+                continue
+            recordings.append({
+                "id": path.stem,
+                "page_id": header.get("page_id"),
+                "url": header.get("url"),
+                "started_at": header.get("at"),
+                "bytes": path.stat().st_size,
+                "recording": any(r.id == path.stem for r in self.active.values())
+            })
+        return recordings
+
+
+class SessionReplayer:
+    """Plays a recording back on a tab, from the recorded start page and viewport.
+
+    Each event first waits for its condition: navigations for the page to be
+    ready, recorded page navigations for the URL to match, clicks for their
+    target element to be visible. With speed > 0 the recorded gaps, divided
+    by speed, are also kept as a minimum; with speed 0 events run as soon as
+    their conditions hold. A condition that does not hold in time is noted
+    and the replay carries on. Typing and keys recorded as secret cannot
+    be played back and are skipped.
+    """
+
+    def __init__(self):
+        self.replays: deque = deque(maxlen=20)
+        self.settings = {
+            "condition_timeout": 10000  # ms per event
+        }
+
+    async def replay(self, page: Page, events: List[Dict[str, Any]], speed: float = 1.0,
+                     condition_timeout: Optional[int] = None) -> Dict[str, Any]:
+        timeout = condition_timeout or self.settings["condition_timeout"]
+        started = time.perf_counter()
+        steps = []
+        error = None
+        for event in events:
+            if event["type"] == "stop":
+                continue
+            if speed > 0:
+                # Recorded pacing as a floor: never earlier than t / speed into the replay
+                delay = event["t"] / speed / 1000 - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            step_started = time.perf_counter()
+            step = {"type": event["type"], "t": event["t"]}
+            try:
+                await self._play(page, event, step, speed, timeout)
+            except Exception as e:
+                step["error"] = str(e)
+                error = f"{event['type']} at {event['t']} ms: {e}"
+                steps.append(step)
+                break
+            step["ms"] = round((time.perf_counter() - step_started) * 1000, 1)
+            steps.append(step)
+
+        report = {
+            "success": error is None,
+            "error": error,
+            "speed": speed,
+            "events": len(steps),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "recorded_ms": events[-1]["t"] if events else 0,
+            "conditions_timed_out": sum(1 for s in steps if s.get("timed_out")),
+            "steps": steps
+        }
+        self.replays.append({k: v for k, v in report.items() if k != "steps"})
+        return report
+
+    async def _play(self, page: Page, event: Dict[str, Any], step: Dict[str, Any], speed: float, timeout: int):
+        kind = event["type"]
+        if kind == "start":
+            # Put the tab where the recording began, so input lands on the same document
+            if event.get("viewport"):
+                await page.set_viewport_size(event["viewport"])
+            if event.get("url") and not _same_page(page.url, event["url"]):
+                result = await page_navigator.navigate(page, event["url"])
+                step["ready"] = result["ready"]
+        elif kind == "navigate":
+            result = await page_navigator.navigate(page, event["url"])
+            step["ready"] = result["ready"]
+        elif kind == "navigated":
+            if not _same_page(page.url, event["url"]):
+                try:
+                    await page.wait_for_url(lambda url: _same_page(url, event["url"]), timeout=timeout)
+                except PlaywrightTimeout:
+                    step["timed_out"] = True
+        elif kind == "click":
+            x, y = event["x"], event["y"]
+            selector = (event.get("target") or {}).get("selector")
+            if selector:
+                try:
+                    element = await page.wait_for_selector(selector, state="visible", timeout=timeout)
+                    box = await element.bounding_box()
+                    if box:
+                        x, y = box["x"] + box["width"] / 2, box["y"] + box["height"] / 2
+                except PlaywrightTimeout:
+                    step["timed_out"] = True
+            step["at"] = [round(x), round(y)]
+            await page.mouse.click(x, y, button=event.get("button", "left"), click_count=event.get("count", 1))
+        elif kind in ("type", "key") and event.get("secret"):
+            step["skipped"] = step["secret"] = True
+        elif kind == "type":
+            delay = event.get("delay", 0) / speed if speed > 0 else 0
+            await page.keyboard.type(event["text"], delay=delay)
+        elif kind == "key":
+            await page.keyboard.press(event["key"])
+        elif kind == "scroll":
+            await page.mouse.wheel(event.get("dx", 0), event.get("dy", 0))
+        else:
+            step["skipped"] = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"recent": list(self.replays), "settings": self.settings}
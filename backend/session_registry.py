@@ -0,0 +1,244 @@
+import asyncio
+import os
+import socket
+import time
+import logging
+from typing import Dict, Any, Optional, List
+
+from fastapi import Request
+from fastapi.responses import Response, RedirectResponse
+
+logger = logging.getLogger(__name__)
+
+# Set on forwarded requests so a stale registry entry can never bounce a request between workers
+FORWARDED_HEADER = "x-forwarded-by-worker"
+HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding", "te", "upgrade", "host", "content-length"}
+
+
+class SessionRegistry:
+    """Which worker owns each tab and context.
+
+    Playwright objects live in the worker process that created them, so a tab
+    can only be served by its owner. This in-memory registry is the single
+    worker case: every tab is local. Writes never block the caller.
+    """
+
+    distributed = False
+
+    def __init__(self, worker_id: Optional[str] = None, worker_url: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.worker_url = worker_url
+        self.sessions: Dict[str, Dict[str, Any]] = {}  # this worker's tabs and contexts
+        self.forwarded = 0
+        self._client = None  # httpx.AsyncClient, created on the first forward
+        self.settings = {
+            "affinity": "forward",  # or "redirect": answer 307 to the owner's URL
+            "heartbeat_interval": 10,
+            "worker_ttl": 30,  # seconds without a heartbeat before a worker's tabs are dropped
+            "forward_timeout": 300
+        }
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def claim_tab(self, page_id: str, context_id: str, url: str = "about:blank", title: str = "New Tab"):
+        self._write("claim", page_id, {"kind": "tab", "context_id": context_id, "url": url, "title": title})
+
+    def update_tab(self, page_id: str, **fields):
+        self._write("update", page_id, fields)
+
+    def claim_context(self, context_id: str, profile_name: str):
+        self._write("claim", context_id, {"kind": "context", "profile": profile_name})
+
+    def release(self, session_id: str):
+        self._write("release", session_id, None)
+
+    def _write(self, op: str, session_id: str, fields: Optional[Dict[str, Any]]):
+        if op == "claim":
+            self.sessions[session_id] = {**fields, "worker_id": self.worker_id, "worker_url": self.worker_url}
+        elif op == "update":
+            if session_id in self.sessions:
+                self.sessions[session_id].update(fields)
+        else:
+            self.sessions.pop(session_id, None)
+
+    async def owner_of(self, page_id: str) -> Optional[Dict[str, Any]]:
+        """The worker owning a tab that is not local, or None if no live worker owns it"""
+        return None
+
+    async def remote_tabs(self) -> List[Dict[str, Any]]:
+        """Tabs owned by other live workers"""
+        return []
+
+    async def forward(self, request: Request, owner: Dict[str, Any]) -> Response:
+        """Hand a request to the worker that owns its tab"""
+        target = owner["worker_url"].rstrip("/") + request.url.path
+        if request.url.query:
+            target += "?" + request.url.query
+        if self.settings["affinity"] == "redirect":
+            return RedirectResponse(target, status_code=307)
+
+        # Only multi-worker deployments forward, so keep httpx off the import path
+        import httpx
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.settings["forward_timeout"])
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP}
+        headers[FORWARDED_HEADER] = self.worker_id
+        try:
+            upstream = await self._client.request(request.method, target, content=await request.body(), headers=headers)
+        except httpx.HTTPError as e:
+            logger.warning(f"Forwarding {request.method} {request.url.path} to {owner['worker_id']} failed: {e}")
+            return Response(
+                content=f"Owner worker {owner['worker_id']} unreachable",
+                status_code=503,
+                headers={"Retry-After": "5"}
+            )
+        self.forwarded += 1
+        return Response(
+            content=upstream.content,
+            status_code=upstream.status_code,
+            headers={k: v for k, v in upstream.headers.items() if k.lower() not in HOP_BY_HOP | {"content-encoding"}}
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        kinds = [s["kind"] for s in self.sessions.values()]
+        return {
+            "worker_id": self.worker_id,
+            "worker_url": self.worker_url,
+            "distributed": self.distributed,
+            "tabs": kinds.count("tab"),
+            "contexts": kinds.count("context"),
+            "forwarded": self.forwarded,
+            "settings": self.settings
+        }
+
+
+class MongoSessionRegistry(SessionRegistry):
+    """Session registry shared by every worker through MongoDB.
+
+    Each worker runs as its own uvicorn process on its own port (WORKER_URL)
+    behind a load balancer. Ownership records are written by a background
+    writer in order, so browser operations never wait on Mongo; lookups only
+    happen for tabs that are not local.
+    """
+
+    distributed = True
+
+    def __init__(self, database, worker_id: Optional[str] = None, worker_url: Optional[str] = None):
+        super().__init__(worker_id, worker_url)
+        self.database = database
+        self.collection = None
+        self.workers = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._alive: Dict[str, tuple] = {}  # worker_id -> (checked_at, alive)
+
+    async def start(self):
+        self.collection = self.database.db.sessions
+        self.workers = self.database.db.session_workers
+        timed = self.database.timed
+        await timed("sessions.create_index", self.collection.create_index("worker_id"))
+        await timed("sessions.create_index", self.collection.create_index("kind"))
+        # Anything recorded under this id belongs to a previous process that is gone
+        await timed("sessions.delete_many", self.collection.delete_many({"worker_id": self.worker_id}))
+        await self._heartbeat()
+        self._queue = asyncio.Queue()
+        for session_id, fields in self.sessions.items():
+            self._queue.put_nowait(("claim", session_id, fields))
+        self._tasks = [asyncio.create_task(self._writer()), asyncio.create_task(self._heartbeat_loop())]
+        logger.info(f"Session registry started for worker {self.worker_id} at {self.worker_url}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        try:
+            await self.collection.delete_many({"worker_id": self.worker_id})
+            await self.workers.delete_one({"_id": self.worker_id})
+        except Exception as e:
+            logger.warning(f"Could not release sessions of worker {self.worker_id}: {e}")
+        await super().stop()
+
+    def _write(self, op: str, session_id: str, fields: Optional[Dict[str, Any]]):
+        super()._write(op, session_id, fields)
+        if self._queue is not None:
+            self._queue.put_nowait((op, session_id, fields))
+
+    async def _writer(self):
+        while True:
+            op, session_id, fields = await self._queue.get()
+            timed = self.database.timed
+            try:
+                if op == "claim":
+                    doc = {**fields, "worker_id": self.worker_id, "worker_url": self.worker_url, "updated_at": time.time()}
+                    await timed("sessions.replace_one", self.collection.replace_one({"_id": session_id}, doc, upsert=True))
+                elif op == "update":
+                    await timed("sessions.update_one", self.collection.update_one(
+                        {"_id": session_id, "worker_id": self.worker_id},
+                        {"$set": {**fields, "updated_at": time.time()}}
+                    ))
+                else:
+                    await timed("sessions.delete_one",
+                                self.collection.delete_one({"_id": session_id, "worker_id": self.worker_id}))
+            except Exception as e:
+                logger.warning(f"Session registry {op} for {session_id} failed: {e}")
+
+    async def _heartbeat(self):
+        await self.workers.update_one(
+            {"_id": self.worker_id},
+            {"$set": {"url": self.worker_url, "heartbeat_at": time.time()}},
+            upsert=True
+        )
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.settings["heartbeat_interval"])
+            try:
+                await self._heartbeat()
+            except Exception as e:
+                logger.warning(f"Worker heartbeat failed: {e}")
+
+    async def _is_alive(self, worker_id: str) -> bool:
+        checked_at, alive = self._alive.get(worker_id, (0.0, False))
+        if time.monotonic() - checked_at < 2:
+            return alive
+        doc = await self.database.timed("session_workers.find_one", self.workers.find_one({"_id": worker_id}))
+        alive = bool(doc) and time.time() - doc["heartbeat_at"] < self.settings["worker_ttl"]
+        self._alive[worker_id] = (time.monotonic(), alive)
+        if not alive:
+            # Its browser died with it; drop the records so nobody forwards there again
+            await self.collection.delete_many({"worker_id": worker_id})
+            await self.workers.delete_one({"_id": worker_id})
+        return alive
+
+    async def owner_of(self, page_id: str) -> Optional[Dict[str, Any]]:
+        if self.collection is None:
+            return None  # not started yet: Mongo is still coming up
+        doc = await self.database.timed("sessions.find_one", self.collection.find_one({"_id": page_id, "kind": "tab"}))
+        if not doc or doc["worker_id"] == self.worker_id or not await self._is_alive(doc["worker_id"]):
+            return None
+        return {"worker_id": doc["worker_id"], "worker_url": doc["worker_url"]}
+
+    async def remote_tabs(self) -> List[Dict[str, Any]]:
+        if self.collection is None:
+            return []
+        cutoff = time.time() - self.settings["worker_ttl"]
+        live = [w["_id"] async for w in self.workers.find({"heartbeat_at": {"$gte": cutoff}}, {"_id": 1})]
+        cursor = self.collection.find({"kind": "tab", "worker_id": {"$in": [w for w in live if w != self.worker_id]}})
+        return [
+            {"id": doc["_id"], "title": doc.get("title", ""), "url": doc.get("url", ""), "worker": doc["worker_id"]}
+            async for doc in cursor
+        ]
+
+
+def create_session_registry(database) -> SessionRegistry:
+    """Shared Mongo registry when this process is one of several workers (WORKER_URL set)"""
+    worker_url = os.environ.get("WORKER_URL")
+    if worker_url:
+        return MongoSessionRegistry(database, worker_id=os.environ.get("WORKER_ID"), worker_url=worker_url)
+    return SessionRegistry()
@@ -0,0 +1,145 @@
+import asyncio
+import itertools
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first when the priority lane is enabled
+PRIORITY_INTERACTIVE = 0  # click, type, keypress, scroll
+PRIORITY_NORMAL = 1  # navigation, workflows
+PRIORITY_BACKGROUND = 2  # screenshots, hibernation
+
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_NORMAL: "normal", PRIORITY_BACKGROUND: "background"}
+
+
+def _percentile(samples, pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 2)
+
+
+class TabQueueStats:
+    """Queue wait and service times of one tab, in ms"""
+
+    def __init__(self, window: int = 200):
+        self.waits = deque(maxlen=window)
+        self.services = deque(maxlen=window)
+        self.completed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.by_priority: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "max_depth": self.max_depth,
+            "by_priority": dict(self.by_priority),
+            "wait_ms": {"p50": _percentile(self.waits, 0.5), "p95": _percentile(self.waits, 0.95)},
+            "service_ms": {"p50": _percentile(self.services, 0.5), "p95": _percentile(self.services, 0.95)}
+        }
+
+
+class TabActor:
+    """Command queue of one tab with a single consumer, so operations on a page never overlap"""
+
+    def __init__(self, page_id: str, stats: TabQueueStats):
+        self.page_id = page_id
+        self.stats = stats
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()  # FIFO within a priority
+        self.running: Optional[str] = None  # priority name of the command in flight
+        self.task = asyncio.create_task(self._run())
+
+    def submit(self, operation: Callable[[], Awaitable], priority: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((priority, next(self._seq), time.perf_counter(), operation, future))
+        self.stats.max_depth = max(self.stats.max_depth, self.queue.qsize())
+        return future
+
+    def close(self):
+        """Stop after the commands already queued have run"""
+        self.queue.put_nowait((float("inf"), next(self._seq), time.perf_counter(), None, None))
+
+    async def _run(self):
+        while True:
+            priority, _, enqueued, operation, future = await self.queue.get()
+            if operation is None:
+                return
+            if future.cancelled():
+                continue  # the caller went away while queued
+            started = time.perf_counter()
+            name = PRIORITY_NAMES.get(priority, str(priority))
+            self.running = name
+            self.stats.waits.append((started - enqueued) * 1000)
+            self.stats.by_priority[name] = self.stats.by_priority.get(name, 0) + 1
+            try:
+                result = await operation()
+                if not future.done():
+                    future.set_result(result)
+                self.stats.completed += 1
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                self.stats.failed += 1
+            finally:
+                self.running = None
+                self.stats.services.append((time.perf_counter() - started) * 1000)
+
+
+class TabActors:
+    """One actor per tab: operations on the same tab run one at a time, different tabs in parallel.
+
+    An operation must not submit another operation for its own tab and wait
+    on it, since the tab's consumer is busy running the first one.
+    """
+
+    def __init__(self):
+        self.actors: Dict[str, TabActor] = {}
+        self.stats: Dict[str, TabQueueStats] = {}
+        self.settings = {
+            # Let interactive input overtake queued navigations and background screenshots
+            "priority_lane": True
+        }
+
+    def _actor(self, page_id: str) -> TabActor:
+        actor = self.actors.get(page_id)
+        if actor is None or actor.task.done():
+            stats = self.stats.setdefault(page_id, TabQueueStats())
+            actor = self.actors[page_id] = TabActor(page_id, stats)
+        return actor
+
+    async def submit(self, page_id: str, operation: Callable[[], Awaitable], priority: int = PRIORITY_NORMAL):
+        """Queue an operation on a tab and wait for its result"""
+        if not self.settings["priority_lane"]:
+            priority = PRIORITY_NORMAL
+        return await self._actor(page_id).submit(operation, priority)
+
+    def is_idle(self, page_id: str) -> bool:
+        """Nothing running or queued on the tab"""
+        actor = self.actors.get(page_id)
+        return actor is None or (actor.running is None and actor.queue.empty())
+
+    def forget(self, page_id: str):
+        """Retire a closed tab's actor; whatever is still queued runs and fails on its own"""
+        actor = self.actors.pop(page_id, None)
+        if actor is not None:
+            actor.close()
+        self.stats.pop(page_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "settings": self.settings,
+            "tabs": {
+                page_id: {
+                    "queued": actor.queue.qsize(),
+                    "running": actor.running,
+                    **actor.stats.to_dict()
+                }
+                for page_id, actor in self.actors.items()
+            }
+        }
@@ -0,0 +1,171 @@
+from playwright.async_api import Page
+import asyncio
+import time
+import logging
+from typing import Dict, Any, Optional, Set
+
+from tab_actors import PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+
+class TabHibernator:
+    """Closes the renderer of idle tabs and reopens them transparently on next use"""
+
+    def __init__(self, browser_manager, tab_actors=None):
+        self.browser_manager = browser_manager
+        self.tab_actors = tab_actors  # when given, sweeps hibernate through each tab's queue
+        self.active_tabs: Dict[str, Dict[str, Any]] = {}
+        self.last_access: Dict[str, float] = {}
+        self.snapshots: Dict[str, Dict[str, Any]] = {}  # page_id -> url, title, scroll, thumbnail
+        self.pinned: Set[str] = set()  # tabs that must stay live, e.g. while a workflow runs
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.settings = {
+            "enabled": True,
+            "idle_timeout": 600,  # seconds without access before a tab is hibernated
+            "check_interval": 30,
+            "min_live_tabs": 1  # never hibernate below this many live tabs
+        }
+
+    def start(self, active_tabs: Dict[str, Dict[str, Any]]):
+        """Start the idle sweep over the server's tab table"""
+        self.active_tabs = active_tabs
+        now = time.monotonic()
+        for page_id in active_tabs:
+            self.last_access.setdefault(page_id, now)
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._sweep_loop())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def touch(self, page_id: str):
+        self.last_access[page_id] = time.monotonic()
+
+    def pin(self, page_id: str):
+        self.pinned.add(page_id)
+        self.touch(page_id)
+
+    def unpin(self, page_id: str):
+        self.pinned.discard(page_id)
+        self.touch(page_id)
+
+    def is_hibernated(self, page_id: str) -> bool:
+        return page_id in self.snapshots
+
+    def get_thumbnail(self, page_id: str) -> Optional[bytes]:
+        snapshot = self.snapshots.get(page_id)
+        return snapshot.get("thumbnail") if snapshot else None
+
+    def forget(self, page_id: str):
+        """Drop all bookkeeping for a closed tab"""
+        self.last_access.pop(page_id, None)
+        self.snapshots.pop(page_id, None)
+        self.pinned.discard(page_id)
+        self._locks.pop(page_id, None)
+
+    def _lock(self, page_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(page_id, asyncio.Lock())
+
+    async def hibernate(self, page_id: str) -> bool:
+        """Snapshot a tab and close its Playwright page"""
+        async with self._lock(page_id):
+            tab_info = self.active_tabs.get(page_id)
+            if tab_info is None or self.is_hibernated(page_id) or page_id in self.pinned:
+                return False
+            page: Page = tab_info.get("page")
+            if not page or page.is_closed():
+                return False
+
+            snapshot = await self.browser_manager.snapshot_page(page_id)
+            try:
+                snapshot["title"] = await page.title()
+            except Exception:
+                snapshot["title"] = tab_info.get("title", "New Tab")
+            try:
+                snapshot["thumbnail"] = await self.browser_manager.capture_thumbnail(page_id)
+            except Exception as e:
+                logger.warning(f"Thumbnail for hibernating tab {page_id} failed: {e}")
+                snapshot["thumbnail"] = None
+            snapshot["hibernated_at"] = time.time()
+
+            # Cookies and localStorage live on in the context; also persist them in
+            # case the context is recreated before the tab is used again
+            await self.browser_manager.save_profile_state(tab_info["context_id"])
+            # The tab stays registered to its context with no page until restored
+            await self.browser_manager.close_page(page_id, keep_tab=True)
+
+            self.snapshots[page_id] = snapshot
+            tab_info["url"] = snapshot["url"]
+            tab_info["title"] = snapshot["title"]
+            logger.info(f"Hibernated idle tab {page_id} ({snapshot['url']})")
+            return True
+
+    async def restore(self, page_id: str) -> Page:
+        """Reopen a hibernated tab under the same id"""
+        async with self._lock(page_id):
+            tab_info = self.active_tabs[page_id]
+            snapshot = self.snapshots.get(page_id)
+            if snapshot is None:
+                # Restored by a concurrent request while we waited for the lock
+                return tab_info["page"]
+
+            started = time.perf_counter()
+            page = await self.browser_manager.reopen_page(page_id, tab_info["context_id"], snapshot)
+            del self.snapshots[page_id]
+            self.touch(page_id)
+            logger.info(f"Restored hibernated tab {page_id} in {(time.perf_counter() - started) * 1000:.0f} ms")
+            return page
+
+    async def sweep(self) -> list:
+        """Hibernate every tab idle for longer than the configured timeout"""
+        if not self.settings["enabled"]:
+            return []
+        now = time.monotonic()
+        live = [pid for pid in self.active_tabs if not self.is_hibernated(pid)]
+        idle = sorted(
+            (pid for pid in live
+             if pid not in self.pinned
+             and now - self.last_access.setdefault(pid, now) > self.settings["idle_timeout"]),
+            key=lambda pid: self.last_access[pid]
+        )
+        budget = len(live) - self.settings["min_live_tabs"]
+        hibernated = []
+        for page_id in idle[:max(0, budget)]:
+            try:
+                if self.tab_actors is None:
+                    hibernated_now = await self.hibernate(page_id)
+                elif not self.tab_actors.is_idle(page_id):
+                    continue  # busy or has work queued; it is not really idle
+                else:
+                    # Queued like any other operation so the page is not closed under a running one
+                    hibernated_now = await self.tab_actors.submit(
+                        page_id, lambda: self.hibernate(page_id), PRIORITY_BACKGROUND
+                    )
+                if hibernated_now:
+                    hibernated.append(page_id)
+            except Exception as e:
+                logger.error(f"Failed to hibernate tab {page_id}: {e}")
+        return hibernated
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.settings["check_interval"])
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Tab hibernation sweep failed: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "settings": self.settings,
+            "hibernated": [
+                {"id": pid, "url": snap["url"], "title": snap["title"], "hibernated_at": snap["hibernated_at"]}
+                for pid, snap in self.snapshots.items()
+            ],
+            "idle_seconds": {pid: round(now - ts, 1) for pid, ts in self.last_access.items()}
+        }
@@ -0,0 +1,98 @@
+import time
+import logging
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+
+class TabRegistry:
+    """Single source of truth for which context owns which tab.
+
+    tabs and contexts are plain dicts so readers can keep iterating them, but
+    every write goes through the methods below so the page -> context,
+    context -> pages and profile -> context indexes can never drift apart.
+    A tab whose page is None is hibernated: it still belongs to its context.
+    """
+
+    def __init__(self):
+        self.tabs: Dict[str, Dict[str, Any]] = {}  # page_id -> {context_id, page, title, url, favicon}
+        self.contexts: Dict[str, Dict[str, Any]] = {}  # context_id -> {profile, pages, created_at, idle_since}
+        self._profile_contexts: Dict[str, str] = {}  # profile name -> context_id new tabs go to
+
+    def add_context(self, context_id: str, profile_name: str):
+        now = time.monotonic()
+        self.contexts[context_id] = {"profile": profile_name, "pages": set(), "created_at": now, "idle_since": now}
+        self._profile_contexts.setdefault(profile_name, context_id)
+
+    def remove_context(self, context_id: str) -> List[str]:
+        """Forget a context and every tab it owned; returns the dropped page ids"""
+        info = self.contexts.pop(context_id, None)
+        if info is None:
+            return []
+        for page_id in info["pages"]:
+            self.tabs.pop(page_id, None)
+        profile_name = info["profile"]
+        if self._profile_contexts.get(profile_name) == context_id:
+            del self._profile_contexts[profile_name]
+            for cid, other in self.contexts.items():
+                if other["profile"] == profile_name:
+                    self._profile_contexts[profile_name] = cid
+                    break
+        return list(info["pages"])
+
+    def add_tab(self, page_id: str, context_id: str, page, url: str = "about:blank", title: str = "New Tab") -> Dict[str, Any]:
+        if context_id not in self.contexts:
+            raise ValueError(f"Context {context_id} not registered")
+        tab_info = {"context_id": context_id, "page": page, "title": title, "url": url, "favicon": ""}
+        self.tabs[page_id] = tab_info
+        self.contexts[context_id]["pages"].add(page_id)
+        self.contexts[context_id]["idle_since"] = None
+        return tab_info
+
+    def set_page(self, page_id: str, page):
+        """Point a tab at a new Page object, or at None while it is hibernated"""
+        self.tabs[page_id]["page"] = page
+
+    def remove_tab(self, page_id: str) -> Optional[Dict[str, Any]]:
+        tab_info = self.tabs.pop(page_id, None)
+        if tab_info is None:
+            return None
+        info = self.contexts.get(tab_info["context_id"])
+        if info is not None:
+            info["pages"].discard(page_id)
+            if not info["pages"]:
+                info["idle_since"] = time.monotonic()
+        return tab_info
+
+    def context_of(self, page_id: str) -> Optional[str]:
+        tab_info = self.tabs.get(page_id)
+        return tab_info["context_id"] if tab_info else None
+
+    def pages_of(self, context_id: str) -> List[str]:
+        info = self.contexts.get(context_id)
+        return list(info["pages"]) if info else []
+
+    def profile_of(self, context_id: str) -> Optional[str]:
+        info = self.contexts.get(context_id)
+        return info["profile"] if info else None
+
+    def context_for_profile(self, profile_name: str) -> Optional[str]:
+        return self._profile_contexts.get(profile_name)
+
+    def idle_contexts(self, min_idle: float) -> List[str]:
+        """Contexts that have owned no tabs for at least min_idle seconds"""
+        now = time.monotonic()
+        return [
+            cid for cid, info in self.contexts.items()
+            if info["idle_since"] is not None and now - info["idle_since"] >= min_idle
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tabs": len(self.tabs),
+            "hibernated_tabs": sum(1 for info in self.tabs.values() if info["page"] is None),
+            "contexts": {
+                cid: {"profile": info["profile"], "pages": sorted(info["pages"])}
+                for cid, info in self.contexts.items()
+            }
+        }
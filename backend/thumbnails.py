@@ -0,0 +1,161 @@
+from playwright.async_api import Page
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List
+
+from tab_actors import PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailService:
+    """Small JPEG previews of every tab, refreshed in the background.
+
+    A tab is marked dirty by its load and main-frame navigation events and
+    recaptured once it has settled and its queue is idle, at background
+    priority, so previews never hold up interactive work. Tabs that did not
+    change are never recaptured. Previews live in a byte-bounded LRU.
+    """
+
+    def __init__(self, browser_manager, tab_hibernator, tab_actors):
+        self.browser_manager = browser_manager
+        self.tab_hibernator = tab_hibernator
+        self.tab_actors = tab_actors
+        self.active_tabs: Dict[str, Dict[str, Any]] = {}
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # page_id -> image, url, captured_at
+        self.cache_bytes = 0
+        self.dirty: Dict[str, float] = {}  # page_id -> monotonic time of the last change
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"captures": 0, "failures": 0, "evictions": 0}
+        self.settings = {
+            "enabled": True,
+            "interval": 2.0,  # seconds between background passes
+            "settle": 1.0,  # wait this long after the last change before capturing
+            "max_per_cycle": 4,
+            "max_bytes": 8 * 1024 * 1024,
+            "width": 320,
+            "quality": 50,
+            "timeout": 5.0
+        }
+        browser_manager.add_listener("page_created", self._watch_page)
+
+    def start(self, active_tabs: Dict[str, Dict[str, Any]]):
+        self.active_tabs = active_tabs
+        for page_id in active_tabs:
+            self.dirty.setdefault(page_id, 0.0)
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _watch_page(self, page_id: str, page: Page):
+        self.mark_dirty(page_id)
+        page.on("load", lambda p: self.mark_dirty(page_id))
+        page.on("framenavigated", lambda frame: frame.parent_frame is None and self.mark_dirty(page_id))
+
+    def mark_dirty(self, page_id: str):
+        self.dirty[page_id] = time.monotonic()
+
+    def forget(self, page_id: str):
+        self.dirty.pop(page_id, None)
+        entry = self.cache.pop(page_id, None)
+        if entry:
+            self.cache_bytes -= len(entry["image"])
+
+    def get(self, page_id: str) -> Optional[bytes]:
+        entry = self.cache.get(page_id)
+        if entry is None:
+            return None
+        self.cache.move_to_end(page_id)
+        return entry["image"]
+
+    def _store(self, page_id: str, image: bytes, url: str):
+        self.forget(page_id)
+        self.cache[page_id] = {"image": image, "url": url, "captured_at": time.time()}
+        self.cache_bytes += len(image)
+        while self.cache_bytes > self.settings["max_bytes"] and len(self.cache) > 1:
+            _, evicted = self.cache.popitem(last=False)
+            self.cache_bytes -= len(evicted["image"])
+            self.stats["evictions"] += 1
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.settings["interval"])
+            if self.settings["enabled"]:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.error(f"Thumbnail refresh failed: {e}")
+
+    def _due(self) -> List[str]:
+        """Dirty, live, settled tabs with nothing queued, longest waiting first"""
+        settled = time.monotonic() - self.settings["settle"]
+        due = []
+        for page_id, changed in sorted(self.dirty.items(), key=lambda item: item[1]):
+            info = self.active_tabs.get(page_id)
+            if info is None:
+                self.dirty.pop(page_id, None)
+                continue
+            page = info.get("page")
+            if (changed <= settled and page and not page.is_closed()
+                    and not self.tab_hibernator.is_hibernated(page_id) and self.tab_actors.is_idle(page_id)):
+                due.append(page_id)
+        return due[:self.settings["max_per_cycle"]]
+
+    async def refresh(self):
+        # One tab at a time keeps the compositor and the loop free for real work
+        for page_id in self._due():
+            changed = self.dirty.get(page_id)
+            try:
+                image = await self.tab_actors.submit(page_id, lambda: asyncio.wait_for(
+                    self.browser_manager.capture_thumbnail(
+                        page_id, width=self.settings["width"], quality=self.settings["quality"]
+                    ),
+                    timeout=self.settings["timeout"]
+                ), PRIORITY_BACKGROUND)
+            except Exception as e:
+                # Closed, frozen or mid-restore; the next change marks it dirty again
+                self.stats["failures"] += 1
+                self.dirty.pop(page_id, None)
+                logger.debug(f"Thumbnail of tab {page_id} unavailable: {e}")
+                continue
+            if page_id not in self.active_tabs:
+                continue
+            self.stats["captures"] += 1
+            self._store(page_id, image, self.active_tabs[page_id].get("url", ""))
+            # A change that arrived during the capture keeps the tab dirty
+            if self.dirty.get(page_id) == changed:
+                self.dirty.pop(page_id, None)
+
+    def get_all(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Every tab's latest preview, falling back to the hibernation snapshot; since filters by capture time"""
+        thumbnails = []
+        for page_id in self.active_tabs:
+            entry = self.cache.get(page_id)
+            if entry is None:
+                image = self.tab_hibernator.get_thumbnail(page_id)
+                entry = {"image": image, "url": None, "captured_at": None} if image else None
+            if entry is None or (since is not None and (entry["captured_at"] or 0) <= since):
+                continue
+            thumbnails.append({
+                "id": page_id,
+                "image": entry["image"],
+                "url": entry["url"],
+                "captured_at": entry["captured_at"],
+                "stale": page_id in self.dirty
+            })
+        return thumbnails
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self.cache),
+            "cache_bytes": self.cache_bytes,
+            "dirty": len(self.dirty),
+            **self.stats,
+            "settings": self.settings
+        }
@@ -0,0 +1,138 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+def _collapse_whitespace(value: str) -> str:
+    return " ".join(value.split())
+
+
+def _normalize_tags(value: str) -> str:
+    tags = [t.strip().lstrip("#").strip() for t in re.split(r"[,;]", value)]
+    return ", ".join(t for t in tags if t)
+
+
+class FieldSpec:
+    """Describes one labelled field that can appear in an email body"""
+
+    def __init__(
+        self,
+        name: str,
+        labels: Iterable[str],
+        value_pattern: Optional[str] = None,
+        choices: Optional[Iterable[str]] = None,
+        max_length: Optional[int] = None,
+        normalize: Optional[Callable[[str], str]] = _collapse_whitespace,
+    ):
+        self.name = name
+        self.labels = list(labels)
+        self.value_re = re.compile(value_pattern, re.IGNORECASE) if value_pattern else None
+        # Canonical spelling keyed by lowercase value, e.g. "public" -> "Public"
+        self.choices = {c.lower(): c for c in choices} if choices else None
+        self.max_length = max_length
+        self.normalize = normalize
+
+    def clean(self, raw: str) -> Optional[str]:
+        """Validate and normalise a raw value, returning None if it is rejected"""
+        value = raw.strip()
+        if self.value_re is not None:
+            match = self.value_re.match(value)
+            if not match:
+                return None
+            value = match.group(0)
+        if self.normalize:
+            value = self.normalize(value)
+        if self.choices is not None:
+            value = self.choices.get(value.lower())
+            if value is None:
+                return None
+        if not value:
+            return None
+        if self.max_length and len(value) > self.max_length:
+            value = value[:self.max_length].rstrip()
+        return value
+
+
+# Fields expected in the ChatGPT email that drives the Gmail -> Gemini -> YouTube workflow
+DEFAULT_EMAIL_FIELDS = [
+    FieldSpec("prompt", ["Video Prompt", "Prompt"]),
+    FieldSpec("title", ["Title"], max_length=100),
+    FieldSpec("description", ["Description"], max_length=5000),
+    FieldSpec("tags", ["Tags"], normalize=_normalize_tags),
+    FieldSpec(
+        "visibility",
+        ["Visibility"],
+        value_pattern=r"Public|Private|Unlisted|Scheduled",
+        choices=["Public", "Private", "Unlisted", "Scheduled"],
+    ),
+]
+
+
+class EmailFieldExtractor:
+    """Extracts every field of a schema from an email body in a single regex pass"""
+
+    def __init__(self, fields: Optional[List[FieldSpec]] = None):
+        self.fields = list(fields if fields is not None else DEFAULT_EMAIL_FIELDS)
+        self._by_label: Dict[str, FieldSpec] = {}
+        for spec in self.fields:
+            for label in spec.labels:
+                self._by_label[label.lower()] = spec
+
+        # Longest labels first so "Video Prompt" wins over "Prompt"
+        labels = sorted(self._by_label, key=len, reverse=True)
+        label_alt = "|".join(re.escape(label) for label in labels)
+        # Matching a case-sensitive pattern against a lowercased copy of the body
+        # is several times faster than re.IGNORECASE with an alternation.
+        self.pattern = re.compile(rf"(?P<label>{label_alt})[ \t]*:\s*")
+        self.pattern_ci = re.compile(rf"(?P<label>{label_alt})[ \t]*:\s*", re.IGNORECASE)
+
+    def _label_matches(self, content: str):
+        lowered = content.lower()
+        if len(lowered) == len(content):
+            matches = self.pattern.finditer(lowered)
+        else:
+            # Some non-ASCII characters change length when lowercased
+            lowered = content
+            matches = self.pattern_ci.finditer(content)
+        for match in matches:
+            start = match.start()
+            if start and lowered[start - 1].isalnum():
+                continue  # "Subtitle:" is not a "Title:" label
+            yield match
+
+    def extract(self, content: Optional[str]) -> Dict[str, str]:
+        """Extract fields from one email body; the first valid occurrence of a field wins"""
+        result: Dict[str, str] = {}
+        if not content:
+            return result
+
+        wanted = len(self.fields)
+        previous = None
+        # A value runs to the end of its line or up to the next label, so bodies
+        # whose line breaks were collapsed by textContent still split cleanly.
+        for match in self._label_matches(content):
+            if previous is not None:
+                self._store(result, content, previous, match.start())
+                if len(result) == wanted:
+                    return result
+            previous = match
+        if previous is not None:
+            self._store(result, content, previous, len(content))
+        return result
+
+    def _store(self, result: Dict[str, str], content: str, match, limit: int):
+        spec = self._by_label[match.group("label").lower()]
+        if spec.name in result:
+            return
+        start = match.end()
+        end = content.find("\n", start, limit)
+        value = spec.clean(content[start:limit if end == -1 else end])
+        if value is not None:
+            result[spec.name] = value
+
+    def extract_many(self, contents: Iterable[Optional[str]]) -> List[Dict[str, str]]:
+        """Extract fields from a batch of email bodies"""
+        extract = self.extract
+        return [extract(content) for content in contents]
+
+
+default_extractor = EmailFieldExtractor()
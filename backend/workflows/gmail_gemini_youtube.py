@@ -1,12 +1,31 @@
 from automation_engine import AutomationEngine
+from workflows.email_fields import default_extractor
+from routing_policy import RoutingPolicy
+from navigation import Readiness
 import asyncio
-import re
 from pathlib import Path
+from typing import Dict, Optional
 import os
 
+# Requests each step can do without, blocked on the workflow's page only;
+# the Gemini step keeps media so the video preview loads
+STEP_POLICIES = {
+    "read_gmail": RoutingPolicy(presets=["ads", "media", "fonts", "images"]),
+    "generate_video": RoutingPolicy(presets=["ads", "fonts"]),
+    "upload_youtube": RoutingPolicy(presets=["ads", "media", "fonts"]),
+}
+
+# Entry points of each app; benchmarks point these at the local mock apps
+SITE_URLS = {
+    "gmail": "https://mail.google.com",
+    "gemini": "https://gemini.google.com",
+    "studio": "https://studio.youtube.com",
+}
+
 class GmailGeminiYouTubeWorkflow:
-    def __init__(self, automation: AutomationEngine):
+    def __init__(self, automation: AutomationEngine, urls: Optional[Dict[str, str]] = None):
         self.automation = automation
+        self.urls = {**SITE_URLS, **(urls or {})}
         self.extracted_data = {}
 
     async def read_gmail_latest(self, sender_filter: str = "ChatGPT"):
@@ -15,7 +34,7 @@ class GmailGeminiYouTubeWorkflow:
             self.automation.log(f"Opening Gmail to read email from {sender_filter}")
             
             # Navigate to Gmail
-            await self.automation.page.goto("https://mail.google.com", wait_until="networkidle")
+            await self.automation.navigate(self.urls["gmail"], Readiness(selector='div[role="main"]'))
             await asyncio.sleep(2)
             
             # Wait for inbox
@@ -55,31 +74,7 @@ class GmailGeminiYouTubeWorkflow:
 
     async def extract_fields_from_email(self, content: str):
         """Extract structured fields from email content"""
-        # Extract video prompt
-        prompt_match = re.search(r'(?:Video Prompt|Prompt):\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
-        if prompt_match:
-            self.extracted_data['prompt'] = prompt_match.group(1).strip()
-        
-        # Extract title
-        title_match = re.search(r'Title:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
-        if title_match:
-            self.extracted_data['title'] = title_match.group(1).strip()
-        
-        # Extract description
-        desc_match = re.search(r'Description:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
-        if desc_match:
-            self.extracted_data['description'] = desc_match.group(1).strip()
-        
-        # Extract tags
-        tags_match = re.search(r'Tags:\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
-        if tags_match:
-            self.extracted_data['tags'] = tags_match.group(1).strip()
-        
-        # Extract visibility
-        visibility_match = re.search(r'Visibility:\s*(Public|Private|Unlisted|Scheduled)', content, re.IGNORECASE)
-        if visibility_match:
-            self.extracted_data['visibility'] = visibility_match.group(1).strip()
-        
+        self.extracted_data.update(default_extractor.extract(content))
         self.automation.log(f"Extracted data: {self.extracted_data}")
 
     async def generate_video_gemini(self):
@@ -92,7 +87,10 @@ class GmailGeminiYouTubeWorkflow:
             self.automation.log("Opening Gemini for video generation")
             
             # Navigate to Gemini (assuming it's available)
-            await self.automation.page.goto("https://gemini.google.com", wait_until="networkidle")
+            await self.automation.navigate(
+                self.urls["gemini"],
+                Readiness(selector='textarea[placeholder], div[contenteditable="true"]')
+            )
             await asyncio.sleep(3)
             
             # Look for VEO3 model selector (this is a placeholder - actual selector may vary)
@@ -183,7 +181,10 @@ class GmailGeminiYouTubeWorkflow:
             self.automation.log("Opening YouTube Studio for upload")
             
             # Navigate to YouTube Studio
-            await self.automation.page.goto("https://studio.youtube.com", wait_until="networkidle")
+            await self.automation.navigate(
+                self.urls["studio"],
+                Readiness(selector='button[aria-label="Create"], ytcp-button#create-icon')
+            )
             await asyncio.sleep(3)
             
             # Click upload button
@@ -269,39 +270,50 @@ class GmailGeminiYouTubeWorkflow:
             if os.path.exists(video_path):
                 os.remove(video_path)
                 self.automation.log(f"Deleted video file: {video_path}")
+            return True
         except Exception as e:
             self.automation.log(f"Failed to delete video: {str(e)}", level="warning")
+            return False
 
     async def run_full_workflow(self, sender_filter: str = "ChatGPT"):
         """Execute the complete workflow"""
         self.automation.log("Starting Gmail → Gemini → YouTube workflow")
-        
+        try:
+            return await self._run_steps(sender_filter)
+        finally:
+            await self.automation.use_routing_policy(None)
+
+    async def _run_steps(self, sender_filter: str):
         # Step 1: Read email
-        success = await self.read_gmail_latest(sender_filter)
+        await self.automation.use_routing_policy(STEP_POLICIES["read_gmail"])
+        success = await self.automation.run_step("read_gmail", self.read_gmail_latest(sender_filter))
         if not success:
             return {"success": False, "error": "Failed to read Gmail"}
         
         # Step 2: Generate video
-        success = await self.generate_video_gemini()
+        await self.automation.use_routing_policy(STEP_POLICIES["generate_video"])
+        success = await self.automation.run_step("generate_video", self.generate_video_gemini())
         if not success:
             return {"success": False, "error": "Failed to generate video"}
         
         # Step 3: Download video
-        video_path = await self.download_video()
+        video_path = await self.automation.run_step("download_video", self.download_video())
         if not video_path:
             return {"success": False, "error": "Failed to download video"}
         
         # Step 4: Upload to YouTube
-        success = await self.upload_to_youtube(video_path)
+        await self.automation.use_routing_policy(STEP_POLICIES["upload_youtube"])
+        success = await self.automation.run_step("upload_youtube", self.upload_to_youtube(video_path))
         if not success:
             return {"success": False, "error": "Failed to upload to YouTube"}
         
         # Step 5: Cleanup
-        await self.cleanup_video(video_path)
+        await self.automation.run_step("cleanup", self.cleanup_video(video_path))
         
         self.automation.log("Workflow completed successfully!")
         return {
             "success": True,
             "data": self.extracted_data,
+            "timings_ms": self.automation.step_timings,
             "logs": self.automation.get_logs()
         }
\ No newline at end of file
@@ -50,6 +50,14 @@ function App() {
       loadTabs();
     });
 
+    newSocket.on('tab_hibernated', (data) => {
+      loadTabs();
+    });
+
+    newSocket.on('tabs_bulk', (data) => {
+      loadTabs();
+    });
+
     setSocket(newSocket);
 
     return () => newSocket.close();
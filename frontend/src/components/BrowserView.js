@@ -62,10 +62,19 @@ const BrowserView = ({
           {tabs.map((tab) => (
             <div
               key={tab.id}
-              className={`tab ${tab.id === activeTabId ? 'active' : ''} ${closingTabs.has(tab.id) ? 'closing' : ''}`}
+              className={`tab ${tab.id === activeTabId ? 'active' : ''} ${closingTabs.has(tab.id) ? 'closing' : ''} ${tab.hibernated ? 'hibernated' : ''}`}
               onClick={() => !closingTabs.has(tab.id) && onTabSelect(tab.id)}
               data-testid={`tab-${tab.id}`}
             >
+              {tab.hibernated && (
+                <img
+                  className="tab-thumbnail"
+                  src={`${API}/tabs/${tab.id}/thumbnail`}
+                  alt=""
+                  onError={(e) => { e.currentTarget.style.display = 'none'; }}
+                  data-testid={`tab-thumbnail-${tab.id}`}
+                />
+              )}
               <div className="tab-favicon" data-testid="tab-favicon">
                 {tab.favicon ? (
                   <img src={tab.favicon} alt="" width="16" height="16" />